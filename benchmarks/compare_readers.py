@@ -0,0 +1,100 @@
+"""
+Compare the .gdx reader backends of the toolbox (see toolbox.import_gdx.READERS) on the same file, e.g.
+
+    python benchmarks/compare_readers.py results/run_1.gdx --readers gams.transfer gdxpds --parquet dataset
+
+Each import runs in a fresh process, so that the import time of the reader packages and the peak memory (RSS)
+are measured separately. The imported data of each reader is compared to that of the first reader.
+The "parquet" reader needs the file exported with "python -m toolbox.export" to the dataset given with --parquet.
+"""
+import argparse, json, os, sys, time
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import memory_status, reset_peak_rss, peak_rss
+
+
+def read_file(path: str, reader: str, parquet: str, only_essential_outputs: bool) -> dict:
+    """
+    Import a file with a reader, including the import of the reader packages. Runs in a fresh process.
+    """
+    rss_before = memory_status('VmRSS') if reset_peak_rss() else peak_rss()
+    start = time.perf_counter()
+    from toolbox.import_gdx import import_gdx_file, ParquetReader
+    backend  = ParquetReader(parquet) if reader == 'parquet' else reader
+    gdx_data = import_gdx_file(path, only_essential_outputs=only_essential_outputs, verbose=False, compact=False, reader=backend)
+    seconds  = time.perf_counter() - start
+    return {'seconds': seconds, 'peak_rss': peak_rss(), 'rss_before': rss_before, 'data': gdx_data}
+
+
+def differences(gdx_data: dict, reference: dict) -> list:
+    """
+    Symbols that differ between two imports of the same file, ignoring the order of the rows and the data types.
+    """
+    import pandas as pd
+
+    different = sorted(set(gdx_data) ^ set(reference))
+    for symbol in set(gdx_data) & set(reference):
+        df, ref = gdx_data[symbol], reference[symbol]
+        if sorted(df.columns) != sorted(ref.columns) or len(df) != len(ref):
+            different.append(symbol)
+            continue
+        keys = [column for column in ref.columns if ref[column].dtype.kind not in 'fc']
+        df   = df[list(ref.columns)].astype({column: str for column in keys}).sort_values(keys).reset_index(drop=True)
+        ref  = ref.astype({column: str for column in keys}).sort_values(keys).reset_index(drop=True)
+        try:
+            pd.testing.assert_frame_equal(df, ref, check_dtype=False, check_categorical=False)
+        except AssertionError:
+            different.append(symbol)
+    return sorted(different)
+
+
+def compare_readers(path: str, readers: list, parquet: str = None, repeat: int = 3, only_essential_outputs: bool = True) -> dict:
+    """
+    Time the import of a file with each reader. Returns the best wall time, the largest peak RSS and the symbols
+    that differ from the import of the first reader.
+    """
+    context   = mp.get_context('spawn')
+    results   = {'file': path, 'readers': {}}
+    reference = None
+    for reader in readers:
+        measurements = []
+        for _ in range(repeat):
+            with context.Pool(1) as pool:
+                measurements.append(pool.apply(read_file, (path, reader, parquet, only_essential_outputs)))
+        data      = measurements[0]['data']
+        reference = data if reference is None else reference
+        results['readers'][reader] = {
+            'seconds'    : min(m['seconds'] for m in measurements),
+            'peak_rss_mb': max(m['peak_rss'] for m in measurements) / 2**20,
+            'symbols'    : len(data),
+            'rows'       : sum(len(df) for df in data.values()),
+            'differences': differences(data, reference),
+        }
+    return results
+
+
+def print_results(results: dict) -> None:
+    print(results['file'])
+    print(f"{'reader':<16}{'seconds':>10}{'peak RSS MB':>14}{'symbols':>10}{'rows':>12}  differences")
+    for reader, result in results['readers'].items():
+        print(f"{reader:<16}{result['seconds']:>10.3f}{result['peak_rss_mb']:>14.1f}{result['symbols']:>10}{result['rows']:>12}  {', '.join(result['differences']) or '-'}")
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the .gdx reader backends of the toolbox on the same file.')
+    parser.add_argument('gdx_file')
+    parser.add_argument('--readers', nargs='+', default=['gams.transfer', 'gdxpds'], choices=['gams.transfer', 'gdxpds', 'parquet'])
+    parser.add_argument('--parquet', help='Parquet dataset with the file exported (for the "parquet" reader)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--all-outputs', action='store_true', help='import all result symbols, not only the essential outputs')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    args = parser.parse_args()
+
+    results = compare_readers(args.gdx_file, args.readers, args.parquet, args.repeat, not args.all_outputs)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
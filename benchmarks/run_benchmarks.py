@@ -0,0 +1,158 @@
+"""
+Benchmarks of the toolbox on synthetic data, e.g.
+
+    python benchmarks/run_benchmarks.py --regions 10 --processes 1000 --years 9 --scenarios 5 --output results.json
+
+Each stage (cleaning, aggregations, figures) is run in a fresh process, so that its peak memory (RSS) is measured
+separately. The memory used by the input data is reported as "RSS before".
+Reading the .gdx file itself is not included, so GAMS is not needed.
+"""
+import argparse, json, os, pickle, resource, sys, tempfile, time
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_scenarios
+
+
+STAGES = ['clean', 'aggregate', 'figures']
+
+
+def memory_status(field: str) -> int:
+    """
+    Field of /proc/self/status in bytes, e.g. "VmRSS" (current resident memory) or "VmHWM" (peak resident memory).
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident memory of this process to the current one (Linux only). Returns False if not possible.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> int:
+    """
+    Peak resident memory of this process in bytes.
+    """
+    if os.path.exists('/proc/self/status'):
+        return memory_status('VmHWM')
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def clean(runs: dict, compact: bool) -> None:
+    from toolbox.import_gdx import clean_gdx_data, compact_dtypes
+    for name in list(runs):
+        runs[name] = clean_gdx_data(runs[name])
+        if compact:
+            runs[name] = compact_dtypes(runs[name])
+    return
+
+
+def aggregate(runs: dict, compact: bool) -> None:
+    from toolbox import Ensemble, calculate_total_netemissions_co2eq
+    from toolbox.output_index import get_output_index
+    from toolbox.time_integration import cumulative_sum
+    for gdx_data in runs.values():
+        calculate_total_netemissions_co2eq(gdx_data)
+        get_output_index(gdx_data).matrix(commodity='ELECGen')
+        cumulative_sum(gdx_data['LU_clear_pri'], groupby='biome')
+    ensemble = Ensemble(runs)
+    ensemble.aggregate('OutputAnnualByProcess', by=['scenario', 'year', 'commodity'])
+    calculate_total_netemissions_co2eq(ensemble)
+    return
+
+
+def figures(runs: dict, compact: bool) -> None:
+    from toolbox.report import render_figures, STANDARD_FIGURES
+    with tempfile.TemporaryDirectory() as folder:
+        for name, gdx_data in runs.items():
+            _, _, errors = render_figures(name, gdx_data, os.path.join(folder, name), ['png'], list(STANDARD_FIGURES), 100)
+            if errors:
+                raise RuntimeError(f"Rendering {list(errors)} of {name} failed:\n" + '\n'.join(errors.values()))
+    return
+
+
+def run_stage(stage: str, data_file: str, compact: bool) -> dict:
+    """
+    Run a stage on the data pickled in "data_file". Runs in a fresh process.
+    """
+    with open(data_file, 'rb') as f:
+        runs = pickle.load(f)
+    # without resetting, the peak would include the temporary memory of unpickling the data
+    rss_before = memory_status('VmRSS') if reset_peak_rss() else peak_rss()
+    start = time.perf_counter()
+    globals()[stage](runs, compact)
+    return {'seconds': time.perf_counter() - start, 'peak_rss': peak_rss(), 'rss_before': rss_before}
+
+
+def run_benchmarks(regions: int = 1, processes: int = 100, years: int = 9, scenarios: int = 1, repeat: int = 3, compact: bool = False, stages: list = STAGES) -> dict:
+    """
+    Time the stages on synthetic data of the given size. Returns the best wall time and the largest peak RSS of each stage.
+    """
+    sizes   = {'regions': regions, 'processes': processes, 'years': years, 'scenarios': scenarios, 'compact': compact}
+    results = {'sizes': sizes, 'stages': {}}
+    context = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory() as folder:
+        raw_file   = os.path.join(folder, 'raw.pkl')
+        clean_file = os.path.join(folder, 'clean.pkl')
+        runs = synthetic_scenarios(scenarios, regions=regions, processes=processes, years=years)
+        results['rows'] = sum(len(df) for gdx_data in runs.values() for df in gdx_data.values())
+        with open(raw_file, 'wb') as f:
+            pickle.dump(runs, f)
+        clean(runs, compact)
+        with open(clean_file, 'wb') as f:
+            pickle.dump(runs, f)
+        del runs
+
+        for stage in stages:
+            data_file = raw_file if stage == 'clean' else clean_file
+            measurements = []
+            for _ in range(repeat):
+                with context.Pool(1) as pool:
+                    measurements.append(pool.apply(run_stage, (stage, data_file, compact)))
+            results['stages'][stage] = {
+                'seconds'    : min(m['seconds'] for m in measurements),
+                'peak_rss_mb': max(m['peak_rss'] for m in measurements) / 2**20,
+                'data_rss_mb': max(m['rss_before'] for m in measurements) / 2**20,
+            }
+    return results
+
+
+def print_results(results: dict) -> None:
+    print(', '.join(f"{key}={value}" for key, value in results['sizes'].items()) + f", rows={results['rows']}")
+    print(f"{'stage':<12}{'seconds':>10}{'peak RSS MB':>14}{'RSS before MB':>16}")
+    for stage, result in results['stages'].items():
+        print(f"{stage:<12}{result['seconds']:>10.3f}{result['peak_rss_mb']:>14.1f}{result['data_rss_mb']:>16.1f}")
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the toolbox on synthetic SuCCESs results.')
+    parser.add_argument('--regions', type=int, default=1)
+    parser.add_argument('--processes', type=int, default=100)
+    parser.add_argument('--years', type=int, default=9)
+    parser.add_argument('--scenarios', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compact', action='store_true', help='use compact data types (see toolbox.import_gdx.compact_dtypes)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--output', help='save the results to this JSON file')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.regions, args.processes, args.years, args.scenarios, args.repeat, args.compact, args.stages)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,86 @@
+"""
+Startup time of the toolbox, e.g.
+
+    python benchmarks/startup.py --repeat 10 --workers 8 --output startup.json
+
+Times "import toolbox" and the first use of the import and plotting functions in fresh interpreters, and the time
+to start a pool of spawned worker processes that each import a .gdx batch function, as in "import_gdx_files".
+"""
+import argparse, json, os, statistics, subprocess, sys, time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# code run in a fresh interpreter for each case: {case: code}
+CASES = {
+    'import toolbox'           : 'import toolbox',
+    'toolbox.import_gdx_file'  : 'import toolbox; toolbox.import_gdx_file',
+    'toolbox.plot_deltaT'      : 'import toolbox; toolbox.plot_deltaT',
+    'toolbox.render_report'    : 'import toolbox; toolbox.render_report',
+}
+
+
+def time_case(code: str, repeat: int) -> dict:
+    """
+    Wall time of running "code" in a fresh interpreter, without the startup time of the interpreter itself.
+    Returns the median and the minimum seconds and the number of loaded modules.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    probe = f"import time, sys; start = time.perf_counter(); {code}; print(time.perf_counter() - start, len(sys.modules))"
+    seconds, modules = [], None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', probe], env=env, capture_output=True, text=True, check=True).stdout.split()
+        seconds.append(float(output[0]))
+        modules = int(output[1])
+    return {'median': statistics.median(seconds), 'min': min(seconds), 'modules': modules}
+
+
+def worker_ready() -> int:
+    # what a worker of "import_gdx_files" loads before reading its first file
+    import toolbox.batch
+    return os.getpid()
+
+
+def time_workers(workers: int, repeat: int) -> dict:
+    """
+    Time to start a pool of spawned worker processes until each has loaded the batch import functions.
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(worker_ready) for _ in range(workers)]
+            for future in futures:
+                future.result()
+        seconds.append(time.perf_counter() - start)
+    return {'median': statistics.median(seconds), 'min': min(seconds), 'workers': workers}
+
+
+def run_startup_benchmarks(repeat: int = 5, workers: int = 4) -> dict:
+    results = {case: time_case(code, repeat) for case, code in CASES.items()}
+    results['worker pool'] = time_workers(workers, repeat)
+    return results
+
+
+def print_results(results: dict) -> None:
+    print(f"{'case':<28}{'median s':>10}{'min s':>10}{'modules':>10}")
+    for case, result in results.items():
+        print(f"{case:<28}{result['median']:>10.3f}{result['min']:>10.3f}{result.get('modules', ''):>10}")
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of the toolbox.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4, help='worker processes of the pool')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    args = parser.parse_args()
+
+    results = run_startup_benchmarks(args.repeat, args.workers)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+
+# Synthetic SuCCESs results shaped like the raw tables read from a .gdx file by gdxpds, i.e. upper case set columns,
+# years as strings and the Level, Marginal, Lower, Upper and Scale columns of variables.
+# Only the symbols and elements used by the toolbox are named like in the model, the rest is filler to scale the data.
+ELECTRICITY_PROCESSES = ['ELEC_Coal','ELEC_OilL','ELEC_GasT','ELEC_BioM','ELEC_Wste','ELEC_Fiss','ELEC_Hydr','ELEC_Wnd1','ELEC_SPV1','ELEC_BCCS','ELEC_CCCS','ELEC_GCCS']
+PASSENGER_PROCESSES   = ['TRAN_PASS_' + mode for mode in ['BusDiesel','BusBEV','CarGasoline','CarDiesel','CarHEV','CarPHEV','CarBEV','RailDiesel','RailElectric','AviationJetfuel_Int','AviationJetfuel_Dom','AviationBiofuel_Int','AviationBiofuel_Dom']]
+FREIGHT_PROCESSES     = ['TRAN_FRGT_' + mode for mode in ['ShipsHFO','ShipsMDO','ShipsLNG','ShipsBio','RailDiesel','RailElectric','TruckDiesel','TruckBEV','VanDiesel','VanBEV']]
+EMISSIONS             = ['CO2_FFI','CO2_LU','CO2_nat','CH4','N2O']
+BIOMES                = ['TropicalHumid','TropicalDry','TemperateHumid','TemperateDry','Boreal','Tundra','Semiarid','Desert','DesertCold','Unproductive']
+LANDUSES              = ['crops','pastr','primf','secdf','primn','secdn','urban']
+LIVESTOCK_PRODUCTS    = ['LVST_milk','LVST_beef','LVST_eggs','LVST_pork','LVST_poultry','LVST_shoat']
+AGE_CLASSES           = [f'age{i}' for i in range(1, 16)]
+
+
+def variable(rng, sets: dict) -> pd.DataFrame:
+    """
+    Table of a variable over the product of the "sets", e.g. {"R": regions, "T": years}, with random levels.
+    """
+    df = pd.MultiIndex.from_product(list(sets.values()), names=list(sets)).to_frame(index=False)
+    df['Level']    = rng.random(len(df)) * 100
+    df['Marginal'] = 0.
+    df['Lower']    = 0.
+    df['Upper']    = np.inf
+    df['Scale']    = 1.
+    return df
+
+
+def synthetic_gdx_data(regions: int = 1, processes: int = 100, years: int = 9, seed: int = 0) -> dict:
+    """
+    Raw gdx data of one synthetic model run.
+    - "regions" number of regions of the energy system tables
+    - "processes" number of processes in "OutputAnnualByProcess", at least the named electricity and transport processes
+    - "years" number of model years, 10 years apart from 2020
+    """
+    rng     = np.random.default_rng(seed)
+    R       = [f'R{i}' for i in range(1, regions + 1)]
+    T       = [str(year) for year in range(2020, 2020 + 10 * years, 10)]
+    filler  = max(processes - len(ELECTRICITY_PROCESSES) - len(PASSENGER_PROCESSES) - len(FREIGHT_PROCESSES), 0)
+    other   = [f'PROC_{i}' for i in range(filler)]
+    data    = {}
+
+    data['OutputAnnualByProcess'] = pd.concat([
+        variable(rng, {'R': R, 'PROCESS': ELECTRICITY_PROCESSES, 'COMMODITY': ['ELECGen'], 'T': T}),
+        variable(rng, {'R': R, 'PROCESS': PASSENGER_PROCESSES, 'COMMODITY': ['PKM'], 'T': T}),
+        variable(rng, {'R': R, 'PROCESS': FREIGHT_PROCESSES, 'COMMODITY': ['TKM'], 'T': T}),
+        # every filler process produces two commodities
+        variable(rng, {'R': R, 'PROCESS': other, 'COMMODITY': ['COMM_A', 'COMM_B'], 'T': T}),
+    ], ignore_index=True)
+    data['OutputAnnual']    = data['OutputAnnualByProcess'].groupby(['R','COMMODITY','T'], as_index=False)[['Level','Marginal','Lower','Upper','Scale']].sum()
+    data['InputAnnualByProcess'] = variable(rng, {'R': R, 'PROCESS': other, 'COMMODITY': ['COMM_A'], 'T': T})
+    data['CapacityTotal']   = variable(rng, {'R': R, 'PROCESS': ELECTRICITY_PROCESSES + other, 'T': T})
+    data['EmissionAnnual']  = variable(rng, {'EMISSION': EMISSIONS, 'T': T})
+    data['CLIM_DeltaT']     = variable(rng, {'T': T})
+    data['LU_AreaByUse']    = variable(rng, {'T': T, 'use': LANDUSES})[['T','use','Level']].rename(columns={'Level': 'Value'})
+    data['LU_Area_SecdF']   = variable(rng, {'T': T, 'pool': BIOMES, 'age': AGE_CLASSES})
+    data['LU_clear_sec']    = variable(rng, {'T': T, 'pool': BIOMES, 'age': AGE_CLASSES})
+    data['LU_clear_pri']    = variable(rng, {'T': T, 'pool': BIOMES})
+    data['LVST_product_output'] = variable(rng, {'T': T, 'lvst_products': LIVESTOCK_PRODUCTS})
+
+    # symbols removed by the cleaning: equations, input data, sets, empty and non-essential symbols
+    data['EQ_balance']      = variable(rng, {'R': R, 'COMMODITY': ['COMM_A', 'COMM_B'], 'T': T})
+    data['data_demand']     = variable(rng, {'R': R, 'T': T})
+    data['t']               = pd.DataFrame({'*': T, 'Text': ''})
+    data['p']               = pd.DataFrame({'*': ELECTRICITY_PROCESSES + other, 'Text': ''})
+    data['Objective']       = variable(rng, {'R': R})
+    data['EmptyResult']     = pd.DataFrame({'T': [], 'Level': []})
+    data['DebugVariable']   = variable(rng, {'R': R, 'PROCESS': other, 'T': T})
+    return data
+
+
+def synthetic_scenarios(scenarios: int = 1, **sizes) -> dict:
+    """
+    Raw gdx data of "scenarios" synthetic runs by scenario name, e.g. {"run_1": {...}, ...}. See "synthetic_gdx_data".
+    """
+    return {f'run_{i}': synthetic_gdx_data(seed=i, **sizes) for i in range(1, scenarios + 1)}
@@ -0,0 +1,93 @@
+import os, pickle
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_gdx_data
+from toolbox.import_gdx import GdxReader
+
+
+class PickleReader(GdxReader):
+    """
+    Reads "gdx files" that are pickled dictionaries of cleaned tables, so that the tests do not need GAMS.
+    A file with "crash" in its name kills the worker process reading it, as a crash in the GDX library would.
+    """
+    name    = 'pickle'
+    cleaned = True
+
+    def available(self) -> bool:
+        return True
+
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        return {symbol: len(df) for symbol, df in self.load(path_to_gdx_file).items()}
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        if 'crash' in os.path.basename(path_to_gdx_file):
+            os._exit(1)
+        for symbol, df in self.load(path_to_gdx_file).items():
+            if keeps is None or keeps(symbol, len(df)):
+                yield symbol, df.copy()
+
+    @staticmethod
+    def load(path_to_gdx_file: str) -> dict:
+        if not os.path.isfile(path_to_gdx_file):
+            raise FileNotFoundError(f"No such .gdx file: {path_to_gdx_file}")
+        with open(path_to_gdx_file, 'rb') as f:
+            return pickle.load(f)
+
+
+class RawReader(GdxReader):
+    """
+    Serves the raw tables of a synthetic run (see "benchmarks/synthetic.py") as read from a .gdx file, and lists the symbols read.
+    """
+    name = 'raw'
+
+    def __init__(self):
+        self.raw   = synthetic_gdx_data(regions=2, processes=40)
+        self.reads = []
+
+    def available(self) -> bool:
+        return True
+
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        return {symbol: len(df) for symbol, df in self.raw.items()}
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        for symbol, df in self.raw.items():
+            if keeps is None or keeps(symbol, len(df)):
+                self.reads.append(symbol)
+                yield symbol, df.copy()
+
+
+YEARS = list(range(2020, 2101, 10))
+
+
+def make_run(seed: int = 0) -> dict:
+    """
+    Small gdx data of a run with emissions, temperature and electricity production.
+    """
+    rng = np.random.default_rng(seed)
+    emissions = pd.DataFrame([(emission, year, rng.uniform(1, 100)) for emission in ['CO2_FFI', 'CO2_LU', 'CH4', 'N2O'] for year in YEARS],
+                             columns=['emission', 'year', 'level'])
+    output = pd.DataFrame([('R1', process, 'ELECGen', year, rng.uniform(1, 100)) for process in ['ELEC_Coal', 'ELEC_SPV1', 'ELEC_Wnd1'] for year in YEARS],
+                          columns=['region', 'process', 'commodity', 'year', 'level'])
+    return {
+        'EmissionAnnual'        : emissions,
+        'CLIM_DeltaT'           : pd.DataFrame({'year': YEARS, 'level': rng.uniform(1, 3, len(YEARS))}),
+        'OutputAnnualByProcess' : output,
+    }
+
+
+@pytest.fixture
+def reader():
+    return PickleReader()
+
+
+@pytest.fixture
+def write_run(tmp_path):
+    def write(name: str, gdx_data: dict = None, seed: int = 0) -> str:
+        path = str(tmp_path / f"{name}.gdx")
+        with open(path, 'wb') as f:
+            pickle.dump(make_run(seed) if gdx_data is None else gdx_data, f)
+        return path
+    return write
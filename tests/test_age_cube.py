@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from toolbox.age_cube import AgeCube, get_age_cube
+from toolbox.errors import MissingYearError
+
+
+@pytest.fixture
+def df():
+    rng  = np.random.default_rng(0)
+    rows = [(year, biome, age, rng.uniform(0, 10)) for year in [2020, 2030, 2050] for biome in ['Boreal', 'Tundra'] for age in [1, 2, 5]]
+    df   = pd.DataFrame(rows, columns=['year', 'biome', 'age', 'level'])
+    # no Tundra forest in 2050: its mean age is undefined
+    return df[~((df['year'] == 2050) & (df['biome'] == 'Tundra'))].reset_index(drop=True)
+
+
+def weighted_mean_age(df: pd.DataFrame, by: list) -> pd.Series:
+    grouped = df.assign(weighted=df['age'] * df['level']).groupby(by)
+    return grouped['weighted'].sum() / grouped['level'].sum()
+
+
+def test_mean_age_by_year(df):
+    cube = AgeCube(df, 'LU_Area_SecdF')
+    pd.testing.assert_series_equal(cube.mean_age(), weighted_mean_age(df, ['year']), check_names=False)
+
+
+def test_mean_age_by_year_and_biome(df):
+    mean = AgeCube(df, 'LU_Area_SecdF').mean_age(by=('year', 'biome'))
+    assert np.isnan(mean.loc[(2050, 'Tundra')])
+    expected = weighted_mean_age(df, ['year', 'biome'])
+    pd.testing.assert_series_equal(mean.dropna(), expected, check_names=False)
+
+
+def test_age_shares(df):
+    shares   = AgeCube(df, 'LU_Area_SecdF').age_shares(by='year')
+    area     = df.pivot_table(index='year', columns='age', values='level', aggfunc='sum')
+    expected = area.div(area.sum(axis=1), axis=0)
+    pd.testing.assert_frame_equal(shares, expected, check_names=False, check_column_type=False)
+    np.testing.assert_allclose(shares.sum(axis=1), 1)
+
+
+def test_selection(df):
+    cube = get_age_cube({'LU_Area_SecdF': df})
+    assert cube is get_age_cube({'LU_Area_SecdF': df})
+    boreal = cube.sel(year=2030, biome='Boreal')
+    assert boreal.axes == ['age']
+    np.testing.assert_allclose(boreal.values, df[(df['year'] == 2030) & (df['biome'] == 'Boreal')]['level'])
+    with pytest.raises(MissingYearError):
+        cube.sel(year=2040)
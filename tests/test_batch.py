@@ -0,0 +1,39 @@
+from toolbox.batch import import_gdx_files
+
+
+def test_failed_files_do_not_stop_the_batch(write_run, reader):
+    paths = [write_run(f"run_{i}", seed=i) for i in range(3)] + [write_run('missing')]
+    paths[-1] = paths[-1].replace('missing', 'not_there')
+    result = import_gdx_files(paths, processes=2, reader=reader, progress=None)
+    assert list(result) == ['run_0', 'run_1', 'run_2']
+    assert list(result.errors) == ['not_there']
+    assert 'FileNotFoundError' in result.errors['not_there']
+
+
+def test_crashing_worker_does_not_stop_the_batch(write_run, reader):
+    paths = [write_run('run_0'), write_run('crash'), write_run('run_1', seed=1), write_run('run_2', seed=2)]
+    # one file at a time, so that only the crashing file is in flight when its worker dies
+    result = import_gdx_files(paths, processes=2, max_in_flight=1, reader=reader, progress=None)
+    assert list(result) == ['run_0', 'run_1', 'run_2']
+    assert list(result.errors) == ['crash']
+    assert 'worker process died' in result.errors['crash']
+
+
+def test_crashing_worker_fails_only_the_files_in_flight(write_run, reader):
+    paths  = [write_run(f"run_{i}", seed=i) for i in range(4)] + [write_run('crash')] + [write_run(f"run_{i}", seed=i) for i in range(4, 8)]
+    result = import_gdx_files(paths, processes=2, max_in_flight=2, reader=reader, progress=None)
+    assert list(result) == [f"run_{i}" for i in range(8)]
+    assert list(result.errors) == ['crash']
+    assert 'worker process died' in result.errors['crash']
+
+
+def test_crash_among_the_last_files(write_run, reader):
+    # the crash surfaces while the last files are being finished
+    paths    = [write_run(f"run_{i}", seed=i) for i in range(3)] + [write_run('crash')]
+    progress = []
+    result   = import_gdx_files(paths, processes=2, max_in_flight=4, reader=reader, progress=lambda *args: progress.append(args))
+    assert list(result) == ['run_0', 'run_1', 'run_2']
+    assert list(result.errors) == ['crash']
+    # one report per file
+    assert [done for done, total, scenario, error in progress] == [1, 2, 3, 4]
+    assert sorted(scenario for done, total, scenario, error in progress) == ['crash', 'run_0', 'run_1', 'run_2']
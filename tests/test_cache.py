@@ -0,0 +1,80 @@
+import os
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from toolbox.cache import import_gdx_file_cached, clear_gdx_cache, gdx_cache_folder
+
+from conftest import PickleReader, make_run
+
+
+class CountingReader(PickleReader):
+    """
+    Counts the reads of .gdx files, i.e. the imports that did not come from the cache.
+    """
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        self.reads += 1
+        return super().read(path_to_gdx_file, keeps)
+
+
+@pytest.fixture
+def counting_reader():
+    return CountingReader()
+
+
+def import_cached(path, cache_dir, reader, **kwargs):
+    return import_gdx_file_cached(path, cache_dir=str(cache_dir), verbose=False, lazy=False, reader=reader, **kwargs)
+
+
+def test_repeated_imports_read_the_cache(tmp_path, write_run, counting_reader):
+    path = write_run('run_1')
+    first  = import_cached(path, tmp_path / 'cache', counting_reader)
+    second = import_cached(path, tmp_path / 'cache', counting_reader)
+    assert counting_reader.reads == 1
+    pd.testing.assert_frame_equal(first['EmissionAnnual'], second['EmissionAnnual'])
+    pd.testing.assert_frame_equal(second['EmissionAnnual'], make_run(0)['EmissionAnnual'], check_dtype=False, check_categorical=False)
+
+
+def test_cache_is_renewed_when_the_file_changes(tmp_path, write_run, counting_reader):
+    path = write_run('run_1', seed=0)
+    import_cached(path, tmp_path / 'cache', counting_reader)
+    stat = os.stat(path)
+    write_run('run_1', seed=1)
+    # same size, so only the modification time tells the files apart
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    gdx_data = import_cached(path, tmp_path / 'cache', counting_reader)
+    assert counting_reader.reads == 2
+    assert gdx_data['CLIM_DeltaT']['level'].tolist() == pytest.approx(make_run(1)['CLIM_DeltaT']['level'].tolist())
+
+
+def test_content_hash_ignores_touching_the_file(tmp_path, write_run, counting_reader):
+    path = write_run('run_1')
+    import_cached(path, tmp_path / 'cache', counting_reader, hash_content=True)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    import_cached(path, tmp_path / 'cache', counting_reader, hash_content=True)
+    assert counting_reader.reads == 1
+
+
+def test_cache_is_renewed_when_the_options_change(tmp_path, write_run, counting_reader):
+    path = write_run('run_1')
+    import_cached(path, tmp_path / 'cache', counting_reader, float32=False)
+    import_cached(path, tmp_path / 'cache', counting_reader, float32=True)
+    assert counting_reader.reads == 2
+
+
+def test_clear_gdx_cache(tmp_path, write_run, counting_reader):
+    paths = [write_run('run_1'), write_run('run_2', seed=1)]
+    for path in paths:
+        import_cached(path, tmp_path / 'cache', counting_reader)
+    clear_gdx_cache(paths[0], cache_dir=str(tmp_path / 'cache'))
+    assert not os.path.exists(gdx_cache_folder(paths[0], str(tmp_path / 'cache')))
+    assert os.path.exists(gdx_cache_folder(paths[1], str(tmp_path / 'cache')))
+    import_cached(paths[0], tmp_path / 'cache', counting_reader)
+    assert counting_reader.reads == 3
+
+    clear_gdx_cache(cache_dir=str(tmp_path / 'cache'))
+    assert not os.path.exists(tmp_path / 'cache')
@@ -0,0 +1,57 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_run, YEARS
+from toolbox.climate_emulator import ClimateEmulator, GASES, emulate_deltaT, run_arrays
+from toolbox.ensemble import Ensemble
+
+# Mt / year of the emissions, roughly as in the model
+MAGNITUDES = {'CO2_FFI': 400, 'CO2_LU': 50, 'CH4': 3, 'N2O': 0.1}
+TRUTH      = ClimateEmulator(YEARS, {'CO2sum': 1.2, 'CH4': 0.8, 'N2O': 1.0}, offset=1.1, drift=0.004)
+
+
+def emulated_run(seed: int, noise: float = 0.0) -> dict:
+    """
+    A run with realistic emissions and the temperature of the "TRUTH" emulator, with optional noise (K).
+    """
+    run       = make_run(seed)
+    emissions = run['EmissionAnnual']
+    emissions['level'] *= emissions['emission'].map(MAGNITUDES)
+    deltaT    = TRUTH.evaluate(run_arrays(run)[2][0])
+    run['CLIM_DeltaT'] = pd.DataFrame({'year': YEARS, 'level': deltaT + np.random.default_rng(seed).normal(0, noise, len(YEARS))})
+    return run
+
+
+def test_calibration_recovers_known_parameters():
+    ensemble = Ensemble({f"run_{i}": emulated_run(i) for i in range(5)})
+    emulator = ClimateEmulator.calibrate(ensemble)
+    assert np.allclose(emulator.scale, TRUTH.scale)
+    assert np.isclose(emulator.offset, TRUTH.offset) and np.isclose(emulator.drift, TRUTH.drift)
+    assert (emulator.check(ensemble)['max_error'] < 1e-9).all()
+
+
+def test_noisy_ensemble_gives_nonnegative_scales_close_to_the_truth():
+    ensemble = Ensemble({f"run_{i}": emulated_run(i, noise=0.03) for i in range(30)})
+    emulator = ClimateEmulator.calibrate(ensemble, shared_scale=False)
+    assert (emulator.scale >= 0).all()
+    assert np.allclose(emulator.scale, TRUTH.scale, atol=0.3)
+
+
+def test_ill_conditioned_single_run_falls_back_to_a_shared_scale(caplog):
+    run = emulated_run(0, noise=0.03)
+    with caplog.at_level(logging.WARNING, logger='toolbox.climate_emulator'):
+        emulator = ClimateEmulator.calibrate(run)
+    assert 'cannot be told apart' in caplog.text
+    assert np.allclose(emulator.scale, emulator.scale[0]) and emulator.scale[0] >= 0
+    # removing the CH4 emissions cannot warm
+    deltaT = emulate_deltaT(run, np.array([[1, 1, 1], [1, 0, 1]]), emulator)
+    assert (deltaT[1] <= deltaT[0] + 1e-12).all()
+
+
+def test_emulate_deltaT_of_a_scenario_calibrates_to_the_ensemble():
+    ensemble = Ensemble({f"run_{i}": emulated_run(i) for i in range(5)})
+    deltaT   = emulate_deltaT(ensemble, {'CH4': 1.0}, scenario='run_2')
+    expected = ensemble.select('CLIM_DeltaT', scenario='run_2')['level'].to_numpy()
+    assert np.allclose(deltaT[0].to_numpy(), expected)
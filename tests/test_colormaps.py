@@ -0,0 +1,29 @@
+import numpy as np
+from matplotlib.colors import to_rgba
+
+from toolbox.colormaps import StyleRegistry
+
+
+def test_known_and_prefixed_labels():
+    styles = StyleRegistry()
+    assert np.allclose(styles.color('ELEC_Coal'), to_rgba('saddlebrown'))
+    assert np.allclose(styles.color('TRAN_PASS_CarBEV'), to_rgba('palegreen'))
+
+
+def test_unknown_processes_get_their_sector_color():
+    styles = StyleRegistry()
+    assert np.allclose(styles.color('ELEC_Geot'), to_rgba('tab:cyan'))
+    assert np.allclose(styles.color('TRAN_PASS_Hyperloop'), to_rgba('tab:blue'))
+
+
+def test_fallback_colors_are_stable():
+    colors = [StyleRegistry().palette(['Unknown', 'LVST_insects']) for _ in range(2)]
+    assert np.array_equal(*colors)
+
+
+def test_palettes_are_cached_and_follow_registered_colors():
+    styles = StyleRegistry()
+    labels = ['ELEC_Coal', 'ELEC_Geot']
+    assert styles.palette(labels) is styles.palette(labels)
+    styles.register('ELEC_Geot', 'darkorange')
+    assert np.allclose(styles.palette(labels)[1], to_rgba('darkorange'))
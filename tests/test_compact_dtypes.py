@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_gdx_data
+from toolbox.climate_and_emissions import calculate_total_netemissions_co2eq
+from toolbox.import_gdx import clean_gdx_data, compact_dtypes
+from toolbox.output_index import OutputIndex
+
+
+def cleaned() -> dict:
+    return clean_gdx_data(synthetic_gdx_data(regions=2, processes=40))
+
+
+@pytest.fixture
+def data():
+    return cleaned(), compact_dtypes(cleaned())
+
+
+def test_set_columns_share_categories(data):
+    plain, compact = data
+    processes = [compact[symbol]['process'].dtype for symbol in ['OutputAnnualByProcess', 'InputAnnualByProcess', 'CapacityTotal']]
+    assert all(isinstance(dtype, pd.CategoricalDtype) for dtype in processes)
+    assert processes[0] == processes[1] == processes[2]
+    assert set(processes[0].categories) == set().union(*(plain[symbol]['process'] for symbol in ['OutputAnnualByProcess', 'InputAnnualByProcess', 'CapacityTotal']))
+    assert compact['OutputAnnualByProcess']['region'].dtype == compact['CapacityTotal']['region'].dtype
+
+
+def test_years_and_values(data):
+    plain, compact = data
+    assert all(df['year'].dtype == 'int16' for df in compact.values())
+    assert compact['LU_Area_SecdF']['age'].dtype == 'int16'
+    assert compact['OutputAnnualByProcess']['level'].dtype == 'float64'
+    assert compact['LU_AreaByUse']['value'].dtype == 'float64'
+
+    small = compact_dtypes(cleaned(), float32=True)
+    assert small['OutputAnnualByProcess']['level'].dtype == 'float32'
+    assert small['LU_AreaByUse']['value'].dtype == 'float32'
+    for symbol, df in plain.items():
+        pd.testing.assert_frame_equal(small[symbol], df, check_dtype=False, check_categorical=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize('float32', [False, True])
+def test_results_match_the_plain_data_types(float32):
+    plain, compact = cleaned(), compact_dtypes(cleaned(), float32=float32)
+    tolerance = 1e-5 if float32 else 1e-12
+    np.testing.assert_allclose(calculate_total_netemissions_co2eq(compact), calculate_total_netemissions_co2eq(plain), rtol=tolerance)
+
+    expected = OutputIndex(plain['OutputAnnualByProcess'])
+    result   = OutputIndex(compact['OutputAnnualByProcess'])
+    for commodity in ['ELECGen', 'PKM', 'COMM_B']:
+        pd.testing.assert_frame_equal(result.matrix(commodity=commodity, region='R1'), expected.matrix(commodity=commodity, region='R1'),
+                                      check_index_type=False, check_column_type=False, rtol=tolerance)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_run
+from toolbox.climate_and_emissions import calculate_total_netemissions_co2eq
+from toolbox.derived import derived, invalidate
+from toolbox.import_gdx import LazyGdxData
+
+
+def test_derived_is_computed_once_per_table():
+    df    = pd.DataFrame({'year': [2020, 2030], 'level': [1.0, 2.0]})
+    calls = []
+    compute = lambda df: calls.append(1) or df['level'].sum()
+    assert derived(df, 'total', compute) == 3
+    assert derived(df, 'total', compute) == 3
+    assert len(calls) == 1
+
+
+def test_invalidate_after_changing_values_in_place():
+    gdx_data = make_run()
+    before   = calculate_total_netemissions_co2eq(gdx_data)
+    # swapping the CH4 and N2O emissions keeps the number of rows and the sum of the levels
+    emissions = gdx_data['EmissionAnnual']
+    ch4, n2o  = (emissions['emission'] == 'CH4').to_numpy(), (emissions['emission'] == 'N2O').to_numpy()
+    levels    = emissions['level'].to_numpy().copy()
+    emissions.loc[ch4, 'level'], emissions.loc[n2o, 'level'] = levels[n2o], levels[ch4]
+
+    invalidate(gdx_data)
+    after    = calculate_total_netemissions_co2eq(gdx_data)
+    expected = calculate_total_netemissions_co2eq({'EmissionAnnual': emissions.copy()})
+    assert not np.allclose(before, after)
+    assert np.allclose(after, expected)
+
+
+def test_replaced_and_reshaped_tables_are_recomputed():
+    gdx_data = make_run()
+    before   = calculate_total_netemissions_co2eq(gdx_data)
+    gdx_data['EmissionAnnual'] = gdx_data['EmissionAnnual'].assign(level=lambda df: df['level'] * 2)
+    assert np.allclose(calculate_total_netemissions_co2eq(gdx_data), before * 2)
+
+    emissions = gdx_data['EmissionAnnual']
+    emissions.loc[len(emissions)] = ['CH4', 2110, 1000.0]
+    assert 2110 in calculate_total_netemissions_co2eq(gdx_data).index
+
+
+def test_invalidate_lazy_data_only_touches_loaded_tables():
+    run  = make_run()
+    lazy = LazyGdxData('run.gdx', list(run), reader=lambda path, symbol: run[symbol])
+    table = lazy['EmissionAnnual']
+    derived(table, 'total', lambda df: df['level'].sum())
+    invalidate(lazy)
+    assert lazy.loaded.keys() == {'EmissionAnnual'}
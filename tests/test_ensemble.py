@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_run
+from toolbox.ensemble import Ensemble
+from toolbox.import_gdx import compact_dtypes
+
+
+@pytest.fixture
+def runs():
+    return {f"run_{i}": make_run(i) for i in range(3)}
+
+
+def expected_rows(run: dict, symbol: str, **filters) -> pd.DataFrame:
+    df = run[symbol]
+    for column, value in filters.items():
+        df = df[df[column] == value]
+    return df.reset_index(drop=True)
+
+
+def test_select_returns_the_rows_of_a_scenario(runs):
+    ensemble = Ensemble(runs)
+    selected = ensemble.select('OutputAnnualByProcess', scenario='run_1', process='ELEC_Coal')
+    expected = expected_rows(runs['run_1'], 'OutputAnnualByProcess', process='ELEC_Coal')
+    pd.testing.assert_frame_equal(selected.drop(columns='scenario').reset_index(drop=True), expected)
+
+
+@pytest.mark.parametrize('stacked', [False, True])
+def test_add_scenario_after_stacking(runs, stacked):
+    first = {name: runs[name] for name in ['run_0', 'run_1']}
+    if stacked:
+        ensemble = Ensemble.from_stacked({symbol: Ensemble(first)[symbol] for symbol in runs['run_0']})
+    else:
+        ensemble = Ensemble(first)
+        ensemble['OutputAnnualByProcess']
+    ensemble.add_scenario('run_2', runs['run_2'])
+
+    assert ensemble.scenarios == ['run_0', 'run_1', 'run_2']
+    for name in ensemble.scenarios:
+        selected = ensemble.select('OutputAnnualByProcess', scenario=name)
+        assert (selected['scenario'] == name).all()
+        pd.testing.assert_frame_equal(selected.drop(columns='scenario').reset_index(drop=True), runs[name]['OutputAnnualByProcess'])
+
+
+def test_replaced_scenario_keeps_its_position(runs):
+    ensemble = Ensemble(runs)
+    ensemble['CLIM_DeltaT']
+    replacement = make_run(10)
+    ensemble.add_scenario('run_0', replacement)
+    assert ensemble.scenarios == ['run_0', 'run_1', 'run_2']
+    assert list(ensemble.offsets['CLIM_DeltaT']) == ensemble.scenarios
+    assert np.allclose(ensemble.select('CLIM_DeltaT', scenario='run_0')['level'], replacement['CLIM_DeltaT']['level'])
+
+
+@pytest.mark.parametrize('replaced', ['run_0', 'run_1', 'run_2'])
+def test_replaced_scenario_keeps_the_row_order(runs, replaced):
+    ensemble = Ensemble(runs)
+    ensemble['CLIM_DeltaT']
+    ensemble.add_scenario(replaced, make_run(10))
+    expected = Ensemble({name: make_run(10) if name == replaced else run for name, run in runs.items()})['CLIM_DeltaT']
+    pd.testing.assert_frame_equal(ensemble['CLIM_DeltaT'], expected)
+    bounds = [bound for start, stop in ensemble.offsets['CLIM_DeltaT'].values() for bound in (start, stop)]
+    assert bounds == sorted(bounds) and bounds[0] == 0 and bounds[-1] == len(expected)
+
+
+def test_stacked_ensemble_does_not_stack_partial_symbols(runs):
+    first    = {name: runs[name] for name in ['run_0', 'run_1']}
+    ensemble = Ensemble.from_stacked({'CLIM_DeltaT': Ensemble(first)['CLIM_DeltaT']})
+    ensemble.add_scenario('run_2', runs['run_2'])
+    assert ensemble['CLIM_DeltaT']['scenario'].unique().tolist() == ['run_0', 'run_1', 'run_2']
+    # only run_2 has a run to stack EmissionAnnual from
+    with pytest.raises(KeyError, match='EmissionAnnual'):
+        ensemble['EmissionAnnual']
+
+
+def test_remove_scenario(runs):
+    ensemble = Ensemble(runs)
+    ensemble['CLIM_DeltaT']
+    ensemble.remove_scenario('run_1')
+    assert ensemble.scenarios == ['run_0', 'run_2']
+    assert list(ensemble['CLIM_DeltaT']['scenario'].cat.categories) == ['run_0', 'run_2']
+    assert np.allclose(ensemble.select('CLIM_DeltaT', scenario='run_2')['level'], runs['run_2']['CLIM_DeltaT']['level'])
+    assert len(ensemble.select('CLIM_DeltaT', scenario='run_1')) == 0
+
+
+def test_stack_does_not_change_the_runs():
+    runs = {'run_0': compact_dtypes(make_run(0)), 'run_1': compact_dtypes(make_run(1))}
+    runs['run_1']['OutputAnnualByProcess'] = runs['run_1']['OutputAnnualByProcess'].iloc[:9].copy()
+    runs['run_1']['OutputAnnualByProcess']['process'] = runs['run_1']['OutputAnnualByProcess']['process'].cat.remove_unused_categories()
+    before = list(runs['run_1']['OutputAnnualByProcess']['process'].cat.categories)
+    stacked = Ensemble(runs)['OutputAnnualByProcess']
+    assert isinstance(stacked['process'].dtype, pd.CategoricalDtype)
+    assert list(runs['run_1']['OutputAnnualByProcess']['process'].cat.categories) == before
@@ -0,0 +1,63 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from toolbox.commodities import plot_commodity_production, plot_commodity_by_process
+from toolbox.errors import ToolboxError, MissingSymbolError, MissingYearError, MissingCommodityError
+from toolbox.import_gdx import import_gdx_file, open_gdx_file
+from toolbox.landuse import plot_landuse
+
+from conftest import RawReader
+
+
+@pytest.fixture
+def gdx_data():
+    yield import_gdx_file('run.gdx', reader=RawReader(), verbose=False)
+    plt.close('all')
+
+
+def test_missing_year(gdx_data):
+    with pytest.raises(MissingYearError) as error:
+        plot_landuse(gdx_data, 2055)
+    assert isinstance(error.value, (ToolboxError, ValueError))
+    assert error.value.year == 2055 and error.value.symbol == 'LU_AreaByUse'
+    assert 'Available years are 2020-2100' in str(error.value)
+
+
+def test_missing_commodity(gdx_data):
+    with pytest.raises(MissingCommodityError) as error:
+        plot_commodity_production(gdx_data, ['ELECGen', 'NotACommodity'])
+    assert error.value.commodities == ['NotACommodity']
+    with pytest.raises(ValueError):
+        plot_commodity_by_process(gdx_data, 'NotACommodity')
+
+
+def test_missing_symbol():
+    lazy = open_gdx_file('run.gdx', reader=RawReader())
+    for data in [lazy, {}]:
+        with pytest.raises(KeyError):
+            data['NotASymbol']
+    with pytest.raises(MissingSymbolError) as error:
+        lazy['NotASymbol']
+    assert isinstance(error.value, ToolboxError)
+    # not quoted like other KeyErrors
+    assert str(error.value) == "Symbol NotASymbol not found in run.gdx."
+
+
+def test_errors_are_caught_as_toolbox_errors(gdx_data):
+    for plot, arguments in [(plot_landuse, [1990]), (plot_commodity_by_process, ['NotACommodity'])]:
+        with pytest.raises(ToolboxError):
+            plot(gdx_data, *arguments)
+
+
+def test_progress_is_reported_in_order():
+    reader   = RawReader()
+    progress = []
+    gdx_data = import_gdx_file('run.gdx', reader=reader, verbose=False, progress=lambda *args: progress.append(args))
+    # every symbol of the file, read or skipped, in the order of the file
+    assert [symbol for done, total, symbol in progress] == list(reader.raw)
+    assert [done for done, total, symbol in progress] == list(range(1, len(reader.raw) + 1))
+    assert {total for done, total, symbol in progress} == {len(reader.raw)}
+    assert reader.reads == list(gdx_data)
@@ -0,0 +1,52 @@
+import os
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from toolbox.export import export_gdx_files, read_parquet_symbol
+from toolbox.import_gdx import ParquetReader, import_gdx_file
+
+from conftest import make_run
+
+
+@pytest.fixture
+def dataset(tmp_path, write_run, reader):
+    paths  = [write_run('run_1', seed=1), write_run('run_2', seed=2)]
+    broken = tmp_path / 'broken.gdx'
+    broken.write_text('not a gdx file')
+    result = export_gdx_files(paths + [str(broken)], str(tmp_path / 'dataset'), progress=None, reader=reader)
+    return tmp_path / 'dataset', result
+
+
+def test_export_layout(dataset):
+    path, result = dataset
+    symbols = ['EmissionAnnual', 'CLIM_DeltaT', 'OutputAnnualByProcess']
+    assert result['symbols'] == {'run_1': symbols, 'run_2': symbols}
+    assert sorted(os.listdir(path)) == ['scenario=run_1', 'scenario=run_2']
+    for scenario in ['run_1', 'run_2']:
+        assert sorted(os.listdir(path / f"scenario={scenario}")) == sorted(f"symbol={symbol}" for symbol in symbols)
+        assert os.listdir(path / f"scenario={scenario}" / 'symbol=EmissionAnnual') == ['part-0.parquet']
+
+
+def test_export_errors_have_tracebacks(dataset):
+    path, result = dataset
+    assert list(result['errors']) == ['broken']
+    assert result['errors']['broken'].startswith('Traceback (most recent call last)')
+
+
+def test_parquet_reader_matches_the_gdx_import(dataset, tmp_path, reader):
+    path, result = dataset
+    for scenario in ['run_1', 'run_2']:
+        expected = import_gdx_file(str(tmp_path / f"{scenario}.gdx"), verbose=False, reader=reader)
+        exported = import_gdx_file(f"{scenario}.gdx", verbose=False, reader=ParquetReader(str(path)))
+        assert sorted(exported) == sorted(expected)
+        for symbol in expected:
+            pd.testing.assert_frame_equal(exported[symbol], expected[symbol])
+
+
+def test_read_parquet_symbol_stacks_the_scenarios(dataset):
+    path, result = dataset
+    stacked = read_parquet_symbol(str(path), 'CLIM_DeltaT')
+    expected = pd.concat([make_run(seed)['CLIM_DeltaT'].assign(scenario=f"run_{seed}") for seed in [1, 2]], ignore_index=True)
+    pd.testing.assert_frame_equal(stacked.sort_values(['scenario', 'year']).reset_index(drop=True), expected[stacked.columns])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from conftest import make_run
+from toolbox.ensemble import Ensemble
+from toolbox.errors import MissingElementError
+from toolbox.fan_chart import electricity_share
+
+
+@pytest.fixture
+def ensemble():
+    return Ensemble({f"run_{i}": make_run(i) for i in range(3)})
+
+
+def test_electricity_share_defaults_to_solar(ensemble):
+    share  = electricity_share(ensemble)
+    output = ensemble['OutputAnnualByProcess']
+    run    = output[output['scenario'] == 'run_1']
+    total  = run.groupby('year')['level'].sum()
+    solar  = run[run['process'] == 'ELEC_SPV1'].groupby('year')['level'].sum()
+    assert np.allclose(share.loc['run_1'].to_numpy(), (solar / total * 100).to_numpy())
+
+
+def test_unknown_process_raises(ensemble):
+    with pytest.raises(MissingElementError, match='ELEC_Solar'):
+        electricity_share(ensemble, process='ELEC_Solar')
@@ -0,0 +1,41 @@
+import numpy as np
+
+from conftest import make_run
+from toolbox.derived import invalidate
+from toolbox.flows import get_flow_graph
+
+
+def run_with_inputs(seed: int = 0) -> dict:
+    run    = make_run(seed)
+    inputs = run['OutputAnnualByProcess'].assign(process='TRAN_PASS_RailElectric')
+    run['InputAnnualByProcess'] = inputs
+    return run
+
+
+def input_total(graph, year: int) -> float:
+    return graph.matrix(year, kind='input')[2].sum()
+
+
+def test_flow_graph_is_memoized():
+    run = run_with_inputs()
+    assert get_flow_graph(run) is get_flow_graph(run)
+
+
+def test_flow_graph_follows_replaced_and_invalidated_inputs():
+    run   = run_with_inputs()
+    total = input_total(get_flow_graph(run), 2050)
+
+    run['InputAnnualByProcess'] = run['InputAnnualByProcess'].assign(level=lambda df: df['level'] * 2)
+    assert np.isclose(input_total(get_flow_graph(run), 2050), total * 2)
+
+    run['InputAnnualByProcess']['level'] *= 2
+    invalidate(run)
+    assert np.isclose(input_total(get_flow_graph(run), 2050), total * 4)
+
+
+def test_sector_flows_sum_the_processes():
+    run    = run_with_inputs()
+    graph  = get_flow_graph(run)
+    edges  = graph.edges(2050, by='sector')
+    output = run['OutputAnnualByProcess']
+    assert np.isclose(edges.loc[(edges['kind'] == 'output') & (edges['source'] == 'ELEC'), 'value'].sum(), output.loc[output['year'] == 2050, 'level'].sum())
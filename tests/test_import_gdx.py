@@ -0,0 +1,89 @@
+import re
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_gdx_data
+from toolbox.import_gdx import GdxReader, TransferReader, CleaningPlan, JUNK_DATA, clean_gdx_data, import_gdx_file, read_essential_outputs, unique_names
+
+
+def transfer_symbol(domains: list, records: pd.DataFrame):
+    return SimpleNamespace(dimension=len(domains), domain_names=domains, records=records)
+
+
+def test_repeated_domains_keep_their_columns():
+    records = pd.DataFrame({
+        'r_0'   : pd.Categorical(['EU', 'EU', 'US']),
+        'r_1'   : pd.Categorical(['US', 'CN', 'EU']),
+        't_2'   : pd.Categorical(['2020', '2030', '2020']),
+        'level' : [1.0, 2.0, 3.0],
+    })
+    df = TransferReader.gdxpds_layout(transfer_symbol(['r', 'r', 't'], records))
+    assert list(df.columns) == ['r', 'r_1', 't', 'Level']
+    assert list(df['r_1']) == ['US', 'CN', 'EU']
+
+    cleaned = CleaningPlan(only_essential_outputs=False).tidy('Trade', df)
+    assert list(cleaned.columns) == ['region', 'r_1', 'year', 'level']
+    assert list(cleaned['year']) == [2020, 2030, 2020]
+
+
+def test_unique_names():
+    assert unique_names(['*', '*']) == ['*', '*_1']
+    assert unique_names(['r', 't', 'r', 'r']) == ['r', 't', 'r_2', 'r_3']
+
+
+def test_reader_interface_is_abstract():
+    with pytest.raises(TypeError):
+        GdxReader()
+
+
+def test_import_with_a_custom_reader(write_run, reader):
+    gdx_data = import_gdx_file(write_run('run'), reader=reader, verbose=False)
+    assert {'EmissionAnnual', 'CLIM_DeltaT', 'OutputAnnualByProcess'} <= set(gdx_data)
+
+
+def clean_stepwise(response: dict, only_essential_outputs: bool) -> dict:
+    """
+    The cleaning steps of the toolbox before "CleaningPlan", one step over all tables at a time.
+    """
+    response = {key: df for key, df in response.items() if not df.empty}
+    response = {key: df for key, df in response.items() if not re.match("EQ_*", key) and not re.match("data_*", key) and key not in JUNK_DATA}
+    response = {key: df.drop(columns=['Marginal', 'Lower', 'Upper', 'Scale'], errors='ignore') for key, df in response.items()}
+    if only_essential_outputs:
+        essentials = read_essential_outputs()
+        response = {key: df for key, df in response.items() if key in essentials}
+    for key, df in response.items():
+        df = df.rename(columns=str.lower).rename(columns={'t': 'year', 'time': 'year', 'r': 'region', 'pool': 'biome', 'use': 'landuse'})
+        df['year'] = df['year'].astype(int)
+        if key in ['LU_Area_SecdF', 'LU_clear_sec']:
+            df['age'] = df['age'].astype(str).str.lstrip('age').astype(int)
+        response[key] = df
+    return response
+
+
+@pytest.mark.parametrize('only_essential_outputs', [True, False])
+def test_cleaning_matches_the_stepwise_cleaning(only_essential_outputs):
+    expected = clean_stepwise(synthetic_gdx_data(regions=2, processes=40), only_essential_outputs)
+    cleaned  = clean_gdx_data(synthetic_gdx_data(regions=2, processes=40), only_essential_outputs)
+    assert list(cleaned) == list(expected)
+    for key in expected:
+        pd.testing.assert_frame_equal(cleaned[key], expected[key])
+
+
+def test_cleaning_of_synthetic_results():
+    raw     = synthetic_gdx_data(regions=2, processes=40)
+    cleaned = clean_gdx_data(raw)
+    assert raw == {}
+    assert list(cleaned) == ['OutputAnnualByProcess', 'OutputAnnual', 'InputAnnualByProcess', 'CapacityTotal', 'EmissionAnnual', 'CLIM_DeltaT',
+                             'LU_AreaByUse', 'LU_Area_SecdF', 'LU_clear_sec', 'LU_clear_pri', 'LVST_product_output']
+    assert list(cleaned['OutputAnnualByProcess'].columns) == ['region', 'process', 'commodity', 'year', 'level']
+    assert list(cleaned['LU_AreaByUse'].columns) == ['year', 'landuse', 'value']
+    assert list(cleaned['LU_Area_SecdF'].columns) == ['year', 'biome', 'age', 'level']
+    assert all(df['year'].dtype == 'int64' for df in cleaned.values())
+    assert sorted(cleaned['LU_Area_SecdF']['age'].unique()) == list(range(1, 16))
+
+    # equations, input data, sets and empty symbols are dropped even with all outputs, non-essential symbols only without
+    everything = clean_gdx_data(synthetic_gdx_data(regions=2, processes=40), only_essential_outputs=False)
+    assert set(everything) - set(cleaned) == {'DebugVariable'}
+    assert not {'EQ_balance', 'data_demand', 't', 'p', 'Objective', 'EmptyResult'} & set(everything)
@@ -0,0 +1,76 @@
+import os
+import pandas as pd
+import pytest
+
+from toolbox.climate_and_emissions import calculate_total_netemissions_co2eq
+from toolbox.incremental import IncrementalEnsemble
+
+from conftest import make_run
+
+
+AGGREGATES = {
+    'co2eq'  : calculate_total_netemissions_co2eq,
+    'deltaT' : lambda gdx_data: gdx_data['CLIM_DeltaT'].set_index('year')['level'],
+}
+
+
+def shift_mtime(path: str, seconds: int = 1) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+    return
+
+
+@pytest.fixture
+def incremental(tmp_path, reader):
+    return IncrementalEnsemble(str(tmp_path), aggregates=AGGREGATES, hash_content=True, processes=1, progress=None, reader=reader)
+
+
+def test_refresh_follows_the_folder(tmp_path, write_run, incremental):
+    write_run('run_1', seed=1)
+    write_run('run_2', seed=2)
+    assert incremental.refresh() == {'added': ['run_1', 'run_2'], 'modified': [], 'removed': [], 'failed': []}
+    assert list(incremental.aggregate('co2eq').columns) == ['run_1', 'run_2']
+    pd.testing.assert_series_equal(incremental.aggregate('co2eq')['run_2'], calculate_total_netemissions_co2eq(make_run(2)), check_names=False)
+
+    # nothing changed
+    assert incremental.refresh() == {'added': [], 'modified': [], 'removed': [], 'failed': []}
+
+    # touched, same content
+    shift_mtime(write_run('run_1', seed=1))
+    assert incremental.refresh() == {'added': [], 'modified': [], 'removed': [], 'failed': []}
+
+    # modified and added
+    shift_mtime(write_run('run_1', seed=3), 2)
+    write_run('run_3', seed=4)
+    assert incremental.refresh() == {'added': ['run_3'], 'modified': ['run_1'], 'removed': [], 'failed': []}
+    assert list(incremental.aggregate('deltaT').columns) == ['run_1', 'run_2', 'run_3']
+    assert incremental.aggregate('deltaT')['run_1'].tolist() == make_run(3)['CLIM_DeltaT']['level'].tolist()
+    assert incremental.ensemble.scenarios == ['run_1', 'run_2', 'run_3']
+
+    # deleted
+    os.remove(tmp_path / 'run_2.gdx')
+    assert incremental.refresh() == {'added': [], 'modified': [], 'removed': ['run_2'], 'failed': []}
+    assert list(incremental.aggregate('co2eq').columns) == ['run_1', 'run_3']
+    assert incremental.ensemble.scenarios == ['run_1', 'run_3']
+
+
+def test_failed_files_are_retried_when_they_change(tmp_path, write_run, incremental):
+    write_run('run_1', seed=1)
+    with open(tmp_path / 'run_2.gdx', 'w') as f:
+        f.write('not a gdx file')
+    assert incremental.refresh() == {'added': ['run_1', 'run_2'], 'modified': [], 'removed': [], 'failed': ['run_2']}
+    assert list(incremental.errors) == ['run_2']
+    assert list(incremental.aggregate('co2eq').columns) == ['run_1']
+
+    shift_mtime(write_run('run_2', seed=2))
+    assert incremental.refresh() == {'added': [], 'modified': ['run_2'], 'removed': [], 'failed': []}
+    assert incremental.errors == {}
+    assert list(incremental.aggregate('co2eq').columns) == ['run_1', 'run_2']
+
+
+def test_options_are_passed_to_the_import(tmp_path, write_run, reader):
+    write_run('run_1', seed=1)
+    timing_dir = tmp_path / 'timing'
+    incremental = IncrementalEnsemble(str(tmp_path), aggregates=AGGREGATES, processes=1, progress=None, reader=reader, timing_dir=str(timing_dir))
+    assert incremental.refresh()['added'] == ['run_1']
+    assert os.listdir(timing_dir) == ['run_1.json']
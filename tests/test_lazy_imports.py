@@ -0,0 +1,43 @@
+import os, subprocess, sys
+
+import pytest
+
+import toolbox
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(code: str) -> set:
+    """
+    Top-level packages loaded after running "code" in a fresh interpreter.
+    """
+    probe  = f"import sys; {code}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    env    = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', probe], env=env, capture_output=True, text=True, check=True, cwd=ROOT).stdout
+    return set(output.split())
+
+
+def test_import_toolbox_loads_no_heavy_packages():
+    modules = loaded_modules('import toolbox')
+    assert 'toolbox' in modules
+    assert not {'matplotlib', 'pandas', 'pyarrow', 'numpy', 'seaborn'} & modules
+
+
+def test_import_functions_load_no_plotting_packages():
+    modules = loaded_modules('import toolbox; toolbox.import_gdx_file; toolbox.import_gdx_files')
+    assert 'pandas' in modules
+    assert not {'matplotlib', 'seaborn'} & modules
+
+
+@pytest.mark.parametrize('name', toolbox.__all__)
+def test_exported_names_resolve(name):
+    value = getattr(toolbox, name)
+    assert value is getattr(getattr(toolbox, toolbox.LOCATIONS[name]), name)
+    assert name in dir(toolbox)
+
+
+def test_submodules_and_unknown_names():
+    assert toolbox.derived.__name__ == 'toolbox.derived'
+    with pytest.raises(AttributeError):
+        toolbox.not_a_function
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from toolbox.errors import MissingSymbolError
+from toolbox.import_gdx import LazyGdxData, CleaningPlan, open_gdx_file
+
+from conftest import RawReader
+
+
+@pytest.fixture
+def reader():
+    return RawReader()
+
+
+def test_only_accessed_symbols_are_read_once(reader):
+    gdx_data = open_gdx_file('run.gdx', reader=reader)
+    assert reader.reads == []
+    assert 'CLIM_DeltaT' in gdx_data and 'EQ_balance' not in gdx_data and 'DebugVariable' not in gdx_data
+
+    gdx_data['CLIM_DeltaT']
+    gdx_data['CLIM_DeltaT']
+    gdx_data['LU_Area_SecdF']
+    assert reader.reads == ['CLIM_DeltaT', 'LU_Area_SecdF']
+    assert repr(gdx_data).endswith('2/11 symbols loaded)')
+
+
+def test_symbols_are_cleaned_one_by_one(reader):
+    gdx_data = open_gdx_file('run.gdx', reader=reader)
+    plan     = CleaningPlan(only_essential_outputs=False)
+    for symbol in ['OutputAnnualByProcess', 'LU_Area_SecdF', 'LU_AreaByUse']:
+        pd.testing.assert_frame_equal(gdx_data[symbol], plan.tidy(symbol, reader.raw[symbol]))
+    assert list(gdx_data['LU_Area_SecdF'].columns) == ['year', 'biome', 'age', 'level']
+
+
+def test_selected_symbols(reader):
+    gdx_data = open_gdx_file('run.gdx', symbols=['DebugVariable', 'CLIM_DeltaT'], reader=reader)
+    assert list(gdx_data) == ['DebugVariable', 'CLIM_DeltaT']
+    with pytest.raises(MissingSymbolError):
+        open_gdx_file('run.gdx', symbols=['CLIM_DeltaT', 'NotASymbol'], reader=reader)
+
+
+def test_lazy_data_behaves_like_a_dict(reader):
+    gdx_data = open_gdx_file('run.gdx', reader=reader)
+    symbols  = list(gdx_data)
+
+    table = pd.DataFrame({'year': [2020], 'level': [1.0]})
+    gdx_data['CLIM_DeltaT'] = table
+    assert gdx_data['CLIM_DeltaT'] is table
+    gdx_data['NewSymbol'] = table
+    assert list(gdx_data) == symbols + ['NewSymbol']
+
+    del gdx_data['LU_clear_pri']
+    del gdx_data['CLIM_DeltaT']
+    assert 'LU_clear_pri' not in gdx_data and len(gdx_data) == len(symbols) - 1
+    with pytest.raises(KeyError):
+        gdx_data['LU_clear_pri']
+    with pytest.raises(KeyError):
+        del gdx_data['LU_clear_pri']
+    assert gdx_data.get('LU_clear_pri') is None
+    # only the symbols that were accessed were read
+    assert reader.reads == []
+    assert set(gdx_data.load_all()) == set(symbols) - {'LU_clear_pri', 'CLIM_DeltaT'} | {'NewSymbol'}
+    assert isinstance(gdx_data, LazyGdxData)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_gdx_data
+from toolbox.import_gdx import clean_gdx_data
+from toolbox.output_index import OutputIndex, get_output_index
+
+
+def outputs(regions: int = 2) -> pd.DataFrame:
+    df = clean_gdx_data(synthetic_gdx_data(regions=regions, processes=40))['OutputAnnualByProcess']
+    # shuffled, so that the table is not already in the order of the index
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def pivot(df: pd.DataFrame) -> pd.DataFrame:
+    return df.pivot_table(index='year', columns='process', values='level', aggfunc='sum')
+
+
+def test_commodity_matrix_matches_pivot():
+    df    = outputs()
+    index = OutputIndex(df)
+    for commodity in ['ELECGen', 'PKM', 'COMM_A']:
+        expected = pivot(df[df['commodity'] == commodity])
+        pd.testing.assert_frame_equal(index.matrix(commodity=commodity), expected, check_names=False)
+
+
+def test_process_and_region_queries_match_pivot():
+    df        = outputs()
+    index     = OutputIndex(df)
+    processes = index.find('TRAN_PASS')
+    expected  = pivot(df[df['process'].isin(processes) & (df['region'] == 'R2')])
+    pd.testing.assert_frame_equal(index.matrix(processes=processes, region='R2'), expected, check_names=False)
+
+    transformed = index.matrix(commodity='ELECGen', processes=['ELEC_Coal', 'ELEC_SPV1'], transform=np.round)
+    expected    = pivot(df[df['process'].isin(['ELEC_Coal', 'ELEC_SPV1']).to_numpy()].assign(level=lambda df: np.round(df['level'])))
+    pd.testing.assert_frame_equal(transformed, expected, check_names=False)
+
+
+def test_index_does_not_copy_the_table():
+    df    = outputs()
+    index = get_output_index({'OutputAnnualByProcess': df})
+    assert np.shares_memory(index.levels, df['level'].to_numpy())
+    assert index.select(commodity='TKM').equals(df.loc[index.rows(commodity='TKM')])
+    assert set(index.select(commodity='TKM')['process']) == set(index.find('TRAN_FRGT'))
@@ -0,0 +1,44 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from toolbox.commodities import plot_electricity_production
+from toolbox.errors import MissingElementError
+from toolbox.plotting import plot_by_region
+
+
+YEARS = [2015, 2020, 2025, 2035, 2050, 2075]
+
+
+@pytest.fixture
+def gdx_data():
+    output = pd.DataFrame([(region, process, 'ELECGen', year, 1000.0 * (i + 1))
+                           for region in ['R1', 'R2', 'R3', 'R4'] for i, process in enumerate(['ELEC_Coal', 'ELEC_SPV1']) for year in YEARS],
+                          columns=['region', 'process', 'commodity', 'year', 'level'])
+    yield {'OutputAnnualByProcess': output}
+    plt.close('all')
+
+
+def test_one_facet_per_region(gdx_data):
+    fig  = plot_by_region(plot_electricity_production, gdx_data, ncols=3)
+    axes = [ax for ax in fig.axes if ax.get_visible()]
+    assert [ax.get_title() for ax in axes] == ['R1', 'R2', 'R3', 'R4']
+    assert len(fig.axes) == 6
+    # the years of the data, not the 2020-2100 grid
+    assert all(ax.get_xlim() == (2015, 2075) for ax in axes)
+    assert sum(ax.get_legend() is not None for ax in axes) == 1
+
+
+def test_selected_regions(gdx_data):
+    fig = plot_by_region(plot_electricity_production, gdx_data, regions=['R2', 'R4'])
+    assert [ax.get_title() for ax in fig.axes] == ['R2', 'R4']
+
+
+def test_no_regions_raise(gdx_data):
+    with pytest.raises(ValueError, match='No regions'):
+        plot_by_region(plot_electricity_production, gdx_data, regions=[])
+    with pytest.raises(MissingElementError) as error:
+        plot_by_region(plot_electricity_production, gdx_data, regions=['R9'])
+    assert error.value.available == ['R1', 'R2', 'R3', 'R4']
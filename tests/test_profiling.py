@@ -0,0 +1,75 @@
+import json
+import time
+import pandas as pd
+
+from toolbox.profiling import Profiler, profile_step, profiled
+
+
+@profiled
+def double(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.concat([df, df])
+
+
+@profiled
+def total(df: pd.DataFrame) -> float:
+    with profile_step('inner', symbol='X') as record:
+        time.sleep(0.01)
+        record['rows'] = 7
+    return double(df)['level'].sum()
+
+
+def table() -> pd.DataFrame:
+    return pd.DataFrame({'year': [2020, 2030, 2040], 'level': [1.0, 2.0, 3.0]})
+
+
+def test_profiled_returns_the_result():
+    df = table()
+    assert total(df) == 12.0
+    with Profiler():
+        assert total(df) == 12.0
+        assert double(df).equals(pd.concat([df, df]))
+    assert total.__name__ == 'total'
+
+
+def test_nested_steps_are_recorded():
+    with Profiler() as profiler:
+        total(table())
+    report = profiler.report()
+    assert report['name'].tolist() == ['total', 'inner', 'double']
+    assert report['depth'].tolist() == [0, 1, 1]
+    # rows of the result, of the first table argument if the result is not a table, or set by the step
+    assert report['rows'].tolist() == [3, 7, 6]
+    assert report.loc[1, 'symbol'] == 'X'
+    assert report.loc[0, 'seconds'] >= report.loc[1, 'seconds'] >= 0.01
+
+
+def test_nothing_is_recorded_without_a_profiler():
+    with Profiler() as profiler:
+        pass
+    total(table())
+    assert profiler.records == []
+    assert list(profiler.report().columns) == ['name', 'seconds', 'rows', 'memory_delta', 'depth']
+
+
+def test_nested_profilers():
+    with Profiler() as outer:
+        double(table())
+        with Profiler() as inner:
+            total(table())
+        double(table())
+    assert len(outer.records) == 2 and len(inner.records) == 3
+
+
+def test_summary_and_dump(tmp_path):
+    with Profiler() as profiler:
+        for _ in range(3):
+            double(table())
+    summary = profiler.summary()
+    assert summary.loc['double', 'calls'] == 3
+    assert summary.loc['double', 'rows'] == 18
+
+    profiler.dump(str(tmp_path / 'timing.json'))
+    with open(tmp_path / 'timing.json') as f:
+        assert [record['name'] for record in json.load(f)] == ['double'] * 3
+    profiler.dump(str(tmp_path / 'timing.csv'))
+    assert len(pd.read_csv(tmp_path / 'timing.csv')) == 3
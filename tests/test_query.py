@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from benchmarks.synthetic import synthetic_gdx_data
+from toolbox.ensemble import Ensemble
+from toolbox.export import export_gdx_files
+from toolbox.import_gdx import clean_gdx_data
+from toolbox.query import ParquetEnsemble
+
+
+SCENARIOS = ['run_1', 'run_2', 'run_3']
+
+
+@pytest.fixture(scope='module')
+def runs():
+    return {scenario: clean_gdx_data(synthetic_gdx_data(regions=2, processes=40, seed=seed)) for seed, scenario in enumerate(SCENARIOS)}
+
+
+@pytest.fixture
+def parquet(tmp_path, write_run, reader, runs):
+    paths = [write_run(scenario, gdx_data) for scenario, gdx_data in runs.items()]
+    export_gdx_files(paths, str(tmp_path / 'dataset'), progress=None, reader=reader)
+    return ParquetEnsemble(str(tmp_path / 'dataset'))
+
+
+@pytest.fixture
+def outputs(runs):
+    df = Ensemble(runs)['OutputAnnualByProcess']
+    return df.assign(scenario=df['scenario'].astype(str))
+
+
+def test_scenarios_and_symbols(parquet, runs):
+    assert parquet.scenarios == SCENARIOS
+    assert parquet.symbols() == sorted(runs['run_1'])
+
+
+def test_aggregate_matches_groupby(parquet, outputs):
+    result   = parquet.aggregate('OutputAnnualByProcess', by=('scenario', 'year'), scenario=['run_1', 'run_3'], region='R2',
+                                 where=pc.starts_with(ds.field('process'), 'TRAN_PASS'))
+    rows     = outputs['scenario'].isin(['run_1', 'run_3']) & (outputs['region'] == 'R2') & outputs['process'].str.startswith('TRAN_PASS')
+    expected = outputs[rows].groupby(['scenario', 'year'])['level'].sum()
+    pd.testing.assert_series_equal(result, expected, check_index_type=False)
+
+
+@pytest.mark.parametrize('func', ['mean', 'max', 'count'])
+def test_aggregate_functions_match_groupby(parquet, outputs, func):
+    result   = parquet.aggregate('OutputAnnualByProcess', by='year', func=func, commodity='ELECGen')
+    expected = outputs[outputs['commodity'] == 'ELECGen'].groupby('year')['level'].agg(func)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_index_type=False)
+
+
+def test_commodity_production_matches_pivot(parquet, outputs):
+    result   = parquet.commodity_production('ELECGen', scenario='run_2')
+    rows     = (outputs['scenario'] == 'run_2') & (outputs['commodity'] == 'ELECGen')
+    expected = outputs[rows].pivot_table(index=['scenario', 'year'], columns='process', values='level', aggfunc='sum')
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_index_type=False)
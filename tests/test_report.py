@@ -0,0 +1,18 @@
+import inspect
+
+import matplotlib
+matplotlib.use('Agg')
+
+from toolbox.report import render_report
+
+from conftest import make_run
+
+
+def test_formats_default_is_immutable():
+    assert inspect.signature(render_report).parameters['formats'].default == ('png',)
+
+
+def test_render_report_single_format(tmp_path):
+    result = render_report(make_run(0), folder=str(tmp_path), formats='svg', figures=['deltaT'], processes=1)
+    assert result['errors'] == {}
+    assert [path.name for path in tmp_path.iterdir()] == ['deltaT.svg']
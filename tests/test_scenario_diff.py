@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from toolbox.scenario_diff import align_runs, compare_scenarios, scenario_deltas, top_contributors
+
+
+def outputs(levels: dict) -> pd.DataFrame:
+    return pd.DataFrame([('R1', process, 'ELECGen', year, level) for (process, year), level in levels.items()],
+                        columns=['region', 'process', 'commodity', 'year', 'level'])
+
+
+@pytest.fixture
+def runs():
+    return {
+        'baseline' : {'OutputAnnualByProcess': outputs({('A', 2050): 10.0, ('B', 2050): 5.0, ('A', 2060): 1.0})},
+        'high'     : {'OutputAnnualByProcess': outputs({('A', 2050): 4.0, ('B', 2050): 8.0, ('C', 2050): 2.0, ('A', 2060): 1.0})},
+        'low'      : {'OutputAnnualByProcess': outputs({('A', 2050): 10.0, ('C', 2050): 1.0, ('A', 2060): 3.0})},
+    }
+
+
+def test_align_runs_fills_missing_elements_with_zero(runs):
+    aligned = align_runs(runs, 'OutputAnnualByProcess', by=['year', 'process'])
+    assert list(aligned.columns) == ['baseline', 'high', 'low']
+    assert aligned.loc[(2050, 'C')].tolist() == [0, 2, 1]
+    assert aligned.loc[(2050, 'B')].tolist() == [5, 8, 0]
+
+
+def test_compare_scenarios_signs_and_magnitudes(runs):
+    deltas = compare_scenarios(runs, 'OutputAnnualByProcess', 'baseline', by='process', year=2050)
+    assert deltas.loc[('A', 'high')].tolist() == [10, 4, -6, -0.6]
+    assert deltas.loc[('B', 'low')].tolist() == [5, 0, -5, -1]
+    row = deltas.loc[('C', 'high')]
+    assert row['delta'] == 2 and np.isnan(row['relative'])
+    assert deltas.index.names == ['process', 'scenario']
+
+
+def test_relative_change_uses_the_size_of_the_baseline():
+    aligned = pd.DataFrame({'baseline': [-4.0, 2.0], 'run': [-2.0, 1.0]}, index=pd.Index([2050, 2060], name='year'))
+    deltas  = scenario_deltas(aligned, 'baseline')
+    # an increase from a negative baseline is a positive relative change
+    assert deltas['relative'].tolist() == [0.5, -0.5]
+    with pytest.raises(KeyError):
+        scenario_deltas(aligned, 'other')
+
+
+def test_top_contributors_rank_by_magnitude(runs):
+    top = top_contributors(runs, 'OutputAnnualByProcess', 'baseline', by='process', n=3, year=2050)
+    high = top[top['scenario'] == 'high']
+    assert high['process'].tolist() == ['A', 'B', 'C']
+    assert high['delta'].tolist() == [-6, 3, 2]
+    # shares of the total change of -1
+    np.testing.assert_allclose(high['share'], [6, -3, -2])
+
+    low = top[top['scenario'] == 'low']
+    assert low['process'].tolist() == ['B', 'C', 'A']
+    assert low['delta'].tolist() == [-5, 1, 0]
+    assert low['rank'].tolist() == [1, 2, 3]
+    np.testing.assert_allclose(low['share'], [1.25, -0.25, 0])
+
+
+def test_top_contributors_limit_and_scenarios(runs):
+    top = top_contributors(runs, 'OutputAnnualByProcess', 'baseline', by='process', n=1, scenarios=['low'])
+    # summed over the years: A +2, B -5, C +1
+    assert top[['scenario', 'process', 'delta']].values.tolist() == [['low', 'B', -5]]
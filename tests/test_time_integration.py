@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from toolbox.time_integration import period_weights, cumulative_sum, cumulative_matrix
+
+
+YEARS = list(range(2020, 2101, 10))
+
+
+def test_period_weights_of_the_decadal_grid():
+    assert period_weights(YEARS).tolist() == [5, 10, 10, 10, 10, 10, 10, 10, 5]
+
+
+def test_period_weights_of_uneven_years():
+    assert period_weights([2020, 2025, 2030, 2040, 2060]).tolist() == [2.5, 5, 7.5, 15, 10]
+    assert period_weights([2050]).tolist() == [1]
+
+
+def test_cumulative_sum_matches_the_fixed_periods():
+    rng = np.random.default_rng(0)
+    df  = pd.DataFrame([(biome, year, rng.uniform(0, 10)) for biome in ['Boreal', 'Tundra'] for year in YEARS], columns=['biome', 'year', 'level'])
+    # shuffled rows keep their results
+    df  = df.sample(frac=1, random_state=0)
+
+    # the multipliers of each model year used before the period weights
+    ordered  = df.sort_values('year')
+    period   = ordered['year'].map(dict(zip(YEARS, [5, 10, 10, 10, 10, 10, 10, 10, 5])))
+    expected = (ordered['level'] * period).groupby(ordered['biome']).cumsum()
+    result   = cumulative_sum(df, groupby='biome')
+    np.testing.assert_allclose(result.to_numpy(), expected.loc[df.index].to_numpy())
+    assert result.index.equals(df.index)
+
+
+def test_cumulative_sum_of_uneven_years():
+    df = pd.DataFrame({'year': [2020, 2025, 2030, 2040, 2060], 'level': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    np.testing.assert_allclose(cumulative_sum(df), np.cumsum([2.5, 10, 22.5, 60, 50]))
+    # trapezoid: the annual values are interpolated between the model years
+    np.testing.assert_allclose(cumulative_sum(df, method='trapezoid'), np.cumsum([0, 7.5, 12.5, 35, 90]))
+
+
+def test_cumulative_matrix_matches_cumulative_sum():
+    df     = pd.DataFrame({'year': [2020, 2025, 2030, 2040, 2060], 'level': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    matrix = cumulative_matrix(df.set_index('year')[['level']])
+    np.testing.assert_allclose(matrix['level'], cumulative_sum(df))
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        cumulative_sum(pd.DataFrame({'year': [2020], 'level': [1.0]}), method='simpson')
+
+
+def test_add_cumulative_sum_does_not_change_the_table():
+    pytest.importorskip('seaborn')
+    from toolbox.landuse import add_cumulative_sum
+
+    df     = pd.DataFrame({'process': ['A'] * 3, 'year': [2020, 2030, 2040], 'level': [1.0, 1.0, 1.0]})
+    result = add_cumulative_sum(df)
+    assert list(df.columns) == ['process', 'year', 'level']
+    assert result['cumsum'].tolist() == [5, 15, 20]
@@ -1,8 +1,54 @@
-# this file collectively imports all relevant functions from the toolbox folder files 
-# such that they can be accessed from the toolbox module directly.
-
-from toolbox.import_gdx import import_gdx_file
-from toolbox.commodities import *
-from toolbox.climate_and_emissions import plot_deltaT, plot_emissions, plot_total_net_emissions_co2eq
-from toolbox.transportation import *
-from toolbox.landuse import plot_landuse, plot_secondary_forest, plot_clearing_primary_forest, plot_livestock_production
\ No newline at end of file
+# this file makes all relevant functions from the toolbox folder files accessible from the toolbox module directly.
+# The files are imported only when one of their functions is first used (PEP 562), so that "import toolbox" is fast
+# and e.g. batch jobs that only import data never load matplotlib and seaborn.
+
+import importlib
+
+
+# the functions of the toolbox module by the file they are in
+EXPORTS = {
+    'import_gdx'            : ['import_gdx_file', 'open_gdx_file'],
+    'cache'                 : ['import_gdx_file_cached', 'clear_gdx_cache'],
+    'batch'                 : ['import_gdx_files'],
+    'ensemble'              : ['Ensemble', 'select_scenario'],
+    'incremental'           : ['IncrementalEnsemble'],
+    'query'                 : ['ParquetEnsemble'],
+    'plotting'              : ['plot_by_region', 'set_year_limits', 'ordered_columns', 'select_regions'],
+    'fan_chart'             : ['plot_fan_chart', 'plot_fan_chart_dashboard'],
+    'profiling'             : ['Profiler', 'profiled'],
+    'errors'                : ['ToolboxError', 'MissingSymbolError', 'MissingYearError', 'MissingCommodityError', 'MissingElementError'],
+    'commodities'           : ['plot_electricity_production', 'print_all_commodities', 'plot_commodity_production', 'plot_commodity_by_process'],
+    'climate_and_emissions' : ['plot_deltaT', 'plot_emissions', 'plot_total_net_emissions_co2eq', 'calculate_total_netemissions_co2eq'],
+    'transportation'        : ['plot_passenger_transportation', 'plot_freight_transportation'],
+    'landuse'               : ['plot_landuse', 'plot_secondary_forest', 'plot_clearing_primary_forest', 'plot_livestock_production', 'plot_forest_age_structure', 'animate_secondary_forest'],
+    'age_cube'              : ['get_age_cube', 'AgeCube'],
+    'scenario_diff'         : ['align_runs', 'compare_scenarios', 'scenario_deltas', 'top_contributors'],
+    'flows'                 : ['FlowGraph', 'get_flow_graph', 'plot_sankey', 'plot_sankey_years'],
+    'climate_emulator'      : ['ClimateEmulator', 'emulate_deltaT'],
+    'report'                : ['render_report'],
+    'output_index'          : ['get_output_index'],
+    'time_integration'      : ['cumulative_matrix'],
+    'colormaps'             : ['color_map', 'process_colors', 'viridis', 'blue', 'green', 'teal', 'yellow', 'StyleRegistry', 'styles', 'palette', 'sequential_colors'],
+    'derived'               : [],
+    'export'                : [],
+}
+LOCATIONS = {name: module for module, names in EXPORTS.items() for name in names}
+
+__all__ = list(LOCATIONS)
+
+
+def __getattr__(name: str):
+    if name in LOCATIONS:
+        value = getattr(importlib.import_module(f"{__name__}.{LOCATIONS[name]}"), name)
+    elif name in EXPORTS:
+        # submodules, e.g. toolbox.import_gdx
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LOCATIONS) | set(EXPORTS))
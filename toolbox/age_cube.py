@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from toolbox.derived import derived
+from toolbox.errors import MissingYearError
+from toolbox.profiling import profiled
+
+
+# order of the biomes in the forest plots
+BIOMES = ['TropicalHumid', 'TropicalDry', 'TemperateHumid', 'TemperateDry', 'Boreal', 'Tundra', 'Semiarid', 'Desert', 'DesertCold', 'Unproductive']
+
+
+class AgeCube:
+    """
+    Dense array of a symbol with age classes ("LU_Area_SecdF" or "LU_clear_sec") with the axes year, biome and age,
+    and region and scenario if the data has them (e.g. an ensemble). Missing records are zero, as in GAMS.
+    The array is built once, so plots of single years, animation frames over all years and age statistics are
+    slices and sums of the array instead of repeated pivots of the table.
+    - "values" the array, "axes" the names of its axes and "labels" the labels along each axis, i.e. {axis: array}
+    """
+    def __init__(self, df: pd.DataFrame, symbol: str = None, value: str = 'level'):
+        self.symbol = symbol
+        self.axes   = ['year', 'biome', 'age'] + [axis for axis in ['region', 'scenario'] if axis in df.columns]
+        self.labels = {}
+        cells = np.zeros(len(df), dtype=np.int64)
+        for axis in self.axes:
+            codes, labels = pd.factorize(df[axis], sort=True)
+            self.labels[axis] = np.asarray(labels)
+            cells = cells * len(labels) + codes
+        shape       = tuple(len(self.labels[axis]) for axis in self.axes)
+        self.values = np.bincount(cells, weights=df[value].to_numpy(dtype=float), minlength=int(np.prod(shape))).reshape(shape)
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, axes: list, labels: dict, symbol: str = None):
+        cube = cls.__new__(cls)
+        cube.symbol, cube.values, cube.axes, cube.labels = symbol, values, list(axes), {axis: labels[axis] for axis in axes}
+        return cube
+
+    def __repr__(self):
+        return f"AgeCube({self.symbol}, " + ' x '.join(f"{len(self.labels[axis])} {axis}" for axis in self.axes) + ")"
+
+    @property
+    def years(self) -> np.ndarray:
+        return self.labels['year']
+
+    def positions(self, axis: str, labels) -> np.ndarray:
+        """
+        Positions of labels along an axis. Missing years raise MissingYearError, other missing labels KeyError.
+        """
+        wanted    = np.atleast_1d(labels)
+        positions = np.searchsorted(self.labels[axis], wanted)
+        found     = (positions < len(self.labels[axis])) & (self.labels[axis][np.minimum(positions, len(self.labels[axis]) - 1)] == wanted)
+        if not found.all():
+            missing = wanted[~found][0]
+            if axis == 'year':
+                raise MissingYearError(missing, self.symbol, self.labels['year'])
+            raise KeyError(f"{axis} {missing} not found in {self.symbol}.")
+        return positions
+
+    def sel(self, **labels):
+        """
+        Select labels along axes, e.g. cube.sel(year=2050, biome=["Boreal", "Tundra"]). A single label drops the axis.
+        The result is a cube of the remaining axes, a view of the array where possible.
+        """
+        values, axes, kept = self.values, list(self.axes), dict(self.labels)
+        for axis, selection in labels.items():
+            if selection is None:
+                continue
+            if axis not in axes:
+                raise ValueError(f"The data has no {axis} axis.")
+            dimension = axes.index(axis)
+            positions = self.positions(axis, selection)
+            if np.ndim(selection) == 0:
+                values = np.take(values, positions[0], axis=dimension)
+                axes.pop(dimension)
+            else:
+                values     = np.take(values, positions, axis=dimension)
+                kept[axis] = self.labels[axis][positions]
+        return AgeCube.from_array(values, axes, kept, self.symbol)
+
+    def sum(self, keep: list) -> 'AgeCube':
+        """
+        Sum over all axes except those in "keep", e.g. cube.sum(["year", "age"]) for the age structure over the years.
+        """
+        summed = tuple(i for i, axis in enumerate(self.axes) if axis not in keep)
+        axes   = [axis for axis in self.axes if axis in keep]
+        return AgeCube.from_array(self.values.sum(axis=summed), axes, self.labels, self.symbol)
+
+    def to_frame(self, index: str, columns: str) -> pd.DataFrame:
+        """
+        Two-dimensional table of the cube summed over the other axes, e.g. cube.to_frame("age", "biome").
+        """
+        cube   = self.sum([index, columns])
+        values = cube.values if cube.axes == [index, columns] else cube.values.T
+        return pd.DataFrame(values, index=pd.Index(self.labels[index], name=index), columns=pd.Index(self.labels[columns], name=columns))
+
+    def age_by_biome(self, year: int, region=None, scenario: str = None) -> pd.DataFrame:
+        """
+        Area by age class (rows) and biome (columns) in a year, summed over the regions unless a "region" is selected.
+        """
+        return self.sel(year=year, region=region, scenario=scenario).to_frame('age', 'biome')
+
+    def frames(self, region=None, scenario: str = None):
+        """
+        Age class x biome arrays of all years, e.g. for the frames of an animation, as (year, array) pairs.
+        """
+        cube = self.sel(region=region, scenario=scenario).sum(['year', 'age', 'biome'])
+        for i, year in enumerate(cube.years):
+            yield year, cube.values[i].T
+
+    def mean_age(self, by: tuple = ('year',)) -> pd.Series:
+        """
+        Area-weighted mean age class by the axes in "by", e.g. the mean age of the cleared secondary forest by year and biome.
+        Empty cells are NaN.
+        """
+        by    = [by] if isinstance(by, str) else list(by)
+        cube  = self.sum(by + ['age'])
+        age   = cube.axes.index('age')
+        ages  = self.labels['age'].astype(float).reshape([-1 if i == age else 1 for i in range(len(cube.axes))])
+        total = cube.values.sum(axis=age)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (cube.values * ages).sum(axis=age) / total
+        return pd.Series(mean.reshape(-1), index=self.index([axis for axis in cube.axes if axis != 'age']), name='mean_age')
+
+    def age_shares(self, by: tuple = ('year',)) -> pd.DataFrame:
+        """
+        Share of each age class of the total area by the axes in "by", with the age classes as columns.
+        """
+        by     = [by] if isinstance(by, str) else list(by)
+        cube   = self.sum(by + ['age'])
+        values = np.moveaxis(cube.values, cube.axes.index('age'), -1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shares = values / values.sum(axis=-1, keepdims=True)
+        index = self.index([axis for axis in cube.axes if axis != 'age'])
+        return pd.DataFrame(shares.reshape(-1, values.shape[-1]), index=index, columns=pd.Index(self.labels['age'], name='age'))
+
+    def index(self, axes: list) -> pd.Index:
+        """
+        Index of the cells of the axes, in the order of the flattened array.
+        """
+        if len(axes) == 1:
+            return pd.Index(self.labels[axes[0]], name=axes[0])
+        return pd.MultiIndex.from_product([self.labels[axis] for axis in axes], names=axes)
+
+
+@profiled
+def get_age_cube(gdx_data, symbol: str = 'LU_Area_SecdF') -> AgeCube:
+    """
+    Age class cube (see "AgeCube") of "LU_Area_SecdF" (secondary forest area) or "LU_clear_sec" (clearing of secondary forest)
+    of gdx data or an ensemble. The cube is built once per table and rebuilt if the table is replaced or changes.
+    """
+    df = gdx_data[symbol]
+    return derived(df, ('age_cube', symbol), lambda df: AgeCube(df, symbol))
@@ -0,0 +1,188 @@
+import os, glob, traceback, logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from toolbox.import_gdx import import_gdx_file
+from toolbox.cache import import_gdx_file_cached
+from toolbox.profiling import Profiler
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScenarioData(dict):
+    """
+    Dictionary of imported gdx data by scenario name, i.e. {scenario: gdx_data}.
+    Files that could not be imported are listed in "errors" as {scenario: error message}.
+    """
+    def __init__(self, data: dict = None, errors: dict = None, paths: dict = None):
+        super().__init__(data if data else {})
+        self.errors = errors if errors else {}
+        self.paths  = paths if paths else {}
+
+    def __repr__(self):
+        return f"ScenarioData({len(self)} scenarios, {len(self.errors)} errors)"
+
+
+def find_gdx_files(gdx_files) -> list:
+    """
+    List .gdx files from a folder, a glob pattern (e.g. "results/run_*.gdx") or a list of paths.
+    """
+    if isinstance(gdx_files, (list, tuple)):
+        return list(gdx_files)
+    if os.path.isdir(gdx_files):
+        return sorted(glob.glob(os.path.join(gdx_files, '*.gdx')))
+    return sorted(glob.glob(gdx_files))
+
+
+def scenario_names(paths: list) -> dict:
+    """
+    Name scenarios by their file name without extension, i.e. {scenario: path}.
+    """
+    names = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in names:
+            raise ValueError(f"Scenario name {name} is not unique: {names[name]} and {path}.")
+        names[name] = path
+    return names
+
+
+def log_progress(done: int, total: int, scenario: str, error: str = None) -> None:
+    """
+    Default progress report of "import_gdx_files": a message per finished file to the "toolbox.batch" logger.
+    Finished files are logged at INFO level (hidden unless enabled, e.g. with logging.basicConfig(level=logging.INFO)),
+    failures at WARNING level with the last line of the error, so they are shown by default.
+    """
+    if error:
+        logger.warning("[%d/%d] %s FAILED: %s", done, total, scenario, error.strip().splitlines()[-1])
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info("[%d/%d] %s", done, total, scenario)
+    return
+
+
+def print_progress(done: int, total: int, scenario: str, error: str = None) -> None:
+    """
+    Progress report printing a single line per finished file, e.g. import_gdx_files(..., progress=print_progress).
+    """
+    print(f"[{done}/{total}] {scenario}{' FAILED' if error else ''}")
+    return
+
+
+def import_scenario(scenario: str, path: str, only_essential_outputs: bool, use_cache: bool, cache_dir: str, compact: bool = None, timing_dir: str = None, reader=None) -> tuple:
+    """
+    Import a single file of a batch. Errors are returned instead of raised, so that one file does not stop the batch.
+    With a "timing_dir" the timings of the import are saved to "<timing_dir>/<scenario>.json" (see "Profiler").
+    """
+    if timing_dir:
+        with Profiler() as profiler:
+            result = import_scenario(scenario, path, only_essential_outputs, use_cache, cache_dir, compact, reader=reader)
+        os.makedirs(timing_dir, exist_ok=True)
+        profiler.dump(os.path.join(timing_dir, f"{scenario}.json"))
+        return result
+    try:
+        if use_cache:
+            # the lazy cache view is cheap to send between processes
+            gdx_data = import_gdx_file_cached(path, only_essential_outputs=only_essential_outputs, cache_dir=cache_dir, verbose=False, compact=compact, reader=reader)
+        else:
+            gdx_data = import_gdx_file(path, only_essential_outputs=only_essential_outputs, verbose=False, compact=compact, reader=reader)
+        return scenario, gdx_data, None
+    except Exception:
+        return scenario, None, traceback.format_exc()
+
+
+def import_gdx_files(gdx_files, processes: int = None, max_in_flight: int = None, only_essential_outputs: bool = True, use_cache: bool = False, cache_dir: str = None, compact: bool = None, progress=log_progress, timing_dir: str = None, reader=None) -> ScenarioData:
+    """
+    Imports many .gdx files (e.g. a scenario ensemble) in parallel. Returns a dictionary of gdx data by scenario,
+    where the scenario is the file name without extension.
+    - "gdx_files" a folder, a glob pattern (e.g. "results/run_*.gdx") or a list of paths
+    - "processes" number of worker processes. Defaults to the number of CPUs, 1 imports the files one by one without a pool.
+    - "max_in_flight" maximum number of files read at the same time, limits the memory use. Defaults to "processes".
+    - "only_essential_outputs" if only the essential (i.e. main) outputs should be imported
+    - "use_cache" if the files should be imported through the on-disk cache (see "import_gdx_file_cached"). The data is then read lazily from the cache.
+    - "compact" if the data should be imported with compact data types (see "import_gdx_file")
+    - "progress" function called as progress(done, total, scenario, error) when a file is finished. Defaults to logging
+      (see "log_progress"), "print_progress" prints a line per file. Set None for no output.
+    - "timing_dir" folder to save a timing report of each import to, "<timing_dir>/<scenario>.json" (see "Profiler")
+    - "reader" backend reading the .gdx files, see "import_gdx_file"
+    Files that fail to import do not stop the batch, they are listed in the "errors" of the result. If a worker process
+    dies (e.g. a crash in the GDX library), the remaining files are imported by a new pool. The files in flight at the
+    time are imported again one at a time, so that only the file crashing the worker is listed as failed.
+    """
+    paths  = scenario_names(find_gdx_files(gdx_files))
+    result = ScenarioData(paths=paths)
+    total  = len(paths)
+    done   = 0
+
+    def collect(scenario, gdx_data, error):
+        nonlocal done
+        done += 1
+        if error:
+            result.errors[scenario] = error
+        else:
+            result[scenario] = gdx_data
+        if progress:
+            progress(done, total, scenario, error)
+
+    processes = processes if processes else os.cpu_count()
+    if processes == 1:
+        for scenario, path in paths.items():
+            collect(*import_scenario(scenario, path, only_essential_outputs, use_cache, cache_dir, compact, timing_dir, reader))
+        return result
+
+    def collect_future(future, scenario):
+        try:
+            collect(*future.result())
+        except Exception:
+            collect(scenario, None, traceback.format_exc())
+
+    max_in_flight = max_in_flight if max_in_flight else processes
+    queue    = deque(paths.items())
+    # files in flight when a worker died, retried one at a time so that only the file crashing the worker fails
+    suspects = deque()
+    pending  = {}
+    pool     = ProcessPoolExecutor(max_workers=processes)
+    try:
+        while queue or suspects or pending:
+            # at most max_in_flight results wait in memory, and a suspect runs alone
+            while (suspects and not pending) or (queue and not suspects and len(pending) < max_in_flight):
+                waiting = suspects if suspects else queue
+                scenario, path = waiting[0]
+                try:
+                    future = pool.submit(import_scenario, scenario, path, only_essential_outputs, use_cache, cache_dir, compact, timing_dir, reader)
+                except BrokenProcessPool:
+                    if pending:
+                        # the failed files in flight are handled below
+                        break
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=processes)
+                    continue
+                pending[future] = waiting.popleft()
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if not any(isinstance(future.exception(), BrokenProcessPool) for future in finished):
+                for future in finished:
+                    collect_future(future, pending.pop(future)[0])
+                continue
+
+            # a worker died (e.g. a crash in the GDX library) and took the pool down with all files in flight
+            finished, _ = wait(pending)
+            broken = [future for future in finished if isinstance(future.exception(), BrokenProcessPool)]
+            for future in finished:
+                scenario, path = pending.pop(future)
+                if future not in broken:
+                    collect_future(future, scenario)
+                elif len(broken) == 1:
+                    error = ''.join(traceback.format_exception(future.exception()))
+                    collect(scenario, None, error + f"A worker process died while {scenario} was being imported.")
+                else:
+                    suspects.append((scenario, path))
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=processes)
+    finally:
+        pool.shutdown()
+
+    # keep the order of the files
+    ordered = ScenarioData({scenario: result[scenario] for scenario in paths if scenario in result}, result.errors, paths)
+    return ordered
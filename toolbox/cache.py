@@ -0,0 +1,136 @@
+import os, json, shutil, hashlib
+
+from toolbox.import_gdx import import_gdx_file, form_gdx_path, LazyGdxData, CLEANING_VERSION
+from toolbox.profiling import profiled
+
+
+# the cache location can be changed with the SUCCESS_TOOLBOX_CACHE environment variable
+DEFAULT_CACHE_DIR = os.environ.get('SUCCESS_TOOLBOX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'success_toolbox'))
+
+
+def hash_file_content(path: str, chunk_size: int = 2**24) -> str:
+    """
+    Hash the content of a file in chunks, so that large files are not read into memory at once.
+    """
+    content_hash = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def gdx_cache_key(path_to_gdx_file: str, only_essential_outputs: bool = True, hash_content: bool = False, compact: bool = None, float32: bool = False) -> dict:
+    """
+    Form the key identifying the cleaned data of a .gdx file: the file path, size and modification time
+    (or content hash if "hash_content" is True) and the toolbox cleaning version.
+    """
+    stat = os.stat(path_to_gdx_file)
+    key = {
+        'path'                   : os.path.abspath(path_to_gdx_file),
+        'size'                   : stat.st_size,
+        'mtime'                  : stat.st_mtime_ns,
+        'cleaning_version'       : CLEANING_VERSION,
+        'only_essential_outputs' : only_essential_outputs,
+        'compact'                : compact,
+        'float32'                : float32,
+    }
+    if hash_content:
+        # a content hash survives copying and touching the file, so the modification time is not needed
+        key['mtime']        = None
+        key['content_hash'] = hash_file_content(path_to_gdx_file)
+    return key
+
+
+def gdx_cache_folder(path_to_gdx_file: str, cache_dir: str = None) -> str:
+    """
+    Folder holding the cached data of a .gdx file. There is one folder per .gdx file, old data in it is replaced.
+    """
+    cache_dir = cache_dir if cache_dir else DEFAULT_CACHE_DIR
+    abspath   = os.path.abspath(path_to_gdx_file)
+    name      = os.path.splitext(os.path.basename(abspath))[0]
+    return os.path.join(cache_dir, f"{name}-{hashlib.sha1(abspath.encode()).hexdigest()[:12]}")
+
+
+@profiled
+def read_cached_symbol(folder: str, symbol: str):
+    """
+    Read a single symbol from the cache. The columns are memory-mapped from the Feather file.
+    """
+    from pyarrow import feather
+
+    return feather.read_table(os.path.join(folder, f"{symbol}.feather"), memory_map=True).to_pandas()
+
+
+def read_cache_manifest(folder: str) -> dict:
+    """
+    Read the manifest of a cache folder. Returns an empty dictionary if there is no valid cache.
+    """
+    try:
+        with open(os.path.join(folder, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@profiled
+def write_gdx_cache(gdx_data: dict, key: dict, folder: str) -> None:
+    """
+    Write cleaned gdx data to the cache as one Feather file per symbol. The data is written to a temporary
+    folder first, so that an interrupted write never leaves a cache that looks valid.
+    """
+    from pyarrow import feather
+
+    tmp_folder = f"{folder}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+
+    for symbol, df in gdx_data.items():
+        # uncompressed files can be memory-mapped when reading
+        feather.write_feather(df.reset_index(drop=True), os.path.join(tmp_folder, f"{symbol}.feather"), compression='uncompressed')
+
+    with open(os.path.join(tmp_folder, 'manifest.json'), 'w') as f:
+        json.dump({'key': key, 'symbols': list(gdx_data.keys())}, f, indent=1)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp_folder, folder)
+    return
+
+
+@profiled
+def import_gdx_file_cached(gdx_filename: str, gdx_folder_path: str = "", only_essential_outputs: bool = True, cache_dir: str = None, hash_content: bool = False, lazy: bool = True, verbose: bool = True, compact: bool = None, float32: bool = False, reader=None) -> dict:
+    """
+    Imports data from a .gdx file like "import_gdx_file", but keeps the cleaned data in an on-disk cache.
+    The first call reads the .gdx file and writes the cache, repeated calls read the cache. The cache is
+    renewed automatically when the .gdx file or the toolbox cleaning rules change.
+    - "cache_dir" folder of the cache. Defaults to ~/.cache/success_toolbox or the SUCCESS_TOOLBOX_CACHE environment variable.
+    - "hash_content" if the file content should be hashed instead of relying on file size and modification time.
+    - "lazy" if symbols should be read from the cache only when accessed. Otherwise a regular dictionary is returned.
+    - "verbose" set to False to not log progress messages (see "import_gdx_file").
+    - "compact" and "float32" data type options as in "import_gdx_file".
+    - "reader" backend reading the .gdx file when the cache is renewed, see "import_gdx_file"
+    Requires the pyarrow package.
+    """
+    path_to_gdx_file = form_gdx_path(gdx_filename, gdx_folder_path)
+
+    key      = gdx_cache_key(path_to_gdx_file, only_essential_outputs, hash_content, compact, float32)
+    folder   = gdx_cache_folder(path_to_gdx_file, cache_dir)
+    manifest = read_cache_manifest(folder)
+
+    if manifest.get('key') != key:
+        gdx_data = import_gdx_file(path_to_gdx_file, only_essential_outputs=only_essential_outputs, verbose=verbose, compact=compact, float32=float32, reader=reader)
+        write_gdx_cache(gdx_data, key, folder)
+        manifest = read_cache_manifest(folder)
+
+    gdx_data = LazyGdxData(folder, manifest['symbols'], reader=read_cached_symbol)
+    return gdx_data if lazy else gdx_data.load_all()
+
+
+def clear_gdx_cache(gdx_filename: str = None, gdx_folder_path: str = "", cache_dir: str = None) -> None:
+    """
+    Remove the cached data of a .gdx file, or the whole cache if no file is given.
+    """
+    if gdx_filename:
+        shutil.rmtree(gdx_cache_folder(form_gdx_path(gdx_filename, gdx_folder_path), cache_dir), ignore_errors=True)
+    else:
+        shutil.rmtree(cache_dir if cache_dir else DEFAULT_CACHE_DIR, ignore_errors=True)
+    return
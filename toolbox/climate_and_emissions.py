@@ -4,52 +4,119 @@ import numpy as np
 import pandas as pd
 
 from toolbox.colormaps import *
+from toolbox.ensemble import Ensemble, select_scenario
+from toolbox.derived import derived
+from toolbox.plotting import set_year_limits
+from toolbox.profiling import profiled
+
+# global warming potentials of the IPCC assessment reports (AR6 values for CH4 without fossil/non-fossil distinction)
+GWP_TABLES = {
+    'AR4' : {'GWP100' : {'CO2' : 1, 'CH4' : 25,   'N2O' : 298},
+             'GWP20'  : {'CO2' : 1, 'CH4' : 72,   'N2O' : 289}},
+    'AR5' : {'GWP100' : {'CO2' : 1, 'CH4' : 28,   'N2O' : 265},
+             'GWP20'  : {'CO2' : 1, 'CH4' : 84,   'N2O' : 264}},
+    'AR6' : {'GWP100' : {'CO2' : 1, 'CH4' : 27.9, 'N2O' : 273},
+             'GWP20'  : {'CO2' : 1, 'CH4' : 81.2, 'N2O' : 273}},
+}
+
+# emissions are reported in Mt
+UNIT_SCALES = {'kg' : 10**-9, 't' : 10**-6, 'kt' : 10**-3, 'mt' : 1, 'gt' : 10**3, 'tt' : 10**6}
 
 ghg = ['CO2', 'CH4', 'N2O']
-gwp = [1, 28, 265]
+gwp = [GWP_TABLES['AR5']['GWP100'][gas] for gas in ghg]
+
 
-def plot_deltaT(gdx_data: dict, set_title: str='') -> any:
+def emission_table(gdx_data: dict):
+    """
+    The "EmissionAnnual" table of the gdx data, or the table itself if it is passed directly.
+    """
+    try:
+        # if entire data dictionary is passed, 
+        return gdx_data['EmissionAnnual']
+    except:
+        return gdx_data
+
+
+def pivot_emissions(df) -> pd.DataFrame:
+    """
+    Emissions by year (or scenario and year for ensembles) and emission, including the sum of CO2 emissions "CO2sum".
+    """
+    # stacked ensemble data has a row per scenario and year
+    index = ['scenario', 'year'] if 'scenario' in df.columns else 'year'
+    df = df.pivot(index=index, columns='emission', values='level')
+    df['CO2sum'] = df.filter(regex='CO2', axis=1).sum(axis=1)
+    return df
+
+
+@profiled
+def emission_matrix(gdx_data: dict, unit: str='Mt') -> pd.DataFrame:
+    """
+    Emissions by year and emission (see "pivot_emissions") in the given unit between kg and Tt. 
+    The pivot is computed once per dataset and reused until the data changes.
+    """
+    if unit.lower() not in UNIT_SCALES:
+        raise ValueError(f"Unknown unit {unit}. Use one of {list(UNIT_SCALES)}.")
+    matrix = derived(emission_table(gdx_data), 'emission_matrix', pivot_emissions)
+    return matrix / UNIT_SCALES[unit.lower()]
+
+
+def gwp_weights(gwp_set: str='AR5', horizon: str='GWP100') -> pd.Series:
+    """
+    Global warming potentials of CO2, CH4 and N2O from the IPCC assessment report "gwp_set" (AR4, AR5 or AR6) 
+    for the time horizon "horizon" (GWP100 or GWP20).
+    """
+    try:
+        table = GWP_TABLES[gwp_set][horizon]
+    except KeyError:
+        raise ValueError(f"Unknown GWP {gwp_set} {horizon}. Use one of {[(s, h) for s in GWP_TABLES for h in GWP_TABLES[s]]}.")
+    return pd.Series([table[gas] for gas in ghg], index=['CO2sum', 'CH4', 'N2O'])
+
+@profiled
+def plot_deltaT(gdx_data: dict, set_title: str='', scenario: str=None, ax=None) -> any:
     """
     Plot the global mean temperature change over the decade. You can optionally define an alternative title.
     """
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
     clim_deltaT = gdx_data["CLIM_DeltaT"][["year", "level"]]
     clim_deltaT.index = clim_deltaT["year"]
     clim_deltaT = clim_deltaT["level"]
-    sns.lineplot(data=clim_deltaT, linewidth=3)
-    plt.ylabel('ΔT (°C)')
-    plt.xlabel([""]).set_visible(False)
-    plt.xlim(2020,2100)
-    plt.legend([""]).set_visible(False)
-    plt.title(set_title if set_title else 'Global Mean Temperature Change')
-    return
+    sns.lineplot(data=clim_deltaT, linewidth=3, ax=ax)
+    ax.set_ylabel('ΔT (°C)')
+    ax.set_xlabel("").set_visible(False)
+    set_year_limits(ax, clim_deltaT.index)
+    ax.legend([""]).set_visible(False)
+    ax.set_title(set_title if set_title else 'Global Mean Temperature Change')
+    return ax
 
 
-def plot_emissions(gdx_data: dict) -> any:
+@profiled
+def plot_emissions(gdx_data: dict, scenario: str=None, axes=None) -> any:
     """
     Plot all emissions in the gdx data. CO2 emissions are split into:
     - Fossil fuels and industry (FFI)
     - Managed lands and deforestation (LU)
     - Natural lands (excluding deforestation) (nat)
+    The plots are drawn on the three "axes" if given, otherwise on a new figure. The figure is returned.
     """
+    gdx_data = select_scenario(gdx_data, scenario)
     
-    try:
-        # if entire data dictionary is passed, 
-        df = gdx_data['EmissionAnnual'].copy()
-    except:
-        df = gdx_data.copy()
-    
-    df = df.pivot(index='year', columns='emission', values='level')
-    df['CO2sum'] = df.filter(regex='CO2', axis=1).sum(axis=1)
+    df = emission_matrix(gdx_data)
 
     
     # Plot
-    fig,(ax0, ax1, ax2) = plt.subplots(3,1, dpi=150, figsize=(7,10))
+    if axes is None:
+        fig,(ax0, ax1, ax2) = plt.subplots(3,1, dpi=150, figsize=(7,10))
+    else:
+        ax0, ax1, ax2 = axes
+        fig = ax0.figure
 
     # CO2
     plot_data = df.filter(regex="CO2", axis=1)
     ax0.plot(plot_data/1000, linewidth=2)
     ax0.plot(pd.DataFrame([0]*len(plot_data), index=plot_data.index), linewidth=1, linestyle="--", color="black")
-    ax0.set_xlim(2020,2100)
+    set_year_limits(ax0, df.index)
     ax0.set_title("CO$_2$ net emissions")
     ax0.legend(plot_data.columns, frameon=False)
     ax0.set_ylabel("Gt CO$_2$ / year")
@@ -58,7 +125,7 @@ def plot_emissions(gdx_data: dict) -> any:
     # CH4
     plot_data = df.filter(regex="CH4", axis=1)
     sns.lineplot(plot_data, ax=ax1, linewidth=3)
-    ax1.set_xlim(2020,2100)
+    set_year_limits(ax1, df.index)
     ax1.set_title("CH$_4$ net emissions")
     ax1.legend(frameon=False).set_visible(False)
     ax1.set_ylabel("Mt CH$_4$ / year")
@@ -68,53 +135,53 @@ def plot_emissions(gdx_data: dict) -> any:
     # N2O
     plot_data = df.filter(regex="N2O", axis=1)
     sns.lineplot(plot_data, ax=ax2, linewidth=3)
-    ax2.set_xlim(2020,2100)
+    set_year_limits(ax2, df.index)
     ax2.set_title("N$_2$O net emissions")
     ax2.legend(frameon=False).set_visible(False)
     ax2.set_ylabel("Mt N$_2$O / year")
     ax2.set_xlabel("Year").set_visible(False)
     
     fig.tight_layout()
-    return
+    return fig
 
 
-def calculate_total_netemissions_co2eq(gdx_data: dict, unit : str='Gt') -> any:
+@profiled
+def calculate_total_netemissions_co2eq(gdx_data: dict, unit : str='Gt', scenario: str=None, gwp_set: str='AR5', horizon: str='GWP100') -> any:
     """
     Calculates total CO2eq emissions from the gdx data. Alternatively you can scale the presented output by passing a unit between kg and Tt.
+    If an ensemble is passed without a "scenario", the emissions of all scenarios are returned as a year x scenario table.
+    - "gwp_set" and "horizon" select the global warming potentials, e.g. "AR6" and "GWP20". Default is AR5 GWP100.
     """
-    try:
-        # if entire data dictionary is passed, 
-        df = gdx_data['EmissionAnnual'].copy()
-    except:
-        df = gdx_data.copy()
-        
-    # scale it 
-    for u,s in zip(['kg', 't', 'kt', 'mt', 'gt', 'tt'],[10**-9, 10**-6, 10**-3, 1, 10**3, 10**6]):
-        if unit.lower() == u:
-            scale=s
+    if not (isinstance(gdx_data, Ensemble) and scenario is None):
+        gdx_data = select_scenario(gdx_data, scenario)
     
-    df = df.pivot(index='year', columns='emission', values='level') / scale
-    df['CO2sum'] = df.filter(regex='CO2', axis=1).sum(axis=1)
+    def co2eq(df):
+        # one matrix product over all years and scenarios
+        result = emission_matrix(df, unit)[['CO2sum', 'CH4', 'N2O']] @ gwp_weights(gwp_set, horizon)
+        if 'scenario' in result.index.names:
+            result = result.unstack('scenario')
+        return result
     
-    result =  gwp[0] * df['CO2sum'] +\
-              gwp[1] * df['CH4'] +\
-              gwp[2] * df['N2O']
-                 
+    result = derived(emission_table(gdx_data), ('co2eq', gwp_set, horizon, unit.lower()), co2eq)
                  
-    return result
+    return result.copy()
 
-def plot_total_net_emissions_co2eq(gdx_data, set_title=None):
+@profiled
+def plot_total_net_emissions_co2eq(gdx_data, set_title=None, scenario: str=None, gwp_set: str='AR5', horizon: str='GWP100', ax=None):
     """
-    Plot the total net emissions in CO2eq. Optionally you can define an alternative title.
+    Plot the total net emissions in CO2eq. Optionally you can define an alternative title and the global warming potentials (see "calculate_total_netemissions_co2eq").
     """
-    data = calculate_total_netemissions_co2eq(gdx_data['EmissionAnnual'])
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
+    data = calculate_total_netemissions_co2eq(gdx_data['EmissionAnnual'], gwp_set=gwp_set, horizon=horizon)
     zeros = pd.DataFrame([0]*len(data), index=data.index)
     #zeros["zero"] = [0 for i in range(len(data))]
-    plt.plot(data, linewidth=2)
-    plt.plot(zeros, linewidth=1, linestyle="--", color="black")
-    plt.ylabel('Gt CO$_2$-eq / year')
-    plt.xlabel([""]).set_visible(False)
-    plt.xlim(2020,2100)
-    plt.legend([""]).set_visible(False)
-    plt.title(set_title if set_title else 'Total net emissions (GtCO2eq)')
-    return
\ No newline at end of file
+    ax.plot(data, linewidth=2)
+    ax.plot(zeros, linewidth=1, linestyle="--", color="black")
+    ax.set_ylabel('Gt CO$_2$-eq / year')
+    ax.set_xlabel("").set_visible(False)
+    set_year_limits(ax, data.index)
+    ax.legend([""]).set_visible(False)
+    ax.set_title(set_title if set_title else 'Total net emissions (GtCO2eq)')
+    return ax
\ No newline at end of file
@@ -0,0 +1,257 @@
+import logging
+import functools
+import itertools
+import numpy as np
+import pandas as pd
+
+from toolbox.climate_and_emissions import emission_matrix
+from toolbox.ensemble import select_scenario
+from toolbox.errors import MissingSymbolError
+from toolbox.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+# A linear impulse-response model of the global mean temperature: each gas decays from the atmosphere as in the
+# IPCC AR5 (CO2: Joos et al. 2013 boxes, CH4 and N2O: perturbation lifetimes), the forcing is proportional to the
+# airborne amount (radiative efficiency) and the temperature follows the forcing with the two-box response of
+# AR5 WG1 chapter 8. The response of each gas is scaled by a calibration factor fitted to the "CLIM_DeltaT" of
+# the runs, so that the emulator reproduces the model and not the AR5 climate.
+GASES = ['CO2sum', 'CH4', 'N2O']
+
+# W m-2 per Mt in the atmosphere. CH4 includes its indirect effects on ozone and stratospheric water vapour.
+RADIATIVE_EFFICIENCY = {'CO2sum' : 1.76e-6, 'CH4' : 2.11e-4, 'N2O' : 3.85e-4}
+
+# share and lifetime (years) of each airborne box of a pulse emission; np.inf stays in the atmosphere
+AIRBORNE_BOXES = {
+    'CO2sum' : ([0.2173, 0.2240, 0.2824, 0.2763], [np.inf, 394.4, 36.54, 4.304]),
+    'CH4'    : ([1.0], [12.4]),
+    'N2O'    : ([1.0], [121.0]),
+}
+
+# temperature response to a forcing: K per W m-2 and response time (years) of the fast and slow boxes
+TEMPERATURE_BOXES = ([0.631, 0.429], [8.4, 409.5])
+
+# largest condition number of the calibration problem (with columns scaled to unit length) for fitting a scale per gas.
+# Above it the responses to the gases are too alike in the data to tell apart, e.g. for a single run.
+MAX_CONDITION = 100
+
+
+def impulse_response(gas: str, n: int) -> np.ndarray:
+    """
+    Temperature change (K) in each of "n" years after the emission of one Mt of a gas in the first year.
+    """
+    t = np.arange(n, dtype=float)
+    shares, lifetimes = AIRBORNE_BOXES[gas]
+    airborne = sum(share * np.exp(-t / lifetime) for share, lifetime in zip(shares, lifetimes))
+    forcing  = RADIATIVE_EFFICIENCY[gas] * airborne
+    response = sum(q / d * np.exp(-t / d) for q, d in zip(*TEMPERATURE_BOXES))
+    return np.convolve(forcing, response)[:n]
+
+
+@functools.lru_cache(maxsize=32)
+def response_matrices(years: tuple) -> np.ndarray:
+    """
+    Temperature response matrices of the gases on the model "years", an array of shape (gases, years, years):
+    the temperature change in a model year (row) per Mt / year emitted in a model year (column). Emissions are
+    interpolated linearly to annual emissions between the model years, as in "cumulative_sum" with "trapezoid".
+    """
+    model = np.asarray(years, dtype=float)
+    annual = np.arange(model[0], model[-1] + 1)
+    # annual emissions = interpolation @ emissions in the model years
+    interpolation = np.stack([np.interp(annual, model, column) for column in np.eye(len(model))], axis=1)
+    lag = np.arange(len(annual))[:, None] - np.arange(len(annual))[None, :]
+    sample = np.searchsorted(annual, model)
+    matrices = []
+    for gas in GASES:
+        response = impulse_response(gas, len(annual))
+        convolution = np.where(lag >= 0, response[np.maximum(lag, 0)], 0)
+        matrices.append(convolution[sample] @ interpolation)
+    return np.stack(matrices)
+
+
+def nonnegative_least_squares(design: np.ndarray, target: np.ndarray, constrained: int) -> tuple:
+    """
+    Least squares fit of "target" with the first "constrained" coefficients non-negative and the others free.
+    Exact for the few gases of the emulator: the best of the unconstrained fits on each subset of the constrained
+    columns that has non-negative coefficients. Returns the coefficients and the residual sum of squares.
+    """
+    best = (None, np.inf)
+    free = list(range(constrained, design.shape[1]))
+    for size in range(constrained + 1):
+        for subset in itertools.combinations(range(constrained), size):
+            columns = list(subset) + free
+            fitted  = np.linalg.lstsq(design[:, columns], target, rcond=None)[0]
+            if (fitted[:size] < 0).any():
+                continue
+            coefficients = np.zeros(design.shape[1])
+            coefficients[columns] = fitted
+            residual = float(np.sum((design @ coefficients - target) ** 2))
+            if residual < best[1]:
+                best = (coefficients, residual)
+    return best
+
+
+def condition_number(design: np.ndarray) -> float:
+    """
+    Condition number of a least squares problem with its columns scaled to unit length.
+    """
+    norms = np.linalg.norm(design, axis=0)
+    return float(np.linalg.cond(design / np.where(norms > 0, norms, 1)))
+
+
+def run_arrays(gdx_data) -> tuple:
+    """
+    Emissions and temperature of gdx data or an ensemble as arrays: (scenarios, years, emissions, deltaT) with the
+    emissions of shape (runs, gases, years) in Mt / year and "deltaT" of shape (runs, years), or None without "CLIM_DeltaT".
+    Gas emissions missing from the data are zero.
+    """
+    if 'EmissionAnnual' not in gdx_data:
+        raise MissingSymbolError('EmissionAnnual')
+    matrix = emission_matrix(gdx_data).reindex(columns=GASES, fill_value=0)
+    if isinstance(matrix.index, pd.MultiIndex):
+        scenarios = list(matrix.index.get_level_values('scenario').unique())
+        years     = np.array(sorted(matrix.index.get_level_values('year').unique()))
+        index     = pd.MultiIndex.from_product([scenarios, years], names=['scenario', 'year'])
+    else:
+        scenarios, years = [None], np.array(sorted(matrix.index))
+        index = pd.Index(years, name='year')
+    emissions = matrix.reindex(index, fill_value=0).to_numpy(dtype=float).reshape(len(scenarios), len(years), len(GASES)).transpose(0, 2, 1)
+
+    deltaT = None
+    if 'CLIM_DeltaT' in gdx_data:
+        df = gdx_data['CLIM_DeltaT']
+        if 'scenario' in df.columns:
+            table = df.pivot_table(index='scenario', columns='year', values='level', aggfunc='sum', observed=True).reindex(index=scenarios, columns=years)
+        else:
+            table = df.set_index('year')['level'].reindex(years).to_frame().T
+        deltaT = table.to_numpy(dtype=float)
+    return scenarios, years, emissions, deltaT
+
+
+class ClimateEmulator:
+    """
+    Fast emulator of the temperature change "CLIM_DeltaT" from the annual emissions of CO2 (all sources), CH4 and N2O
+    (see the top of this module). The temperature is linear in the emissions, so any number of emission pathways is
+    evaluated with one matrix product:
+        deltaT = offset + drift * (year - first year) + sum over gases of scale * response @ emissions
+    The offset and drift stand for the warming from the emissions before the first model year.
+    - "years" the model years
+    - "scale" calibration factor of each gas, by default 1 (the AR5 response)
+    Use "ClimateEmulator.calibrate" to fit the parameters to runs of the model.
+    """
+    def __init__(self, years, scale=None, offset: float = 0.0, drift: float = 0.0):
+        self.years  = np.asarray(years)
+        self.scale  = np.ones(len(GASES)) if scale is None else np.array([scale[gas] for gas in GASES] if isinstance(scale, dict) else scale, dtype=float)
+        self.offset = offset
+        self.drift  = drift
+
+    def __repr__(self):
+        return f"ClimateEmulator({self.years[0]}-{self.years[-1]}, scale={dict(zip(GASES, np.round(self.scale, 3).tolist()))}, offset={self.offset:.3f}, drift={self.drift:.4f})"
+
+    @property
+    def matrices(self) -> np.ndarray:
+        return response_matrices(tuple(self.years.tolist()))
+
+    @classmethod
+    @profiled
+    def calibrate(cls, gdx_data, shared_scale: bool = None) -> 'ClimateEmulator':
+        """
+        Fit the scales of the gases (non-negative) and the offset and drift by least squares to the "CLIM_DeltaT" of gdx
+        data or of all runs of an ensemble, the runs fitted together. Calibrate to an ensemble where possible: a single
+        run has few years to tell the responses to the gases apart.
+        - "shared_scale" True fits one scale for all gases, False a scale per gas. By default a scale per gas, unless
+          the problem is ill-conditioned (see MAX_CONDITION), in which case a warning is logged and one scale is shared.
+        The fit is logged; see "check" for the errors by run.
+        """
+        scenarios, years, emissions, deltaT = run_arrays(gdx_data)
+        if deltaT is None:
+            raise MissingSymbolError('CLIM_DeltaT')
+        # columns of the least squares problem: the response to each gas, the offset and the drift
+        responses = np.einsum('gty,rgy->rtg', response_matrices(tuple(years.tolist())), emissions).reshape(-1, len(GASES))
+        constant  = np.tile(np.stack([np.ones(len(years)), years - years[0]], axis=1), (len(scenarios), 1))
+        target    = deltaT.reshape(-1)
+        valid     = np.isfinite(target)
+        responses, constant, target = responses[valid], constant[valid], target[valid]
+
+        condition = condition_number(np.concatenate([responses, constant], axis=1))
+        if condition > MAX_CONDITION and not shared_scale:
+            logger.warning("The responses to the gases cannot be told apart in %d runs (condition number %.0f > %d)%s. "
+                           "Calibrate to more runs for a scale per gas.", len(scenarios), condition, MAX_CONDITION,
+                           ", fitting one scale for all gases" if shared_scale is None else "")
+            shared_scale = shared_scale is None
+
+        if shared_scale:
+            parameters, residual = nonnegative_least_squares(np.concatenate([responses.sum(axis=1, keepdims=True), constant], axis=1), target, 1)
+            scale = np.repeat(parameters[0], len(GASES))
+        else:
+            parameters, residual = nonnegative_least_squares(np.concatenate([responses, constant], axis=1), target, len(GASES))
+            scale = parameters[:len(GASES)]
+
+        emulator = cls(years, scale, parameters[-2], parameters[-1])
+        logger.info("Calibrated %s to %d runs, RMSE %.3f K", emulator, len(scenarios), np.sqrt(residual / max(len(target), 1)))
+        return emulator
+
+    def evaluate(self, emissions) -> np.ndarray:
+        """
+        Temperature change of emission pathways, an array of shape (..., gases, years) in Mt / year with the gases in the
+        order of "GASES", e.g. (variants, gases, years) for thousands of variants. Returns an array of shape (..., years).
+        """
+        emissions = np.asarray(emissions, dtype=float)
+        if emissions.shape[-2:] != (len(GASES), len(self.years)):
+            raise ValueError(f"Emissions must have the shape (..., {len(GASES)} gases, {len(self.years)} years), not {emissions.shape}.")
+        weighted = self.matrices * self.scale[:, None, None]
+        return np.einsum('gty,...gy->...t', weighted, emissions) + self.offset + self.drift * (self.years - self.years[0])
+
+    def check(self, gdx_data) -> pd.DataFrame:
+        """
+        Calibration check: the emulated against the model "CLIM_DeltaT" of each run of gdx data or an ensemble, as a table
+        with the root mean square error, the largest absolute error and the error in the last year (K) by run.
+        """
+        scenarios, years, emissions, deltaT = run_arrays(gdx_data)
+        if deltaT is None:
+            raise MissingSymbolError('CLIM_DeltaT')
+        if not np.array_equal(years, self.years):
+            raise ValueError(f"The years of the data {list(years)} differ from the years of the emulator {list(self.years)}.")
+        errors = self.evaluate(emissions) - deltaT
+        return pd.DataFrame({
+            'rmse'      : np.sqrt(np.nanmean(errors ** 2, axis=1)),
+            'max_error' : np.nanmax(np.abs(errors), axis=1),
+            'end_error' : errors[:, -1],
+        }, index=pd.Index(scenarios, name='scenario'))
+
+
+def emission_variants(emissions: np.ndarray, factors) -> np.ndarray:
+    """
+    Variants of an emission pathway of shape (gases, years): the emissions times each row of "factors", an array of shape
+    (variants, gases) for a factor per gas or (variants, gases, years) for a factor per gas and year,
+    e.g. np.array([[1, 0.5, 1], [1, 0, 1]]) for halving and removing the CH4 emissions.
+    """
+    factors = np.asarray(factors, dtype=float)
+    if factors.ndim == 2:
+        factors = factors[:, :, None]
+    return emissions[None] * factors
+
+
+@profiled
+def emulate_deltaT(gdx_data, factors=None, emulator: ClimateEmulator = None, scenario: str = None) -> pd.DataFrame:
+    """
+    Temperature change of variants of the emissions of a run without re-running the model, as a year x variant table.
+    - "factors" scale the emissions by gas (and year), see "emission_variants". A dictionary like {'CH4': 0.5} is one
+      variant. By default the emissions of the run are emulated unchanged.
+    - "emulator" a calibrated emulator, e.g. ClimateEmulator.calibrate(ensemble) to reuse one calibration for many runs.
+      By default the emulator is calibrated to all runs of "gdx_data", i.e. to the whole ensemble if a "scenario" of
+      an ensemble is emulated.
+    """
+    if emulator is None:
+        emulator = ClimateEmulator.calibrate(gdx_data)
+    gdx_data = select_scenario(gdx_data, scenario)
+    _, years, emissions, _ = run_arrays(gdx_data)
+    if factors is None:
+        factors = np.ones((1, len(GASES)))
+    elif isinstance(factors, dict):
+        factors = np.array([[factors.get(gas, 1.0) for gas in GASES]])
+    if not np.array_equal(years, emulator.years):
+        raise ValueError(f"The years of the data {list(years)} differ from the years of the emulator {list(emulator.years)}.")
+    deltaT = emulator.evaluate(emission_variants(emissions[0], factors))
+    return pd.DataFrame(deltaT.T, index=pd.Index(years, name='year'), columns=pd.RangeIndex(len(deltaT), name='variant'))
@@ -1,3 +1,7 @@
+import zlib
+import numpy as np
+
+
 yellow, green, teal, blue = "#fde725","#5ec962","#21918c","#472d7b"
 
 viridis={
@@ -135,3 +139,115 @@ process_colors = {
         "TRAN": "tab:blue",
         "XTRC": "tab:blue"
     }
+
+
+# prefixes stripped from labels not found in the color maps, e.g. "TRAN_PASS_CarBEV" -> "CarBEV"
+prefix_rules = ['ELEC_', 'TRAN_PASS_', 'TRAN_FRGT_', 'LVST_']
+
+# colors of labels found in neither of the color maps, picked by a hash of the label
+fallback_colors = ['tab:blue', 'tab:orange', 'tab:green', 'tab:red', 'tab:purple', 'tab:brown', 'tab:pink', 'tab:olive', 'tab:cyan',
+                   'lightcoral', 'goldenrod', 'mediumseagreen', 'slateblue', 'orchid', 'sandybrown', 'cadetblue', 'darkkhaki']
+
+
+class StyleRegistry:
+    """
+    Colors of the plot labels (processes, commodities, land use types, biomes, ...) as RGBA arrays.
+    The colors of "color_map" and "process_colors" are converted once. A label that is not in them is looked up
+    without the prefixes in "prefix_rules", e.g. "TRAN_PASS_CarBEV" as "CarBEV", then gets the color of its sector
+    in "sectors" (e.g. "ELEC" for a new "ELEC_Geot"), and otherwise a fallback color picked by a hash of the label,
+    the same in every run. Palettes of label lists are cached, so plotting many figures
+    with the same labels does no lookups and the same label has the same color in all figures.
+    """
+    def __init__(self, colors: dict = None, prefixes: list = None, sectors: dict = None, fallback: list = None):
+        from matplotlib.colors import to_rgba_array
+        self.to_rgba_array = to_rgba_array
+        colors          = {**process_colors, **color_map} if colors is None else colors
+        self.prefixes   = prefix_rules if prefixes is None else prefixes
+        self.sectors    = dict(zip(process_colors, to_rgba_array(list(process_colors.values())))) if sectors is None else \
+                          dict(zip(sectors, to_rgba_array(list(sectors.values()))))
+        self.fallback   = to_rgba_array(fallback_colors if fallback is None else fallback)
+        self.positions  = {label: i for i, label in enumerate(colors)}
+        self.rgba       = to_rgba_array(list(colors.values()))
+        self.palettes   = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, label):
+        return label in self.positions
+
+    def position(self, label) -> int:
+        """
+        Row of a label in "rgba". Labels without a color are added with the color of the prefix rules, of their sector
+        or a fallback color.
+        """
+        if label in self.positions:
+            return self.positions[label]
+        if isinstance(label, str):
+            for prefix in self.prefixes:
+                if label.startswith(prefix) and label[len(prefix):] in self.positions:
+                    return self.add(label, self.rgba[self.positions[label[len(prefix):]]])
+            sector = label.split('_', 1)[0]
+            if '_' in label and sector in self.sectors:
+                return self.add(label, self.sectors[sector])
+        # crc32 instead of hash(), which differs between Python processes
+        return self.add(label, self.fallback[zlib.crc32(str(label).encode()) % len(self.fallback)])
+
+    def add(self, label, rgba) -> int:
+        self.positions[label] = len(self.rgba)
+        self.rgba = np.vstack([self.rgba, rgba])
+        return self.positions[label]
+
+    def register(self, label, color) -> None:
+        """
+        Set the color of a label, e.g. styles.register("ELEC_Geot", "darkorange"), for all later plots.
+        """
+        rgba = self.to_rgba_array([color])
+        if label in self.positions:
+            self.rgba = self.rgba.copy()
+            self.rgba[self.positions[label]] = rgba[0]
+        else:
+            self.add(label, rgba)
+        self.palettes.clear()
+        return
+
+    def color(self, label) -> tuple:
+        """
+        RGBA color of a label.
+        """
+        row = self.position(label)
+        return tuple(self.rgba[row])
+
+    def palette(self, labels) -> np.ndarray:
+        """
+        RGBA colors of a list of labels as an (n, 4) array, e.g. for the "colors" of a stackplot or pie chart.
+        """
+        key = tuple(labels)
+        if key not in self.palettes:
+            # resolve first: unknown labels add rows to "rgba"
+            rows   = [self.position(label) for label in key]
+            colors = self.rgba[rows].reshape(-1, 4)
+            colors.flags.writeable = False
+            self.palettes[key] = colors
+        return self.palettes[key]
+
+
+# the colors of all plots
+styles = StyleRegistry()
+
+
+def palette(labels) -> np.ndarray:
+    """
+    RGBA colors of a list of labels (see "StyleRegistry"). Never fails on unknown labels.
+    """
+    return styles.palette(labels)
+
+
+def sequential_colors(n: int) -> list:
+    """
+    "n" viridis colors from yellow to purple: the colors of "viridis" where defined for "n", otherwise sampled from the viridis colormap.
+    """
+    if n in viridis:
+        return viridis[n]
+    from matplotlib import colormaps
+    return [colormaps['viridis'](1 - i / max(n - 1, 1)) for i in range(n)]
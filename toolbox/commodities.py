@@ -4,49 +4,58 @@ import numpy as np
 import pandas as pd
 
 from toolbox.colormaps import *
+from toolbox.ensemble import select_scenario
+from toolbox.output_index import get_output_index
+from toolbox.time_integration import cumulative_matrix
+from toolbox.plotting import set_year_limits, select_regions
+from toolbox.profiling import profiled
+from toolbox.errors import MissingCommodityError
 
 
 
-def plot_electricity_production(gdx_data: dict, joules: bool=False) -> any:
+@profiled
+def plot_electricity_production(gdx_data: dict, joules: bool=False, scenario: str=None, region=None, ax=None) -> any:
     """
-    Plot electricity production by source in a stackplot.
+    Plot electricity production by source in a stackplot. Optionally only a "region" (or list of regions) is plotted, see also "plot_by_region".
     """
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
     # define electricity generation list
     elec_gen_list = ['ELEC_Coal', 'ELEC_OilL', 'ELEC_GasT',
                     'ELEC_BioM', 'ELEC_Wste', 'ELEC_Fiss', 'ELEC_Hydr', 'ELEC_Wnd1',
                     'ELEC_SPV1', 'ELEC_BCCS', 'ELEC_CCCS', 'ELEC_GCCS']
     
     # structure data for plotting
-    elec_gen = gdx_data['OutputAnnualByProcess'][gdx_data['OutputAnnualByProcess'].process.isin(elec_gen_list)]
-    elec_gen = elec_gen[elec_gen.commodity == 'ELECGen']
-    elec_gen.loc[:,'level'] = round(elec_gen.loc[:,'level'] /1000)
-    elec_gen_grouped = elec_gen.groupby(["process", "year"])['level'].sum().unstack(level=0)
-    elec_colors = [color_map[EL] for EL in elec_gen_grouped.columns]
+    elec_gen_grouped = get_output_index(gdx_data).matrix(commodity='ELECGen', processes=sorted(elec_gen_list), transform=lambda level: np.round(level /1000), region=region)
+    elec_colors = palette(elec_gen_grouped.columns)
 
     # plot stacked
     if joules:
-        plt.stackplot(elec_gen_grouped.index,[elec_gen_grouped[col] for col in elec_gen_grouped.columns], labels=list([ i.split("ELEC_")[1] for i in elec_gen_grouped.columns]), colors=elec_colors )
-        plt.ylabel('EJ / year')
+        ax.stackplot(elec_gen_grouped.index,[elec_gen_grouped[col] for col in elec_gen_grouped.columns], labels=list([ i.split("ELEC_")[1] for i in elec_gen_grouped.columns]), colors=elec_colors )
+        ax.set_ylabel('EJ / year')
     else:
         EJ_to_PWh = 0.27777777777778
-        plt.stackplot(elec_gen_grouped.index,[elec_gen_grouped[col]*EJ_to_PWh for col in elec_gen_grouped.columns], labels=list([ i.split("ELEC_")[1] for i in elec_gen_grouped.columns]), colors=elec_colors )
-        plt.ylabel('PWh / year')
-    plt.title('Annual Electricity Generation')
-    plt.legend(bbox_to_anchor=(1,1), frameon=False)
-    plt.xlim(2020,2100)
-    return
+        ax.stackplot(elec_gen_grouped.index,[elec_gen_grouped[col]*EJ_to_PWh for col in elec_gen_grouped.columns], labels=list([ i.split("ELEC_")[1] for i in elec_gen_grouped.columns]), colors=elec_colors )
+        ax.set_ylabel('PWh / year')
+    ax.set_title('Annual Electricity Generation')
+    ax.legend(bbox_to_anchor=(1,1), frameon=False)
+    set_year_limits(ax, elec_gen_grouped.index)
+    return ax
 
 
 
-def print_all_commodities(gdx_data):
+def print_all_commodities(gdx_data, scenario: str=None):
     "Lists all commodities produced annually"
+    gdx_data = select_scenario(gdx_data, scenario)
     print("All commodities:")
     print(*np.sort(gdx_data["OutputAnnual"]["commodity"].unique()),sep=", ")
     return 
 
 
 
-def plot_commodity_production(gdx_data: dict, commodities: list, stacked:bool = False, cumulative: bool = False, unit:str = "[unit]", scale_by:int = 1, set_title: str="") -> any:
+@profiled
+def plot_commodity_production(gdx_data: dict, commodities: list, stacked:bool = False, cumulative: bool = False, unit:str = "[unit]", scale_by:int = 1, set_title: str="", scenario: str=None, region=None, ax=None) -> any:
     """
     Plot a commodity or commodities from the gdx data. You can optionally
     - make the plot stacked by setting "stacked" to True. Plot default is lineplot.
@@ -54,84 +63,70 @@ def plot_commodity_production(gdx_data: dict, commodities: list, stacked:bool =
     - specity "unit" for your plot (in most cases Mt)
     - specify "scale_by" to scale the y-axis by a factor (eg. 1000 would make Mt into Gt)
     - "set_title" either to False to hide the title or to your title.
+    - plot only a "region" (or list of regions), see also "plot_by_region".
+    Raises MissingCommodityError if a commodity is not produced in the data.
     """
-    if not set(commodities).issubset(gdx_data["OutputAnnual"]["commodity"].unique()):
-        print("One or more commodities not found in the data. Check spelling and availability.")
-        return False
-    commodity_df = gdx_data["OutputAnnual"].groupby(["commodity", "year"])['level'].sum().unstack(level=0)
+    gdx_data = select_scenario(gdx_data, scenario)
+    missing = [commodity for commodity in commodities if commodity not in set(gdx_data["OutputAnnual"]["commodity"].unique())]
+    if missing:
+        raise MissingCommodityError(missing)
+    if ax is None:
+        ax = plt.gca()
+    commodity_df = select_regions(gdx_data["OutputAnnual"], region).groupby(["commodity", "year"], observed=True)['level'].sum().unstack(level=0)
     commodity_df=commodity_df[commodities]/scale_by
+    if cumulative:
+        commodity_df = cumulative_matrix(commodity_df)
     if stacked:
-        if cumulative:
-            multipliers = [5,10,10,10,10,10,10,10,5]
-            if len(multipliers) != len(commodity_df.index):
-                print("Number of multipliers does not match the number of years in the data.")
-                return False
-            cumulative_commodity_df = pd.DataFrame()
-            for column in commodity_df.columns:
-                column_data = commodity_df[column] * multipliers
-                cumulative_commodity_df[column] = column_data.cumsum()
-            commodity_df = cumulative_commodity_df
-            plt.stackplot(commodity_df.index,[commodity_df[col] for col in commodity_df.columns], labels=list(commodity_df.columns) )
-            plt.legend(bbox_to_anchor=(1,1), frameon=False)
-        else:
-            plt.stackplot(commodity_df.index,[commodity_df[col] for col in commodity_df.columns], labels=list(commodity_df.columns) )
-            plt.legend(bbox_to_anchor=(1,1), frameon=False)
+        ax.stackplot(commodity_df.index,[commodity_df[col] for col in commodity_df.columns], labels=list(commodity_df.columns) )
+        ax.legend(bbox_to_anchor=(1,1), frameon=False)
     else:
-        if cumulative:
-            multipliers = [5,10,10,10,10,10,10,10,5]
-            if len(multipliers) != len(commodity_df.index):
-                print("Number of multipliers does not match the number of years in the data.")
-                return False
-            cumulative_commodity_df = pd.DataFrame()
-            for column in commodity_df.columns:
-                column_data = commodity_df[column] * multipliers
-                cumulative_commodity_df[column] = column_data.cumsum()
-            commodity_df = cumulative_commodity_df
-            sns.lineplot(data=commodity_df)
-        else:
-            sns.lineplot(data=commodity_df)
-    plt.ylabel(f'Production ({unit}/year)')
-    plt.xlabel("").set_visible(False)
-    plt.xlim(2020,2100)
+        sns.lineplot(data=commodity_df, ax=ax)
+    ax.set_ylabel(f'Production ({unit}/year)')
+    ax.set_xlabel("").set_visible(False)
+    set_year_limits(ax, commodity_df.index)
     # setting title
     if set_title:
-        plt.title(set_title)
+        ax.set_title(set_title)
     else:
         if len(commodities) > 1:
-            plt.title(f"Production of commodities {"stacked" if stacked else ""} {"cumulative" if cumulative else ""}")
+            ax.set_title(f"Production of commodities {'stacked' if stacked else ''} {'cumulative' if cumulative else ''}")
         else:
-            plt.title(f"Production of {commodities[0]} {"stacked" if stacked else ""} {"cumulative" if cumulative else ""}")
-            plt.legend(bbox_to_anchor=(1,1), frameon=False).remove()
-    return
+            ax.set_title(f"Production of {commodities[0]} {'stacked' if stacked else ''} {'cumulative' if cumulative else ''}")
+            ax.legend(bbox_to_anchor=(1,1), frameon=False).remove()
+    return ax
 
 
 
-def plot_commodity_by_process(gdx_data: dict, commodity: str, unit:str = "[unit]", scale_by:int = 1, set_title: str="") -> any:
+@profiled
+def plot_commodity_by_process(gdx_data: dict, commodity: str, unit:str = "[unit]", scale_by:int = 1, set_title: str="", scenario: str=None, region=None, ax=None) -> any:
     """
     Stacked plot of processes producing a commodity from the gdx data. You can optionally
     - specity "unit" for your plot (in most cases Mt)
     - specify "scale_by" to scale the y-axis by a factor (eg. 1000 would make Mt into Gt)
     - "set_title" either to False to hide the title or to your title.
+    - plot only a "region" (or list of regions), see also "plot_by_region".
+    Raises MissingCommodityError if a commodity is not produced in the data.
     """
+    gdx_data = select_scenario(gdx_data, scenario)
     #commodity = "CRUD"
     #scale_by = 1
-    all_outputs = gdx_data["OutputAnnualByProcess"]
-    commodity_data = all_outputs.loc[all_outputs["commodity"] == commodity]
-    if len(commodity_data) < 1:
-        print(f"No {commodity} found in commodity list.")
-        return False
-    commodity_data_grouped = commodity_data.groupby(["process", "year"])['level'].sum().unstack(level=0)
+    outputs = get_output_index(gdx_data)
+    if commodity not in outputs.commodities:
+        raise MissingCommodityError([commodity])
+    if ax is None:
+        ax = plt.gca()
+    commodity_data_grouped = outputs.matrix(commodity=commodity, region=region)
     commodity_data_grouped=commodity_data_grouped/scale_by
     commodity_data_grouped
-    plt.stackplot(commodity_data_grouped.index,[commodity_data_grouped[col] for col in commodity_data_grouped.columns], labels=list(commodity_data_grouped.columns) )
-    plt.legend(bbox_to_anchor=(1,1), frameon=False)
-    plt.ylabel(f'Production ({unit}/year)')
-    plt.xlabel("").set_visible(False)
-    plt.xlim(2020,2100)
+    ax.stackplot(commodity_data_grouped.index,[commodity_data_grouped[col] for col in commodity_data_grouped.columns], labels=list(commodity_data_grouped.columns) )
+    ax.legend(bbox_to_anchor=(1,1), frameon=False)
+    ax.set_ylabel(f'Production ({unit}/year)')
+    ax.set_xlabel("").set_visible(False)
+    set_year_limits(ax, commodity_data_grouped.index)
     # setting title
     if set_title:
-        plt.title(set_title)
+        ax.set_title(set_title)
     else:
-        plt.title(f"{commodity} production by process")
-    return
+        ax.set_title(f"{commodity} production by process")
+    return ax
 
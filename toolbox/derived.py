@@ -0,0 +1,81 @@
+import weakref
+import pandas as pd
+
+
+# Derived quantities (pivots, indexes, cubes, ...) are memoized by their source table. A table is treated as
+# immutable: a new table (e.g. gdx_data['EmissionAnnual'] = df) gets new derived quantities, and a table that
+# changes its rows or columns is noticed, but changes of values in place are not. After changing values in place,
+# e.g. gdx_data['EmissionAnnual'].loc[rows, 'level'] = 0, call invalidate(gdx_data) (or invalidate on the table).
+
+# derived values by the id of their source table; an entry is dropped when its table is garbage collected
+derived_values = {}
+
+
+def table_fingerprint(df) -> tuple:
+    """
+    Fingerprint of the shape of a table: the number of rows and the columns. Constant time, whatever the size of the table.
+    """
+    return (len(df), tuple(df.columns))
+
+
+def derived(df, key, compute):
+    """
+    Memoize a quantity derived from a table, e.g. a pivot of "EmissionAnnual".
+    Returns compute(df), computed once per table and "key" and again when the table is replaced, changes its shape
+    or is invalidated (see the top of this module).
+    """
+    fingerprint = table_fingerprint(df)
+    entry       = derived_values.get(id(df))
+    if entry is None or entry[0]() is not df or entry[1] != fingerprint:
+        table_id = id(df)
+        entry = (weakref.ref(df, lambda ref: derived_values.pop(table_id, None)), fingerprint, {})
+        derived_values[table_id] = entry
+
+    values = entry[2]
+    if key not in values:
+        values[key] = compute(df)
+    return values[key]
+
+
+def table_version(df) -> object:
+    """
+    Token of the current version of a table, new when the table is replaced, changes its shape or is invalidated.
+    Part of the key of quantities derived from several tables, e.g. derived(outputs, ("graph", table_version(inputs)), ...).
+    """
+    return derived(df, 'version', lambda df: object())
+
+
+def loaded_tables(data) -> list:
+    """
+    Tables in memory of a table, gdx data, lazy gdx data (only the symbols already read) or an ensemble (its runs and stacked tables).
+    """
+    from toolbox.ensemble import Ensemble
+    from toolbox.import_gdx import LazyGdxData
+    if isinstance(data, pd.DataFrame):
+        return [data]
+    if isinstance(data, Ensemble):
+        return list(data.stacked.values()) + [table for run in data.runs.values() for table in loaded_tables(run)]
+    if isinstance(data, LazyGdxData):
+        return list(data.loaded.values())
+    return [table for table in data.values() if isinstance(table, pd.DataFrame)]
+
+
+def invalidate(data=None) -> None:
+    """
+    Forget the derived quantities of a table or of all tables of "data" (gdx data or an ensemble), e.g. after
+    changing values in place. All derived quantities are forgotten if "data" is None.
+    """
+    if data is None:
+        derived_values.clear()
+        return
+    for table in loaded_tables(data):
+        derived_values.pop(id(table), None)
+    return
+
+
+def clear_derived() -> None:
+    """
+    Forget all memoized derived quantities.
+    """
+    invalidate()
+    return
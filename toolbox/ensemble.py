@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from pandas.api.types import union_categoricals
+from toolbox.profiling import profiled
+from toolbox.errors import MissingSymbolError
+
+
+def filter_mask(df: pd.DataFrame, **filters) -> np.ndarray:
+    """
+    Boolean mask of the rows of a table matching the filters, each a single value or a list of values of a column.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        if isinstance(values, (list, tuple, set, np.ndarray, pd.Index)):
+            mask &= df[column].isin(values).to_numpy()
+        else:
+            mask &= (df[column] == values).to_numpy()
+    return mask
+
+
+def unify_categories(frames: list) -> list:
+    """
+    Categorical set columns (see "compact_dtypes") stay categorical in a concatenation only if the categories are
+    equal, so the categories of the tables are unified first. This only re-maps the codes. The tables are not
+    changed, tables with new categories are returned as shallow copies.
+    """
+    frames = list(frames)
+    for column in frames[0].columns:
+        columns = [frame[column] for frame in frames if column in frame]
+        if len(columns) == len(frames) and all(isinstance(col.dtype, pd.CategoricalDtype) for col in columns):
+            categories = union_categoricals(columns, ignore_order=True).categories
+            for i, frame in enumerate(frames):
+                if not frame[column].cat.categories.equals(categories):
+                    frames[i] = frame.assign(**{column: frame[column].cat.set_categories(categories)})
+    return frames
+
+
+class Ensemble(Mapping):
+    """
+    Scenario ensemble of gdx data. Each symbol is one DataFrame stacked across the scenarios with a categorical
+    "scenario" column, e.g. ensemble["CLIM_DeltaT"] has the columns scenario, year and level.
+    The rows of each scenario are kept together and in the order of "scenarios", so that selecting scenarios only
+    slices the stacked table. Symbols are stacked from the runs when they are accessed the first time.
+    - "scenario_data" dictionary of gdx data by scenario, e.g. the result of "import_gdx_files"
+    """
+    def __init__(self, scenario_data: dict = None):
+        self.runs      = dict(scenario_data) if scenario_data else {}
+        self.scenarios = list(self.runs)
+        self.stacked   = {}
+        self.offsets   = {}
+
+    @classmethod
+    def from_stacked(cls, stacked: dict):
+        """
+        Create an ensemble from tables that are already stacked, i.e. {symbol: DataFrame with a "scenario" column}.
+        Only these symbols are available, as there are no runs to stack other symbols from.
+        """
+        ensemble = cls()
+        for symbol, df in stacked.items():
+            ensemble.set_stacked(symbol, df)
+        return ensemble
+
+    def set_stacked(self, symbol: str, df: pd.DataFrame) -> None:
+        """
+        Add a stacked table to the ensemble. The rows are sorted by scenario if they are not already.
+        """
+        scenario = df['scenario'].astype('category')
+        codes    = scenario.cat.codes.to_numpy()
+        if len(codes) and (np.diff(codes) < 0).any():
+            order    = np.argsort(codes, kind='stable')
+            df       = df.iloc[order].reset_index(drop=True)
+            scenario = scenario.iloc[order].reset_index(drop=True)
+            codes    = codes[order]
+        df = df.assign(scenario=scenario.to_numpy())
+        for name in scenario.cat.categories:
+            if name not in self.scenarios:
+                self.scenarios.append(name)
+        bounds = np.searchsorted(codes, np.arange(len(scenario.cat.categories) + 1))
+        self.stacked[symbol] = df
+        self.offsets[symbol] = {name: (bounds[i], bounds[i+1]) for i, name in enumerate(scenario.cat.categories)}
+        return
+
+    @profiled
+    def stack(self, symbol: str) -> pd.DataFrame:
+        """
+        Stack a symbol across the scenarios with a single concatenation.
+        Raises a MissingSymbolError if a scenario has only stacked tables (see "from_stacked") to take the symbol from.
+        """
+        stacked_only = [name for name in self.scenarios if name not in self.runs]
+        if stacked_only:
+            raise MissingSymbolError(symbol, f"the stacked tables of the scenarios {stacked_only}")
+        frames, names = [], []
+        for name in self.scenarios:
+            if name in self.runs and symbol in self.runs[name]:
+                frames.append(self.runs[name][symbol])
+                names.append(name)
+        if not frames:
+            raise MissingSymbolError(symbol, 'the ensemble')
+
+        frames = unify_categories(frames)
+
+        lengths  = np.array([len(frame) for frame in frames])
+        bounds   = np.concatenate([[0], np.cumsum(lengths)])
+        df       = pd.concat(frames, ignore_index=True)
+        df.insert(0, 'scenario', pd.Categorical.from_codes(np.repeat(np.arange(len(names)), lengths), categories=names))
+
+        self.stacked[symbol] = df
+        self.offsets[symbol] = {name: (bounds[i], bounds[i+1]) for i, name in enumerate(names)}
+        return df
+
+    def add_scenario(self, name: str, gdx_data: dict) -> None:
+        """
+        Add a scenario to the ensemble, or replace its data. Its tables are inserted into the stacked tables.
+        """
+        position = len(self.scenarios)
+        if name in self.scenarios:
+            # a replaced scenario keeps its position
+            position = self.scenarios.index(name)
+            self.remove_scenario(name)
+        self.runs[name] = gdx_data
+        self.scenarios.insert(position, name)
+        for symbol in list(self.stacked):
+            if symbol in gdx_data:
+                self.insert_rows(symbol, name, gdx_data[symbol])
+        return
+
+    def insert_rows(self, symbol: str, name: str, frame: pd.DataFrame) -> None:
+        """
+        Insert the table of a scenario into a stacked table at the position of the scenario in "scenarios".
+        The rows of the scenarios after it move down.
+        """
+        df    = self.stacked[symbol]
+        frame = frame.drop(columns='scenario', errors='ignore')
+        later = [scenario for scenario in self.scenarios[self.scenarios.index(name) + 1:] if scenario in self.offsets[symbol]]
+        start = self.offsets[symbol][later[0]][0] if later else len(df)
+        rest  = df.drop(columns='scenario')
+        df    = pd.concat(unify_categories([rest.iloc[:start], frame, rest.iloc[start:]]), ignore_index=True)
+        shift = len(frame)
+        offsets = {scenario: (first + shift, last + shift) if scenario in later else (first, last) for scenario, (first, last) in self.offsets[symbol].items()}
+        offsets[name] = (start, start + shift)
+        self.offsets[symbol] = {scenario: offsets[scenario] for scenario in self.scenarios if scenario in offsets}
+        codes = np.empty(len(df), dtype=np.int32)
+        for i, (first, last) in enumerate(self.offsets[symbol].values()):
+            codes[first:last] = i
+        df.insert(0, 'scenario', pd.Categorical.from_codes(codes, categories=list(self.offsets[symbol])))
+        self.stacked[symbol] = df
+        return
+
+    def remove_scenario(self, name: str) -> None:
+        """
+        Remove a scenario from the ensemble. Its rows are cut out of the stacked tables.
+        """
+        if name not in self.scenarios:
+            raise KeyError(f"Scenario {name} not found in the ensemble.")
+        self.runs.pop(name, None)
+        self.scenarios.remove(name)
+        for symbol in list(self.stacked):
+            if name not in self.offsets[symbol]:
+                continue
+            start, stop = self.offsets[symbol][name]
+            df = self.stacked[symbol]
+            df = pd.concat([df.iloc[:start], df.iloc[stop:]], ignore_index=True)
+            if isinstance(df['scenario'].dtype, pd.CategoricalDtype):
+                df['scenario'] = df['scenario'].cat.remove_categories(name)
+            self.stacked[symbol] = df
+            # the rows of the scenarios after the removed one move up
+            shift = stop - start
+            self.offsets[symbol] = {scenario: (first - shift, last - shift) if first >= stop else (first, last)
+                                    for scenario, (first, last) in self.offsets[symbol].items() if scenario != name}
+        return
+
+    def __getitem__(self, symbol):
+        if symbol not in self.stacked:
+            return self.stack(symbol)
+        return self.stacked[symbol]
+
+    def symbols(self) -> list:
+        symbols = list(self.stacked)
+        for gdx_data in self.runs.values():
+            symbols += [symbol for symbol in gdx_data if symbol not in symbols]
+        return symbols
+
+    def __iter__(self):
+        return iter(self.symbols())
+
+    def __len__(self):
+        return len(self.symbols())
+
+    def __contains__(self, symbol):
+        return symbol in self.stacked or any(symbol in gdx_data for gdx_data in self.runs.values())
+
+    def __repr__(self):
+        return f"Ensemble({len(self.scenarios)} scenarios, {len(self.stacked)} symbols stacked)"
+
+    def select(self, symbol: str, scenario=None, **filters) -> pd.DataFrame:
+        """
+        Select rows of a symbol by scenario and by any of its set columns, e.g.
+        ensemble.select("OutputAnnualByProcess", scenario=["run_1", "run_2"], year=2050, commodity="ELECGen").
+        Each filter is a single value or a list of values.
+        """
+        df = self[symbol]
+        if scenario is not None:
+            names  = [scenario] if isinstance(scenario, str) else list(scenario)
+            ranges = [self.offsets[symbol][name] for name in names if name in self.offsets[symbol]]
+            rows   = np.concatenate([np.arange(start, stop) for start, stop in ranges]) if ranges else np.array([], dtype=int)
+            df     = df.iloc[rows]
+
+        return df[filter_mask(df, **filters)]
+
+    @profiled
+    def aggregate(self, symbol: str, by: list = None, value: str = 'level', func: str = 'sum', **filters) -> pd.Series:
+        """
+        Aggregate a symbol over the ensemble, e.g. the total electricity generation by scenario and year:
+        ensemble.aggregate("OutputAnnualByProcess", by=["scenario", "year"], commodity="ELECGen").
+        Selection filters are passed on to "select". Defaults to by scenario and year.
+        """
+        by = ['scenario', 'year'] if by is None else by
+        df = self.select(symbol, **filters)
+        return df.groupby(by, observed=True)[value].agg(func)
+
+    def scenario(self, name: str) -> dict:
+        """
+        Gdx data of a single scenario, e.g. for the plotting functions.
+        """
+        if name not in self.scenarios:
+            raise KeyError(f"Scenario {name} not found in the ensemble.")
+        if name in self.runs:
+            return self.runs[name]
+        return {symbol: self.select(symbol, scenario=name).drop(columns='scenario').reset_index(drop=True) for symbol in self.stacked if name in self.offsets[symbol]}
+
+
+def select_scenario(gdx_data, scenario: str = None):
+    """
+    Gdx data of a single scenario for the plotting functions. Regular gdx data is returned as is.
+    An ensemble with a single scenario can be passed without naming the scenario.
+    """
+    if not isinstance(gdx_data, Ensemble):
+        return gdx_data
+    if scenario is None:
+        if len(gdx_data.scenarios) != 1:
+            raise ValueError(f"Select one of the scenarios {gdx_data.scenarios} to plot.")
+        scenario = gdx_data.scenarios[0]
+    return gdx_data.scenario(scenario)
@@ -0,0 +1,53 @@
+# Errors raised by the toolbox when the requested data is not in the gdx data. They are subclasses of the
+# built-in errors raised before (KeyError and ValueError), so existing error handling keeps working.
+
+
+class ToolboxError(Exception):
+    """
+    Base class of the toolbox errors, e.g. to catch any missing data in a batch: except ToolboxError as e: ...
+    """
+
+
+class MissingSymbolError(ToolboxError, KeyError):
+    """
+    A symbol (e.g. "LU_AreaByUse") is not in the gdx data or file.
+    """
+    def __init__(self, symbol, source: str = None):
+        self.symbol = symbol
+        self.source = source
+        super().__init__(f"Symbol {symbol} not found{f' in {source}' if source else ''}.")
+
+    # a KeyError would show the message in quotes
+    __str__ = Exception.__str__
+
+
+class MissingYearError(ToolboxError, ValueError):
+    """
+    A year is not in the data of a symbol. "available" lists the years that are.
+    """
+    def __init__(self, year, symbol: str = None, available: list = None):
+        self.year      = year
+        self.symbol    = symbol
+        self.available = list(available) if available is not None else []
+        super().__init__(f"Year {year} not found{f' in {symbol}' if symbol else ''}." + (f" Available years are {min(self.available)}-{max(self.available)}." if self.available else ""))
+
+
+class MissingCommodityError(ToolboxError, ValueError):
+    """
+    One or more commodities are not produced in the data. Check the spelling and see "print_all_commodities".
+    """
+    def __init__(self, commodities: list):
+        self.commodities = list(commodities)
+        super().__init__(f"Commodities {self.commodities} not found in the data. Check spelling and availability.")
+
+
+class MissingElementError(ToolboxError, ValueError):
+    """
+    None of the selected set elements (e.g. processes or land use types) are in the data of a symbol. "available" lists the elements that are.
+    """
+    def __init__(self, elements, column: str, symbol: str = None, available: list = None):
+        self.elements  = [elements] if isinstance(elements, str) else list(elements)
+        self.column    = column
+        self.symbol    = symbol
+        self.available = sorted(available) if available is not None else []
+        super().__init__(f"No {column} {self.elements} found{f' in {symbol}' if symbol else ''}." + (f" Available are {self.available}." if self.available else ""))
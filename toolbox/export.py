@@ -0,0 +1,106 @@
+import os, shutil, argparse, logging, traceback
+
+from toolbox.import_gdx import CleaningPlan, stream_gdx_file
+from toolbox.batch import find_gdx_files, scenario_names, log_progress
+from toolbox.query import open_parquet_symbol
+
+
+def write_parquet_symbol(df, path: str, row_group_size: int = 2**20, compression: str = 'zstd') -> None:
+    """
+    Write a table to a Parquet file in row groups of "row_group_size" rows. Only one row group at a time
+    is converted to Arrow, so the table is not copied as a whole.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.reset_index(drop=True)
+    # the column types are taken from the first row group
+    chunk = pa.Table.from_pandas(df.iloc[:row_group_size], preserve_index=False)
+    with pq.ParquetWriter(path, chunk.schema, compression=compression) as writer:
+        writer.write_table(chunk, row_group_size=row_group_size)
+        for start in range(row_group_size, len(df), row_group_size):
+            chunk = pa.Table.from_pandas(df.iloc[start:start + row_group_size], schema=chunk.schema, preserve_index=False)
+            writer.write_table(chunk, row_group_size=row_group_size)
+    return
+
+
+def export_gdx_file(path_to_gdx_file: str, dataset_path: str, scenario: str, only_essential_outputs: bool = True, row_group_size: int = 2**20, compression: str = 'zstd', reader=None) -> list:
+    """
+    Export a .gdx file to the Parquet dataset as the partition "scenario=<scenario>", one "symbol=<symbol>" partition per symbol.
+    The symbols are read, cleaned and written one at a time. An existing partition of the scenario is replaced
+    once the export is complete. Returns the exported symbols.
+    - "reader" backend reading the .gdx file, see "get_reader"
+    """
+    folder     = os.path.join(dataset_path, f"scenario={scenario}")
+    tmp_folder = os.path.join(dataset_path, f".scenario={scenario}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+
+    symbols = []
+    try:
+        for symbol, df in stream_gdx_file(path_to_gdx_file, CleaningPlan(only_essential_outputs), reader=reader):
+            os.makedirs(os.path.join(tmp_folder, f"symbol={symbol}"))
+            write_parquet_symbol(df, os.path.join(tmp_folder, f"symbol={symbol}", 'part-0.parquet'), row_group_size, compression)
+            symbols.append(symbol)
+            # release the table before the next symbol is read
+            del df
+    except BaseException:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp_folder, folder)
+    return symbols
+
+
+def export_gdx_files(gdx_files, dataset_path: str, only_essential_outputs: bool = True, row_group_size: int = 2**20, compression: str = 'zstd', progress=log_progress, reader=None) -> dict:
+    """
+    Export .gdx files (e.g. a scenario ensemble) to a Hive-partitioned Parquet dataset, i.e.
+    "<dataset_path>/scenario=<scenario>/symbol=<symbol>/part-0.parquet", where the scenario is the file name without extension.
+    The data is cleaned as in "import_gdx_file". Only one symbol is held in memory at a time, whatever the size of the files.
+    - "gdx_files" a folder, a glob pattern (e.g. "results/run_*.gdx") or a list of paths
+    - "row_group_size" maximum number of rows per Parquet row group
+    - "compression" Parquet compression, e.g. "zstd", "snappy" or "none"
+    - "progress" function called as progress(done, total, scenario, error) when a file is finished. Set None for no output.
+    - "reader" backend reading the .gdx files, see "get_reader"
+    Files that fail to export do not stop the export. Returns {"symbols": {scenario: [symbols]}, "errors": {scenario: error message}}.
+    Requires the pyarrow package.
+    """
+    scenarios = scenario_names(find_gdx_files(gdx_files))
+    os.makedirs(dataset_path, exist_ok=True)
+
+    result = {'symbols': {}, 'errors': {}}
+    for done, (scenario, path) in enumerate(scenarios.items(), start=1):
+        error = None
+        try:
+            result['symbols'][scenario] = export_gdx_file(path, dataset_path, scenario, only_essential_outputs, row_group_size, compression, reader)
+        except Exception:
+            error = result['errors'][scenario] = traceback.format_exc()
+        if progress:
+            progress(done, len(scenarios), scenario, error)
+    return result
+
+
+def read_parquet_symbol(dataset_path: str, symbol: str, scenarios: list = None):
+    """
+    Read a symbol of all (or the listed) scenarios from an exported Parquet dataset. The result has a "scenario" column
+    and can be used as a stacked table of an ensemble (see "Ensemble.from_stacked").
+    """
+    dataset = open_parquet_symbol(dataset_path, symbol, scenarios)
+    return dataset.to_table().to_pandas().drop(columns='symbol')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export SuCCESs .gdx files to a Parquet dataset partitioned by scenario and symbol.')
+    parser.add_argument('gdx_files', nargs='+', help='.gdx files, a folder or a glob pattern')
+    parser.add_argument('--output', required=True, help='folder of the Parquet dataset')
+    parser.add_argument('--all-outputs', action='store_true', help='export all result symbols, not only the essential outputs')
+    parser.add_argument('--row-group-size', type=int, default=2**20)
+    parser.add_argument('--compression', default='zstd')
+    parser.add_argument('--reader', choices=['gams.transfer', 'gdxpds'], help='.gdx reader, by default the first installed')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    gdx_files = args.gdx_files if len(args.gdx_files) > 1 else args.gdx_files[0]
+    result = export_gdx_files(gdx_files, args.output, not args.all_outputs, args.row_group_size, args.compression, reader=args.reader)
+    if result['errors']:
+        raise SystemExit(f"{len(result['errors'])} files failed: {list(result['errors'])}")
@@ -0,0 +1,204 @@
+import math
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from toolbox.ensemble import Ensemble, filter_mask
+from toolbox.derived import derived
+from toolbox.climate_and_emissions import gwp_weights, UNIT_SCALES
+from toolbox.errors import MissingElementError
+from toolbox.plotting import set_year_limits
+from toolbox.profiling import profiled
+
+
+# quantile bands of the fan charts: {band: quantile across the scenarios}
+BANDS = {'min': 0, 'p5': 0.05, 'median': 0.5, 'p95': 0.95, 'max': 1}
+
+
+def hashable(value):
+    """
+    Lists of filter values as tuples, so that the filters can be part of a memoization key.
+    """
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return tuple(value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, hashable(item)) for key, item in value.items()))
+    return value
+
+
+def trajectory_matrix(ensemble: Ensemble, symbol: str, value: str = 'level', weights: tuple = None, **filters) -> pd.DataFrame:
+    """
+    Scenario x year matrix of a symbol of an ensemble, summed over its other set columns (e.g. regions), e.g.
+    trajectory_matrix(ensemble, "OutputAnnualByProcess", commodity="ELECGen"). Scenarios without data are NaN.
+    - "weights" optional (column, {element: weight}) to weight the rows before summing. Elements not listed have weight 0.
+    The matrix is computed with a single bincount over the stacked table and memoized until the table changes.
+    """
+    def compute(df):
+        # scenario of each row from the row ranges of the stacked table
+        offsets = ensemble.offsets[symbol]
+        names   = list(offsets)
+        codes   = np.empty(len(df), dtype=np.int64)
+        for i, name in enumerate(names):
+            start, stop = offsets[name]
+            codes[start:stop] = i
+
+        mask   = filter_mask(df, **filters)
+        values = df[value].to_numpy(dtype=float)[mask]
+        if weights is not None:
+            column, table = weights
+            values = values * pd.Series(df[column].to_numpy()[mask]).map(table).fillna(0).to_numpy(dtype=float)
+        years, year_codes = np.unique(df['year'].to_numpy()[mask], return_inverse=True)
+
+        cells  = codes[mask] * len(years) + year_codes
+        # the bincount of an empty selection is an integer array
+        sums   = np.bincount(cells, weights=values, minlength=len(names) * len(years)).astype(float)
+        counts = np.bincount(cells, minlength=len(names) * len(years))
+        sums[counts == 0] = np.nan
+        return pd.DataFrame(sums.reshape(len(names), len(years)), index=pd.Index(names, name='scenario'), columns=pd.Index(years, name='year'))
+
+    key = ('trajectory_matrix', value, hashable(weights[1]) if weights else None, weights[0] if weights else None, hashable(filters))
+    return derived(ensemble[symbol], key, compute).copy()
+
+
+def check_selection(matrix: pd.DataFrame, ensemble: Ensemble, symbol: str, column: str, selection) -> pd.DataFrame:
+    """
+    Raise MissingElementError if none of the selected elements (e.g. processes) are in the data, i.e. the matrix is empty.
+    """
+    if matrix.isna().all(axis=None):
+        raise MissingElementError(selection, column, symbol, ensemble[symbol][column].unique())
+    return matrix
+
+
+def deltaT(ensemble: Ensemble) -> pd.DataFrame:
+    return trajectory_matrix(ensemble, 'CLIM_DeltaT')
+
+
+def co2eq(ensemble: Ensemble, gwp_set: str = 'AR5', horizon: str = 'GWP100') -> pd.DataFrame:
+    """
+    Total net emissions in Gt CO2-eq, as in "calculate_total_netemissions_co2eq".
+    """
+    gwp     = gwp_weights(gwp_set, horizon)
+    weights = {emission: gwp['CO2sum'] if 'CO2' in emission else gwp.get(emission, 0) for emission in ensemble['EmissionAnnual']['emission'].unique()}
+    return trajectory_matrix(ensemble, 'EmissionAnnual', weights=('emission', weights)) / UNIT_SCALES['gt']
+
+
+def electricity_share(ensemble: Ensemble, process='ELEC_SPV1') -> pd.DataFrame:
+    """
+    Share (%) of a generating process (or list of processes, e.g. ["ELEC_Wnd1", "ELEC_SPV1"]) of the total electricity generation.
+    Defaults to solar power. Raises MissingElementError if none of the processes generate electricity in the data.
+    """
+    total = trajectory_matrix(ensemble, 'OutputAnnualByProcess', commodity='ELECGen')
+    share = trajectory_matrix(ensemble, 'OutputAnnualByProcess', commodity='ELECGen', process=process)
+    check_selection(share, ensemble, 'OutputAnnualByProcess', 'process', process)
+    # a process without generation in a scenario has no rows
+    share = share.reindex(index=total.index, columns=total.columns).fillna(0).where(total.notna())
+    return share / total * 100
+
+
+def landuse_area(ensemble: Ensemble, landuse=('primf', 'secdf')) -> pd.DataFrame:
+    """
+    Area of a land use (e.g. "crops", "pastr", "primf", "secdf", see "LUs" in "landuse") or list of land uses.
+    Defaults to the forest area, i.e. primary and secondary forest. Raises MissingElementError if none of the land uses are in the data.
+    """
+    area = trajectory_matrix(ensemble, 'LU_AreaByUse', value='value', landuse=landuse)
+    return check_selection(area, ensemble, 'LU_AreaByUse', 'landuse', landuse)
+
+
+# quantities of the fan charts: {name: (function computing a scenario x year matrix from an ensemble, y label, title)}
+QUANTITIES = {
+    'deltaT'            : (deltaT,            'ΔT (°C)',             'Global Mean Temperature Change'),
+    'co2eq'             : (co2eq,             'Gt CO$_2$-eq / year', 'Total net emissions'),
+    'electricity_share' : (electricity_share, '% of generation',     'Share of electricity generation'),
+    'landuse_area'      : (landuse_area,      'mln. km$^2$',         'Land use area'),
+}
+
+
+def ensemble_bands(matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quantile bands (see BANDS) across the scenarios of a scenario x year matrix, as a year x band table.
+    Only the bands are plotted, so a fan chart has the same size whatever the number of scenarios.
+    """
+    values = matrix.to_numpy(dtype=float)
+    if np.isnan(values).any():
+        quantiles = np.nanquantile(values, list(BANDS.values()), axis=0)
+    else:
+        quantiles = np.quantile(values, list(BANDS.values()), axis=0)
+    return pd.DataFrame(quantiles.T, index=matrix.columns, columns=list(BANDS))
+
+
+def highlighted_runs(matrix: pd.DataFrame, runs: int) -> list:
+    """
+    A number of runs picked evenly from the lowest to the highest value in the last year, e.g. 3 gives the lowest, median and highest run.
+    """
+    last = matrix.iloc[:, -1].dropna().sort_values(kind='stable')
+    if runs <= 0 or last.empty:
+        return []
+    positions = np.unique(np.linspace(0, len(last) - 1, min(runs, len(last))).round().astype(int))
+    return list(last.index[positions])
+
+
+@profiled
+def plot_fan_chart(gdx_data, quantity='deltaT', highlight=3, set_title: str = "", color: str = 'tab:blue', ax=None, **options) -> any:
+    """
+    Fan chart of a quantity over an ensemble: the min-max and 5-95% bands across the scenarios, the median and a few highlighted runs.
+    Intended for large ensembles, e.g. 500 runs, which would be slow and unreadable as separate lines.
+    - "gdx_data" an ensemble or a dictionary of gdx data by scenario (e.g. from "import_gdx_files")
+    - "quantity" one of QUANTITIES ("deltaT", "co2eq", "electricity_share", "landuse_area") or a scenario x year table
+    - "highlight" names of runs to draw as lines, or the number of runs to pick from the lowest to the highest (see "highlighted_runs")
+    - other arguments are passed to the quantity, e.g. process="ELEC_Wnd1" for "electricity_share" or landuse="crops" for "landuse_area"
+    """
+    ensemble = gdx_data if isinstance(gdx_data, Ensemble) else Ensemble(gdx_data)
+    if isinstance(quantity, pd.DataFrame):
+        matrix, ylabel, title = quantity, '', ''
+    elif quantity in QUANTITIES:
+        function, ylabel, title = QUANTITIES[quantity]
+        matrix = function(ensemble, **options)
+    else:
+        raise ValueError(f"Unknown quantity {quantity}. Use one of {list(QUANTITIES)} or a scenario x year table.")
+    if ax is None:
+        ax = plt.gca()
+
+    bands = ensemble_bands(matrix)
+    years = bands.index.to_numpy()
+    ax.fill_between(years, bands['min'], bands['max'], color=color, alpha=0.15, linewidth=0, label='min-max')
+    ax.fill_between(years, bands['p5'], bands['p95'], color=color, alpha=0.3, linewidth=0, label='5-95%')
+    ax.plot(years, bands['median'], color=color, linewidth=2, label='median')
+
+    runs = highlighted_runs(matrix, highlight) if isinstance(highlight, int) else list(highlight) if highlight else []
+    for run in runs:
+        ax.plot(years, matrix.loc[run].to_numpy(dtype=float), linewidth=1, linestyle='--', label=run)
+
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel("").set_visible(False)
+    set_year_limits(ax, years)
+    ax.set_title(set_title if set_title else f"{title} ({len(matrix)} runs)")
+    ax.legend(bbox_to_anchor=(1, 1), frameon=False)
+    return ax
+
+
+def plot_fan_chart_dashboard(gdx_data, quantities: tuple = ('deltaT', 'co2eq'), highlight=3, ncols: int = 2, fig=None) -> any:
+    """
+    Fan charts (see "plot_fan_chart") of several quantities of an ensemble on one figure, e.g.
+    plot_fan_chart_dashboard(ensemble, ["deltaT", "co2eq", ("electricity_share", {"process": "ELEC_Wnd1"})]).
+    - "quantities" names of quantities, or (name, options) pairs
+    - "highlight" runs highlighted in all charts. A number picks the runs by the first quantity.
+    The figure is returned.
+    """
+    ensemble   = gdx_data if isinstance(gdx_data, Ensemble) else Ensemble(gdx_data)
+    quantities = [(quantity, {}) if isinstance(quantity, str) else quantity for quantity in quantities]
+    ncols = min(ncols, len(quantities))
+    nrows = math.ceil(len(quantities) / ncols)
+    if fig is None:
+        fig = plt.figure(figsize=(6 * ncols, 4 * nrows))
+    axes = fig.subplots(nrows, ncols, squeeze=False).flatten()
+
+    # the same runs in every chart
+    if isinstance(highlight, int):
+        name, options = quantities[0]
+        highlight     = highlighted_runs(QUANTITIES[name][0](ensemble, **options), highlight)
+    for (name, options), ax in zip(quantities, axes):
+        plot_fan_chart(ensemble, name, highlight=highlight, ax=ax, **options)
+    for ax in axes[len(quantities):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,227 @@
+import math
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.path import Path
+from matplotlib.patches import PathPatch, Rectangle
+
+from toolbox.colormaps import styles
+from toolbox.derived import derived, table_version
+from toolbox.ensemble import select_scenario
+from toolbox.errors import MissingYearError
+from toolbox.plotting import select_regions
+from toolbox.profiling import profiled
+
+
+def process_sector(process: str) -> str:
+    """
+    Sector of a process by its name prefix, e.g. "ELEC" for "ELEC_Coal" and "TRAN" for "TRAN_PASS_CarBEV" (see "process_colors").
+    """
+    return process.split('_', 1)[0]
+
+
+class FlowGraph:
+    """
+    Sparse graph of the annual flows between processes and commodities: the output of commodities by processes from
+    "OutputAnnualByProcess" and, where present, the input of commodities to processes from "InputAnnualByProcess".
+    Each kind of flow is stored in coordinate format, i.e. arrays of the year, process and commodity codes and the
+    summed level of each non-zero flow, sorted by year, so that a year is a slice and the aggregation to sectors is
+    a single bincount, whatever the number of processes.
+    - "region" a region or list of regions to include. By default the regions are summed.
+    Flows are in the model units of each commodity, so only commodities of the same unit should be added up.
+    """
+    def __init__(self, gdx_data: dict, region=None):
+        tables = {kind: select_regions(gdx_data[symbol], region) for kind, symbol in [('output', 'OutputAnnualByProcess'), ('input', 'InputAnnualByProcess')] if symbol in gdx_data}
+        self.processes   = np.array(sorted({process for df in tables.values() for process in df['process'].unique()}), dtype=object)
+        self.commodities = np.array(sorted({commodity for df in tables.values() for commodity in df['commodity'].unique()}), dtype=object)
+        self.years       = np.array(sorted({year for df in tables.values() for year in df['year'].unique()}))
+        self.sectors, self.process_sectors = np.unique([process_sector(process) for process in self.processes], return_inverse=True)
+        self.sectors = self.sectors.astype(object)
+
+        self.flows = {}
+        for kind, df in tables.items():
+            codes = [np.searchsorted(labels, df[column].to_numpy().astype(labels.dtype)) for labels, column in
+                     [(self.years, 'year'), (self.processes, 'process'), (self.commodities, 'commodity')]]
+            # one entry per (year, process, commodity), summed over the regions
+            cells, keys = np.unique((codes[0] * len(self.processes) + codes[1]) * len(self.commodities) + codes[2], return_inverse=True)
+            levels = np.bincount(keys, weights=df['level'].to_numpy(dtype=float), minlength=len(cells))
+            nonzero = levels != 0
+            cells, levels = cells[nonzero], levels[nonzero]
+            self.flows[kind] = {
+                'year'      : cells // (len(self.processes) * len(self.commodities)),
+                'process'   : cells // len(self.commodities) % len(self.processes),
+                'commodity' : cells % len(self.commodities),
+                'level'     : levels,
+            }
+
+    def __repr__(self):
+        return f"FlowGraph({len(self.processes)} processes, {len(self.commodities)} commodities, {len(self.years)} years, " + \
+               ', '.join(f"{len(flows['level'])} {kind} flows" for kind, flows in self.flows.items()) + ")"
+
+    def year_slice(self, kind: str, year: int) -> slice:
+        """
+        Rows of a kind of flow ("output" or "input") in a year. The flows are sorted by year.
+        """
+        position = np.searchsorted(self.years, year)
+        if position == len(self.years) or self.years[position] != year:
+            raise MissingYearError(year, 'OutputAnnualByProcess', self.years)
+        flows = self.flows[kind]['year']
+        return slice(np.searchsorted(flows, position), np.searchsorted(flows, position, side='right'))
+
+    def matrix(self, year: int, kind: str = 'output', by: str = 'process') -> tuple:
+        """
+        The flows of a year as a sparse matrix in coordinate format: (rows, columns, values, row labels, column labels),
+        with the processes (or sectors with by="sector") as rows and the commodities as columns.
+        """
+        rows = self.year_slice(kind, year)
+        flows = self.flows[kind]
+        processes, commodities, levels = flows['process'][rows], flows['commodity'][rows], flows['level'][rows]
+        if by == 'process':
+            return processes, commodities, levels, self.processes, self.commodities
+        if by != 'sector':
+            raise ValueError(f"Unknown aggregation {by}. Use 'process' or 'sector'.")
+        # aggregate the processes to sectors with a single bincount
+        cells  = self.process_sectors[processes] * len(self.commodities) + commodities
+        sums   = np.bincount(cells, weights=levels, minlength=len(self.sectors) * len(self.commodities))
+        counts = np.bincount(cells, minlength=len(self.sectors) * len(self.commodities))
+        cells  = np.flatnonzero(counts)
+        return cells // len(self.commodities), cells % len(self.commodities), sums[cells], self.sectors, self.commodities
+
+    def to_scipy(self, year: int, kind: str = 'output', by: str = 'process'):
+        """
+        The flows of a year as a scipy.sparse matrix (see "matrix"). Requires scipy.
+        """
+        from scipy.sparse import coo_matrix
+        rows, columns, values, row_labels, column_labels = self.matrix(year, kind, by)
+        return coo_matrix((values, (rows, columns)), shape=(len(row_labels), len(column_labels)))
+
+    def edges(self, year: int = None, by: str = 'process', commodities: list = None) -> pd.DataFrame:
+        """
+        The flows as a table of edges with the columns year, source, target, value and kind. Outputs go from
+        processes (or sectors with by="sector") to commodities, inputs from commodities to processes.
+        - "year" a year, or all years if None
+        - "commodities" commodities to include. By default all.
+        """
+        tables = []
+        for year in (self.years if year is None else [year]):
+            for kind in self.flows:
+                rows, columns, values, row_labels, column_labels = self.matrix(year, kind, by)
+                nodes, commodity = row_labels[rows], column_labels[columns]
+                source, target = (nodes, commodity) if kind == 'output' else (commodity, nodes)
+                tables.append(pd.DataFrame({'year': year, 'source': source, 'target': target, 'value': values, 'kind': kind}))
+        df = pd.concat(tables, ignore_index=True)
+        if commodities is not None:
+            commodity = np.where(df['kind'] == 'output', df['target'], df['source'])
+            df = df[np.isin(commodity, list(commodities))]
+        return df.reset_index(drop=True)
+
+
+@profiled
+def get_flow_graph(gdx_data: dict, region=None, scenario: str = None) -> FlowGraph:
+    """
+    Flow graph (see "FlowGraph") of the gdx data. The graph is built once per region and rebuilt if
+    "OutputAnnualByProcess" or "InputAnnualByProcess" is replaced or invalidated (see "derived").
+    """
+    gdx_data = select_scenario(gdx_data, scenario)
+    inputs   = table_version(gdx_data['InputAnnualByProcess']) if 'InputAnnualByProcess' in gdx_data else None
+    key      = ('flow_graph', tuple(region) if isinstance(region, (list, tuple)) else region, inputs)
+    return derived(gdx_data['OutputAnnualByProcess'], key, lambda df: FlowGraph(gdx_data, region))
+
+
+def node_color(node: str, commodities: set) -> any:
+    return 'lightgray' if node in commodities else styles.color(process_sector(node))
+
+
+def draw_sankey(ax, edges: pd.DataFrame, commodities: set, scale: float, gap: float) -> None:
+    """
+    Draw the edges of a year as a Sankey diagram: producers on the left, commodities in the middle and consumers on the right.
+    """
+    outputs, inputs = edges[edges['kind'] == 'output'], edges[edges['kind'] == 'input']
+    columns = [
+        outputs.groupby('source')['value'].sum(),
+        pd.concat([outputs.groupby('target')['value'].sum(), inputs.groupby('source')['value'].sum()], axis=1).max(axis=1),
+        inputs.groupby('target')['value'].sum(),
+    ]
+    # node positions: stacked from the top, largest first
+    positions = {}
+    for x, totals in enumerate(columns):
+        y = 1.0
+        for node, total in totals.sort_values(ascending=False).items():
+            height = total * scale
+            positions[(x, node)] = [y, y]  # next free y of the outgoing and incoming flows
+            ax.add_patch(Rectangle((x - 0.02, y - height), 0.04, height, color=node_color(node, commodities), linewidth=0))
+            ax.text(x + (0.04 if x < 2 else -0.04), y - height / 2, node, va='center', ha='left' if x < 2 else 'right', fontsize=7)
+            y -= height + gap
+
+    for x, flows in [(0, outputs), (1, inputs)]:
+        for source, target, value in flows.sort_values('value', ascending=False)[['source', 'target', 'value']].itertuples(index=False):
+            height = value * scale
+            start, end = positions[(x, source)], positions[(x + 1, target)]
+            y0, y1 = start[0], end[1]
+            start[0] -= height
+            end[1]   -= height
+            middle = x + 0.5
+            path = Path([(x + 0.02, y0), (middle, y0), (middle, y1), (x + 0.98, y1), (x + 0.98, y1 - height),
+                         (middle, y1 - height), (middle, y0 - height), (x + 0.02, y0 - height), (x + 0.02, y0)],
+                        [Path.MOVETO, Path.CURVE4, Path.CURVE4, Path.CURVE4, Path.LINETO, Path.CURVE4, Path.CURVE4, Path.CURVE4, Path.CLOSEPOLY])
+            color = node_color(source if x == 0 else target, commodities)
+            ax.add_patch(PathPatch(path, facecolor=color, alpha=0.4, linewidth=0))
+    return
+
+
+@profiled
+def plot_sankey(gdx_data, year: int, by: str = 'sector', commodities: list = None, min_share: float = 0.005, region=None, set_title: str = "", scenario: str = None, scale: float = None, ax=None) -> any:
+    """
+    Sankey diagram of the flows of a year (see "FlowGraph"): the sectors (or processes with by="process") producing
+    each commodity and, if the data has "InputAnnualByProcess", the sectors using it.
+    - "commodities" commodities to include, e.g. ["ELECGen", "CRUD"]. Flows are in the units of each commodity,
+      so select commodities of the same unit for comparable widths.
+    - "min_share" flows smaller than this share of the largest column total are left out
+    - "region" a region or list of regions, by default all regions are summed
+    - "scale" height per unit of flow, e.g. to draw several years to the same scale. By default the diagram fills the axes.
+    """
+    if ax is None:
+        ax = plt.gca()
+    graph = gdx_data if isinstance(gdx_data, FlowGraph) else get_flow_graph(gdx_data, region, scenario)
+    edges = graph.edges(year, by, commodities)
+
+    totals = [edges.loc[edges['kind'] == kind, 'value'].sum() for kind in ['output', 'input']]
+    edges  = edges[edges['value'] >= min_share * max(totals + [0])]
+    gap    = 0.02
+    if scale is None:
+        nodes = max(edges.groupby('kind')[column].nunique().max() for column in ['source', 'target']) if len(edges) else 1
+        scale = (1 - gap * nodes) / max(max(totals), 1e-12)
+
+    draw_sankey(ax, edges, set(graph.commodities), scale, gap)
+    ax.set_xlim(-0.1, 2.1 if 'input' in graph.flows else 1.3)
+    ax.set_ylim(min(0, ax.dataLim.y0) if len(edges) else 0, 1.02)
+    ax.axis('off')
+    ax.set_title(set_title if set_title else f"Flows in {year}")
+    return ax
+
+
+def plot_sankey_years(gdx_data, years: list = None, ncols: int = 3, fig=None, **kwargs) -> any:
+    """
+    Sankey diagrams (see "plot_sankey") of several years on one figure, drawn to the same scale so that the widths
+    can be compared across the years. Defaults to every other model year. Other arguments are passed to "plot_sankey".
+    The figure is returned.
+    """
+    graph = gdx_data if isinstance(gdx_data, FlowGraph) else get_flow_graph(gdx_data, kwargs.pop('region', None), kwargs.pop('scenario', None))
+    years = list(graph.years[::2]) if years is None else list(years)
+    by, commodities = kwargs.get('by', 'sector'), kwargs.get('commodities')
+
+    # the scale of the year with the largest flows
+    largest = max(graph.edges(year, by, commodities).groupby('kind')['value'].sum().max() for year in years)
+    kwargs.setdefault('scale', 0.8 / largest)
+
+    ncols = min(ncols, len(years))
+    nrows = math.ceil(len(years) / ncols)
+    if fig is None:
+        fig = plt.figure(figsize=(5 * ncols, 4 * nrows))
+    axes = fig.subplots(nrows, ncols, squeeze=False).flatten()
+    for year, ax in zip(years, axes):
+        plot_sankey(graph, year, ax=ax, **kwargs)
+    for ax in axes[len(years):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    return fig
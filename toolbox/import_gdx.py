@@ -1,128 +1,579 @@
-import gdxpds as gdx, re
+import re, os, glob, time, logging, functools
+from abc import ABC, abstractmethod
+import pandas as pd
+from collections.abc import MutableMapping
+from toolbox.profiling import profiled, profile_step
+from toolbox.errors import MissingSymbolError
 
 
-def gdx_remove_emtpy(input_dict: dict) -> dict:
+# progress and timing messages, shown with e.g. logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+ESSENTIAL_OUTPUTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'essential_outputs.txt')
+
+JUNK_PATTERNS = [re.compile("EQ_*"), re.compile("data_*")]
+JUNK_DATA     = 'Objective,CLIM_TOCEAN,CLIM_tocean0,path,tstep,timestep,weekk,hourr,hour_last,SpecifiedDemandProfile,DaysInDayType,Conversionls,Conversionlh,Conversionld,CommodityHasEqualityBalance,YearSplit,t,tt,TIMESLICE,l,SEASON,ls,lsls,DAYTYPE,ld,ldld,DAILYTIMEBRACKET,lh,lhlh,p,c,e,m,s,r,rr,box,boxx,boxxx,i,z'.split(',')
+JUNK_COLUMNS  = ['Marginal', 'Lower', 'Upper','Scale']
+
+# set columns renamed to the toolbox names (after making the column names lowercase)
+RENAMED_COLUMNS = {'t': 'year', 'time': 'year', 'r': 'region', 'pool': 'biome', 'use': 'landuse'}
+# symbols with age classes, e.g. "age5"
+AGE_SYMBOLS     = ['LU_Area_SecdF', 'LU_clear_sec']
+
+VALUE_COLUMNS = ['level', 'value', 'marginal', 'lower', 'upper', 'scale']
+# files at least this large are imported with compact data types by default
+COMPACT_FILE_SIZE = 50 * 2**20
+
+# increase when the cleaning rules below change such that cached results are no longer valid
+CLEANING_VERSION = 1
+
+
+def is_junk_symbol(key: str) -> bool:
     """
-    Remove empty dataframes from the gdx data.
+    Check if a gdx symbol is an equation, input data or other aid parameter used to produce the SuCCESs results.
     """
-    keys = list(input_dict.keys())
+    return any(pattern.match(key) for pattern in JUNK_PATTERNS) or key in JUNK_DATA
+
+
+def read_essential_outputs() -> list:
+    """
+    Read the list of essential SuCCESs outputs from "essential_outputs.txt".
+    """
+    with open(ESSENTIAL_OUTPUTS_FILE) as f:
+        essentials = f.read().splitlines()
     
-    for key in keys:
-        
-        if input_dict[key].empty:
-            del input_dict[key]
-        else:
-            pass
-        
-    return input_dict
+    return essentials
 
 
-def gdx_remove_junk_data(input_dict: dict) -> dict:
+class CleaningPlan:
     """
-    Remove the Equations, input data and other aid parameters used to produce the SuCCESs results from the gdx. 
-    The function takes a dictionary as input and delivers a cleaned dictionary.
+    The cleaning rules of the gdx data, compiled once and applied to each symbol in a single pass:
+    - symbols that are empty, equations, input data or aid parameters (and not essential outputs) are dropped
+    - the columns "Marginal", "Lower", "Upper" and "Scale" are dropped
+    - column names are made lowercase and set columns renamed to the toolbox names (e.g. "t" to "year", "r" to "region")
+    - years and age classes are converted to numbers
+    The cleaned table is built from the kept columns directly, without intermediate copies of the whole table.
+    - "only_essential_outputs" if only the essential (i.e. main) outputs are kept
     """
-    # 1 
-    patterns = [re.compile("EQ_*"), re.compile("data_*")]
+    def __init__(self, only_essential_outputs: bool=True):
+        self.keep     = set(read_essential_outputs()) if only_essential_outputs else None
+        # column projection and new names by the columns of the raw table, e.g. ("R", "T", "Level", ...)
+        self.projections = {}
     
-    for pattern in patterns:
-        matched_keys = {key for key, value in input_dict.items() if pattern.match(key)}
-        
-        for key in matched_keys:
-            input_dict.pop(key, None)
+    def keeps(self, key: str, records: int = None) -> bool:
+        """
+        Check if a symbol is kept, without reading its data. "records" is the number of records, if known.
+        """
+        if records == 0 or is_junk_symbol(key):
+            return False
+        return self.keep is None or key in self.keep
     
-    #2
-    junk_data    = 'Objective,CLIM_TOCEAN,CLIM_tocean0,path,tstep,timestep,weekk,hourr,hour_last,SpecifiedDemandProfile,DaysInDayType,Conversionls,Conversionlh,Conversionld,CommodityHasEqualityBalance,YearSplit,t,tt,TIMESLICE,l,SEASON,ls,lsls,DAYTYPE,ld,ldld,DAILYTIMEBRACKET,lh,lhlh,p,c,e,m,s,r,rr,box,boxx,boxxx,i,z'.split(',')
-    for junk in junk_data:
-        try:
-            del input_dict[junk]
-        except:
-            pass
+    def projection(self, columns) -> list:
+        """
+        Kept columns of a raw table with their new names, i.e. [(raw name, new name), ...].
+        """
+        columns = tuple(columns)
+        if columns not in self.projections:
+            self.projections[columns] = [(column, RENAMED_COLUMNS.get(column.lower(), column.lower())) for column in columns if column not in JUNK_COLUMNS]
+        return self.projections[columns]
+    
+    def clean(self, key: str, df):
+        """
+        Clean a single raw table. Returns None if the symbol is dropped.
+        """
+        if df.empty or not self.keeps(key):
+            return None
+        return self.tidy(key, df)
+    
+    def tidy(self, key: str, df):
+        """
+        Apply the column projection, renaming and conversions to a single raw table, whether the symbol is kept or not.
+        """
+        data = {}
+        for column, name in self.projection(df.columns):
+            values = df[column]
+            if name == 'year':
+                try:
+                    values = values.astype(int)
+                except (ValueError, TypeError):
+                    pass
+            elif name == 'age' and key in AGE_SYMBOLS:
+                # converting age class to number
+                values = values.astype(str).str.lstrip('age').astype(int)
+            elif values.dtype.kind == 'f':
+                # the values are stored together with the dropped columns, copy them to release that memory
+                values = values.copy()
+            data[name] = values
+        
+        return pd.DataFrame(data, copy=False)
     
-    return input_dict
+    def __call__(self, tables):
+        """
+        Clean a stream of raw tables, i.e. (symbol, dataframe) pairs, yielding the cleaned tables that are kept.
+        """
+        for key, df in tables:
+            df = self.clean(key, df)
+            if df is not None:
+                yield key, df
 
 
-def gdx_remove_junk_columns(input_dict: dict) -> dict:
+@profiled
+def compact_dtypes(gdx_data: dict, float32: bool=False) -> dict:
     """
-    Remove uncesessary columns from the tables of the gdx data.
+    Convert the gdx data to compact data types to save memory:
+    - set columns (e.g. "process", "commodity", "region") to categoricals. Each set has one category table shared by all tables.
+    - "year" and "age" to 16-bit integers
+    - value columns (e.g. "level") to 32-bit floats if "float32" is True
     """
+    # collect the elements of each set from all tables
+    elements = {}
+    for df in gdx_data.values():
+        for column in df.columns:
+            if column in VALUE_COLUMNS or column in ['year', 'age'] or isinstance(df[column].dtype, pd.CategoricalDtype):
+                continue
+            if df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+                elements.setdefault(column, set()).update(df[column].unique())
+    set_dtypes = {column: pd.CategoricalDtype(sorted(values, key=str)) for column, values in elements.items()}
     
-    keys         = list(input_dict.keys())
-    junk_columns = ['Marginal', 'Lower', 'Upper','Scale']
+    for key, df in gdx_data.items():
+        for column in df.columns:
+            if column in set_dtypes:
+                df[column] = pd.Categorical(df[column], dtype=set_dtypes[column])
+            elif column in ['year', 'age'] and pd.api.types.is_integer_dtype(df[column]):
+                df[column] = df[column].astype('int16')
+            elif float32 and column in VALUE_COLUMNS and pd.api.types.is_float_dtype(df[column]):
+                df[column] = df[column].astype('float32')
+    
+    return gdx_data
+
+
+@profiled
+def clean_gdx_data(response: dict, only_essential_outputs: bool=True) -> dict:
+    """
+    Clean the raw tables read from a .gdx file, i.e. {symbol: dataframe} as returned by gdxpds (see "CleaningPlan").
+    The raw tables are removed from "response" one by one as they are cleaned.
+    """
+    plan = CleaningPlan(only_essential_outputs)
+    return dict(plan((key, response.pop(key)) for key in list(response)))
+
+
+def form_gdx_path(gdx_filename: str, gdx_folder_path: str = "") -> str:
+    """
+    Form the path to a .gdx file from the file name and folder path. The file extension is added if not included.
+    """
+    # Add file extension to file name if not included
+    if not gdx_filename.split(".")[-1] == "gdx":
+        gdx_filename = f"{gdx_filename}.gdx"
     
-    for key in keys:
+    # Form str for path
+    if not gdx_folder_path:
+        return f"{gdx_filename}"
+    else:
+        return f"{gdx_folder_path}/{gdx_filename}"
+
+
+class GdxReader(ABC):
+    """
+    Interface of the backends reading the symbols of a .gdx file (see READERS). A backend implements
+    - "available" if its packages can be imported
+    - "symbols" the symbols of a file with their number of records (None if not known without reading)
+    - "read" a generator of (symbol, table) for the symbols accepted by keeps(symbol, records), one table at a time
+    The tables are raw, i.e. as read by gdxpds (e.g. columns "t", "Level" and "Marginal"), unless "cleaned" is set.
+    """
+    name    = None
+    cleaned = False
+
+    @abstractmethod
+    def available(self) -> bool:
+        ...
+
+    @abstractmethod
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        ...
+
+    @abstractmethod
+    def read(self, path_to_gdx_file: str, keeps=None):
+        ...
+
+    def read_symbol(self, path_to_gdx_file: str, symbol: str):
+        for key, df in self.read(path_to_gdx_file, lambda key, records: key == symbol):
+            return df
+        raise MissingSymbolError(symbol, path_to_gdx_file)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+def unique_names(names) -> list:
+    """
+    Column names of the domains of a symbol, with repeated domains (e.g. "*,*" or "r,r") numbered by their position, e.g. ["r", "r_1"].
+    """
+    unique = []
+    for i, name in enumerate(names):
+        while name in unique:
+            name = f"{name}_{i}"
+        unique.append(name)
+    return unique
+
+
+def check_gdx_file(path_to_gdx_file: str) -> None:
+    if not os.path.isfile(path_to_gdx_file):
+        raise FileNotFoundError(f"No such .gdx file: {path_to_gdx_file}")
+    return
+
+
+class GdxpdsReader(GdxReader):
+    """
+    Reads .gdx files with gdxpds. Needs a local GAMS installation.
+    """
+    name = 'gdxpds'
+
+    def available(self) -> bool:
         try:
-            input_dict[key] = input_dict[key].drop(columns=junk_columns, axis=1)
-        except:
-            pass
-        
-    return input_dict
+            import gdxpds
+            return True
+        except Exception:
+            return False
+
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        import gdxpds as gdx
+        check_gdx_file(path_to_gdx_file)
+        with gdx.gdx.GdxFile(gams_dir=None, lazy_load=True) as f:
+            f.read(path_to_gdx_file)
+            return {symbol.name: symbol.num_records for symbol in f}
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        import gdxpds as gdx
+        check_gdx_file(path_to_gdx_file)
+        with gdx.gdx.GdxFile(gams_dir=None, lazy_load=True) as f:
+            f.read(path_to_gdx_file)
+            for symbol in f:
+                if keeps is not None and not keeps(symbol.name, symbol.num_records):
+                    continue
+                with profile_step('gdx_read', symbol=symbol.name) as record:
+                    symbol.load()
+                    record['rows'] = symbol.num_records
+                df = symbol.dataframe
+                symbol.unload()
+                yield symbol.name, df
+
+    def read_symbol(self, path_to_gdx_file: str, symbol: str):
+        import gdxpds as gdx
+        check_gdx_file(path_to_gdx_file)
+        df = gdx.read_gdx.to_dataframe(path_to_gdx_file, symbol, gams_dir=None)
+        # older gdxpds versions return {symbol: dataframe}
+        if isinstance(df, dict):
+            df = df[symbol]
+        return df
+
+
+class TransferReader(GdxReader):
+    """
+    Reads .gdx files with the GAMS transfer API (the "gamsapi[transfer]" package), which ships its own GDX library,
+    so GAMS does not need to be installed. The tables are converted to the gdxpds layout, so they are cleaned the same way.
+    """
+    name = 'gams.transfer'
 
+    def available(self) -> bool:
+        try:
+            import gams.transfer
+            return True
+        except Exception:
+            return False
+
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        import gams.transfer as gt
+        check_gdx_file(path_to_gdx_file)
+        # only the symbol table, no records
+        container = gt.Container()
+        container.read(path_to_gdx_file, records=False)
+        return {name: None for name in container.listSymbols()}
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        import gams.transfer as gt
+        symbols = [name for name in self.symbols(path_to_gdx_file) if keeps is None or keeps(name, None)]
+        for name in symbols:
+            container = gt.Container()
+            with profile_step('gdx_read', symbol=name) as record:
+                container.read(path_to_gdx_file, symbols=[name])
+                symbol = container[name]
+                df     = self.gdxpds_layout(symbol)
+                record['rows'] = len(df)
+            yield name, df
+
+    @staticmethod
+    def gdxpds_layout(symbol) -> pd.DataFrame:
+        """
+        Records of a GAMS transfer symbol with the gdxpds column names ("t", "Level", "Value", ...) and the set elements as strings.
+        Repeated domains keep a column each, see "unique_names".
+        """
+        df = symbol.records
+        if df is None:
+            return pd.DataFrame()
+        data    = {}
+        domains = unique_names(symbol.domain_names[:symbol.dimension])
+        for i, column in enumerate(df.columns):
+            values = df[column]
+            if i < symbol.dimension:
+                name = domains[i]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # decode the categories once instead of each element
+                    values = pd.Series(values.cat.categories.to_numpy(dtype=object)[values.cat.codes.to_numpy()], index=df.index)
+            else:
+                name = column.capitalize()
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+class ParquetReader(GdxReader):
+    """
+    Reads the results of a .gdx file from a Parquet dataset written by "export_gdx_files", e.g. on machines without
+    GAMS or a .gdx reader. The scenario is the .gdx file name without extension, and the tables are already cleaned.
+    - "dataset_path" folder of the Parquet dataset
+    Requires the pyarrow package.
+    """
+    name    = 'parquet'
+    cleaned = True
+
+    def __init__(self, dataset_path: str = None):
+        self.dataset_path = dataset_path if dataset_path else os.environ.get('SUCCESS_TOOLBOX_PARQUET')
+
+    def __repr__(self):
+        return f"ParquetReader('{self.dataset_path}')"
+
+    def available(self) -> bool:
+        try:
+            import pyarrow
+        except ImportError:
+            return False
+        return bool(self.dataset_path) and os.path.isdir(self.dataset_path)
+
+    def folder(self, path_to_gdx_file: str) -> str:
+        scenario = os.path.splitext(os.path.basename(path_to_gdx_file))[0]
+        folder   = os.path.join(self.dataset_path, f"scenario={scenario}")
+        if not os.path.isdir(folder):
+            raise FileNotFoundError(f"Scenario {scenario} not found in the Parquet dataset {self.dataset_path}.")
+        return folder
+
+    def symbols(self, path_to_gdx_file: str) -> dict:
+        import pyarrow.parquet as pq
+        symbols = {}
+        for folder in sorted(glob.glob(os.path.join(self.folder(path_to_gdx_file), 'symbol=*'))):
+            symbols[os.path.basename(folder)[len('symbol='):]] = sum(pq.ParquetFile(file).metadata.num_rows for file in glob.glob(os.path.join(folder, '*.parquet')))
+        return symbols
+
+    def read(self, path_to_gdx_file: str, keeps=None):
+        import pyarrow.parquet as pq
+        for name, records in self.symbols(path_to_gdx_file).items():
+            if keeps is not None and not keeps(name, records):
+                continue
+            with profile_step('parquet_read', symbol=name) as record:
+                files = sorted(glob.glob(os.path.join(self.folder(path_to_gdx_file), f"symbol={name}", '*.parquet')))
+                df    = pd.concat([pq.read_table(file).to_pandas() for file in files], ignore_index=True)
+                record['rows'] = len(df)
+            yield name, df
+
+
+# reader backends by name. Without a "reader" argument, the first available of DEFAULT_READERS is used
+# (or the one named by the SUCCESS_TOOLBOX_READER environment variable), with a fallback to the Parquet dataset
+# in SUCCESS_TOOLBOX_PARQUET if no .gdx reader is installed.
+READERS = {
+    'gams.transfer' : TransferReader,
+    'gdxpds'        : GdxpdsReader,
+    'parquet'       : ParquetReader,
+}
+DEFAULT_READERS = ['gams.transfer', 'gdxpds']
+
+
+def get_reader(reader=None) -> GdxReader:
+    """
+    The reader backend to use: a reader, the name of a reader (see READERS) or None for the default.
+    """
+    if isinstance(reader, GdxReader):
+        return reader
+    if reader is None:
+        reader = os.environ.get('SUCCESS_TOOLBOX_READER')
+    if reader is not None:
+        if reader not in READERS:
+            raise ValueError(f"Unknown reader {reader}. Use one of {list(READERS)}.")
+        return READERS[reader]()
+    for name in DEFAULT_READERS + ['parquet']:
+        candidate = READERS[name]()
+        if candidate.available():
+            return candidate
+    raise ImportError("No .gdx reader available. Install gdxpds (with GAMS) or gamsapi[transfer], "
+                      "or set SUCCESS_TOOLBOX_PARQUET to a Parquet dataset exported with export_gdx_files.")
+
+
+def list_gdx_symbols(path_to_gdx_file: str, reader=None) -> dict:
+    """
+    List the symbols of a .gdx file with their number of records without reading the data itself.
+    The number of records is None if the reader does not know it without reading the symbol.
+    """
+    return get_reader(reader).symbols(path_to_gdx_file)
+
+
+@profiled
+def read_gdx_symbol(path_to_gdx_file: str, symbol: str, reader=None):
+    """
+    Read and clean a single symbol from a .gdx file.
+    """
+    reader = get_reader(reader)
+    df     = reader.read_symbol(path_to_gdx_file, symbol)
+    if reader.cleaned:
+        return df
+    return CleaningPlan(only_essential_outputs=False).tidy(symbol, df)
+
+
+def stream_gdx_file(path_to_gdx_file: str, plan: CleaningPlan, progress=None, reader=None):
+    """
+    Read the symbols of a .gdx file one by one, yielding (symbol, cleaned dataframe) for the symbols kept by the "plan".
+    Only one raw table is in memory at a time, and dropped symbols are not read at all.
+    - "progress" optional function called as progress(done, total, symbol) after each symbol of the file, read or skipped
+    - "reader" reader backend, see "get_reader"
+    """
+    reader  = get_reader(reader)
+    symbols = reader.symbols(path_to_gdx_file) if progress else None
+    done    = 0
+
+    def keeps(key, records):
+        nonlocal done
+        kept = plan.keeps(key, records)
+        if not kept and progress:
+            done += 1
+            progress(done, len(symbols), key)
+        return kept
+
+    for key, df in reader.read(path_to_gdx_file, keeps):
+        if not reader.cleaned:
+            with profile_step('clean', symbol=key) as record:
+                df = plan.clean(key, df)
+                record['rows'] = None if df is None else len(df)
+        elif df.empty:
+            df = None
+        if progress:
+            done += 1
+            progress(done, len(symbols), key)
+        if df is not None:
+            yield key, df
 
 
-# reduce to essential success outputs
-def filter_essential_outputs(input_dict: dict) -> dict:
+class LazyGdxData(MutableMapping):
+    """
+    Dictionary-like view to the symbols of a .gdx file. The keys are known when the file is opened, 
+    but the data of a symbol is read and cleaned only when it is accessed the first time.
+    Use it like the dictionary returned by "import_gdx_file".
+    - "reader" function reading a single symbol as reader(path, symbol). Defaults to reading the .gdx file.
+    """
+    def __init__(self, path: str, symbols: list, reader=None):
+        self.path    = path
+        self.symbols = list(symbols)
+        self.reader  = reader if reader is not None else read_gdx_symbol
+        self.loaded  = {}
     
-    with open('toolbox/essential_outputs.txt') as f:
-        essentials = f.read().splitlines()
+    def __getitem__(self, key):
+        if key not in self.loaded:
+            if key not in self.symbols:
+                raise MissingSymbolError(key, self.path)
+            self.loaded[key] = self.reader(self.path, key)
+        return self.loaded[key]
+    
+    def __setitem__(self, key, value):
+        if key not in self.symbols:
+            self.symbols.append(key)
+        self.loaded[key] = value
     
-    to_clear = set(input_dict.keys()).difference(essentials)
-    for key in to_clear:
-        del input_dict[key]
+    def __delitem__(self, key):
+        if key not in self.symbols:
+            raise MissingSymbolError(key, self.path)
+        self.symbols.remove(key)
+        self.loaded.pop(key, None)
     
-    return input_dict
+    def __iter__(self):
+        return iter(self.symbols)
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    def __contains__(self, key):
+        return key in self.symbols
+    
+    def __repr__(self):
+        return f"LazyGdxData('{self.path}', {len(self.loaded)}/{len(self.symbols)} symbols loaded)"
+    
+    def copy(self) -> dict:
+        return dict(self.items())
+    
+    def load_all(self) -> dict:
+        """
+        Read all symbols and return them as a regular dictionary.
+        """
+        return self.copy()
+
+
+def open_gdx_file(gdx_filename: str, gdx_folder_path: str = "", symbols: list = None, only_essential_outputs: bool=True, reader=None) -> LazyGdxData:
+    """
+    Opens a .gdx file without reading its data. Only the symbols that are accessed are read (and cleaned as in "import_gdx_file").
+    - "gdx_filename" should state the name of the file
+    - "gdx_folder_path" the path to the file folder, if not in the same directory as the script
+    - "symbols" list of symbols to make available. By default all non-empty result symbols are available.
+    - "only_essential_outputs" if only the essential (i.e. main) outputs should be available. Ignored if "symbols" is given.
+    - "reader" reader backend, see "get_reader"
+    """
+    path_to_gdx_file = form_gdx_path(gdx_filename, gdx_folder_path)
+    
+    reader    = get_reader(reader)
+    available = list_gdx_symbols(path_to_gdx_file, reader)
+    
+    if symbols is not None:
+        missing = [symbol for symbol in symbols if symbol not in available]
+        if missing:
+            raise MissingSymbolError(missing[0] if len(missing) == 1 else missing, path_to_gdx_file)
+        keys = list(symbols)
+    else:
+        keys = [key for key, records in available.items() if records != 0 and not is_junk_symbol(key)]
+        if only_essential_outputs:
+            essentials = set(read_essential_outputs())
+            keys = [key for key in keys if key in essentials]
+    
+    return LazyGdxData(path_to_gdx_file, keys, functools.partial(read_gdx_symbol, reader=reader))
 
 
 # exported import function
-def import_gdx_file(gdx_filename: str, gdx_folder_path:str = "", only_essential_outputs: bool=True) -> dict:
+@profiled
+def import_gdx_file(gdx_filename: str, gdx_folder_path:str = "", only_essential_outputs: bool=True, verbose: bool=True, compact: bool=None, float32: bool=False, progress=None, reader=None) -> dict:
     """
     Imports data form a .gdx file. 
     - "gdx_filename" should state the name of the file
     - "gdx_folder_path" the path to the file folder, if not in the same directory as the script
     - "only_essential_outputs" if only the essential (i.e. main) outputs should be included in the imported dictionary.
+    - "verbose" set to False to not log progress messages. They are logged by the "toolbox.import_gdx" logger
+      at INFO level, e.g. shown with logging.basicConfig(level=logging.INFO).
+    - "compact" if set columns should be categorical and years 16-bit integers to save memory (see "compact_dtypes"). 
+      By default only for files larger than 50 MB.
+    - "float32" if the values should be stored as 32-bit floats. Only used with "compact".
+    - "progress" optional function called as progress(done, total, symbol) after each symbol of the file
+    - "reader" the backend reading the file: "gams.transfer", "gdxpds", "parquet" or a reader (see "get_reader").
+      By default the first installed of gams.transfer and gdxpds.
+    A missing file raises FileNotFoundError.
     """
-    # Add file extension to file name if not included
-    if not gdx_filename.split(".")[-1] == "gdx":
-        return import_gdx_file(gdx_filename=f"{gdx_filename}.gdx", gdx_path=gdx_folder_path)
-    
-    # Form str for path
-    if not gdx_folder_path:
-        path_to_gdx_file = f"{gdx_filename}"
-    else:
-        path_to_gdx_file = f"{gdx_folder_path}/{gdx_filename}"
+    path_to_gdx_file = form_gdx_path(gdx_filename, gdx_folder_path)
     
     # Import data and return
-    #try:
-    print(f"Trying to read: {path_to_gdx_file}")
-    response = gdx.read_gdx.to_dataframes(path_to_gdx_file, gams_dir=None)
-    
-    print('Cleaning up data.')
-    # Remove empty dataframes from the imported data
-    response = gdx_remove_emtpy(response)
-    # Remove equations, inputdata and aid parameters
-    response = gdx_remove_junk_data(response)
-    # Remove junk columns from dataframes
-    response = gdx_remove_junk_columns(response)
-    # Filter such that only essential outputs remain
-    if only_essential_outputs:
-        response = filter_essential_outputs(response)
-    
-    # make all column names lowercase
-    for key in response:
-        columns = list(response[key].columns)
-        columns_lowercase = [el.lower() for el in columns]
-        response[key].rename(columns=dict(zip(columns, columns_lowercase)), inplace=True)
-        response[key].rename(columns=dict(zip(['t','time','r','pool','use'], ['year','year','region','biome','landuse'])), inplace=True)
-        try:
-            response[key]["year"] = response[key]["year"].astype(int)
-        except:
-            pass
-    
-    # further specific cleaning-up
-    # converting age class to number
-    for var in ['LU_Area_SecdF','LU_clear_sec']:
-        response[var]['age'] = response[var].age.astype(str).str.lstrip('age').astype(int)
+    # checking the logger level once keeps the batch imports (verbose=False or logging off) free of message formatting
+    log   = verbose and logger.isEnabledFor(logging.INFO)
+    start = time.perf_counter()
+    if log:
+        logger.info("Reading %s", path_to_gdx_file)
+    # each symbol is cleaned as soon as it is read
+    response = dict(stream_gdx_file(path_to_gdx_file, CleaningPlan(only_essential_outputs), progress, reader))
     
+    if compact is None:
+        compact = os.path.isfile(path_to_gdx_file) and os.path.getsize(path_to_gdx_file) >= COMPACT_FILE_SIZE
+    if compact:
+        response = compact_dtypes(response, float32=float32)
     
-    print(f"Data fetch from {gdx_filename} successful.")
-    return response
\ No newline at end of file
+    if log:
+        logger.info("Read %d symbols from %s in %.2f s", len(response), gdx_filename, time.perf_counter() - start)
+    return response
@@ -0,0 +1,139 @@
+import os, traceback
+import pandas as pd
+
+from toolbox.batch import find_gdx_files, scenario_names, import_gdx_files, log_progress
+from toolbox.cache import hash_file_content
+from toolbox.ensemble import Ensemble
+from toolbox.climate_and_emissions import calculate_total_netemissions_co2eq
+
+
+def landuse_shares(gdx_data: dict) -> pd.DataFrame:
+    """
+    Share of each land use of the total land area by year.
+    """
+    area = gdx_data['LU_AreaByUse'].pivot(index='year', columns='landuse', values='value')
+    return area.div(area.sum(axis=1), axis=0)
+
+
+# aggregates kept up to date by "IncrementalEnsemble": {name: function computing it for a single run, by year}
+DEFAULT_AGGREGATES = {
+    'co2eq'          : calculate_total_netemissions_co2eq,
+    'landuse_shares' : landuse_shares,
+}
+
+
+class IncrementalEnsemble:
+    """
+    Ensemble of the .gdx files in a folder that is refreshed incrementally, e.g. while a scenario sweep is still running.
+    A manifest of the loaded files (path, size, modification time and optionally content hash) is kept, and "refresh"
+    imports only new and modified files and drops the runs of deleted files.
+    Aggregates (see DEFAULT_AGGREGATES) are computed once per run and combined across the runs when requested.
+    - "gdx_files" a folder, a glob pattern (e.g. "results/run_*.gdx") or a list of paths
+    - "aggregates" {name: function(gdx_data)} of per-run aggregates by year. Defaults to the CO2-eq emissions and land-use shares.
+    - "hash_content" if the content of changed files should be hashed, so that files that are only touched or copied are not re-imported
+    - "processes", "only_essential_outputs", "use_cache", "cache_dir", "compact", "progress", "timing_dir" and "reader"
+      are passed to "import_gdx_files"
+    """
+    def __init__(self, gdx_files, aggregates: dict = None, hash_content: bool = False, processes: int = None, only_essential_outputs: bool = True, use_cache: bool = False, cache_dir: str = None, compact: bool = None, progress=log_progress, timing_dir: str = None, reader=None):
+        self.gdx_files    = gdx_files
+        self.aggregates   = dict(aggregates) if aggregates is not None else dict(DEFAULT_AGGREGATES)
+        self.hash_content = hash_content
+        self.options      = {'processes': processes, 'only_essential_outputs': only_essential_outputs, 'use_cache': use_cache, 'cache_dir': cache_dir, 'compact': compact, 'progress': progress,
+                             'timing_dir': timing_dir, 'reader': reader}
+        self.ensemble     = Ensemble()
+        # {scenario: {"path", "size", "mtime", "hash", "error"}} of the files seen so far, including failed ones
+        self.manifest     = {}
+        self.results      = {name: {} for name in self.aggregates}
+        self.errors       = {}
+
+    def __repr__(self):
+        return f"IncrementalEnsemble({len(self.ensemble.scenarios)} scenarios, {len(self.errors)} errors)"
+
+    def file_state(self, path: str, previous: dict = None) -> dict:
+        """
+        Manifest entry of a file. The content is hashed (if "hash_content") only if the size or modification time changed.
+        """
+        stat  = os.stat(path)
+        state = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': None, 'error': None}
+        if self.hash_content:
+            unchanged = previous and previous['size'] == state['size'] and previous['mtime'] == state['mtime']
+            state['hash'] = previous['hash'] if unchanged else hash_file_content(path)
+        return state
+
+    def changes(self) -> tuple:
+        """
+        Compare the files to the manifest. Returns the new or modified files as {scenario: manifest entry} and the removed scenarios.
+        """
+        paths   = scenario_names(find_gdx_files(self.gdx_files))
+        changed = {}
+        for scenario, path in paths.items():
+            previous = self.manifest.get(scenario)
+            state    = self.file_state(path, previous)
+            if previous is None or previous['path'] != state['path']:
+                changed[scenario] = state
+            elif self.hash_content and previous['hash'] == state['hash']:
+                # touched or copied, but the same content
+                previous.update(size=state['size'], mtime=state['mtime'])
+            elif (previous['size'], previous['mtime']) != (state['size'], state['mtime']):
+                changed[scenario] = state
+        removed = [scenario for scenario in self.manifest if scenario not in paths]
+        return changed, removed
+
+    def remove(self, scenario: str) -> None:
+        """
+        Drop a run and its aggregates.
+        """
+        self.manifest.pop(scenario, None)
+        self.errors.pop(scenario, None)
+        for results in self.results.values():
+            results.pop(scenario, None)
+        if scenario in self.ensemble.scenarios:
+            self.ensemble.remove_scenario(scenario)
+        return
+
+    def refresh(self) -> dict:
+        """
+        Import new and modified files and drop the runs of deleted files. Files that fail to import are retried once they change.
+        Returns the scenarios that were {"added", "modified", "removed", "failed"}.
+        """
+        changed, removed = self.changes()
+        report = {'added': [], 'modified': [], 'removed': removed, 'failed': []}
+        for scenario in removed:
+            self.remove(scenario)
+        if not changed:
+            return report
+
+        imported = import_gdx_files([state['path'] for state in changed.values()], **self.options)
+        for scenario, state in changed.items():
+            report['modified' if scenario in self.manifest else 'added'].append(scenario)
+            self.manifest[scenario] = state
+            self.errors.pop(scenario, None)
+            for results in self.results.values():
+                results.pop(scenario, None)
+            if scenario in imported.errors:
+                state['error'] = self.errors[scenario] = imported.errors[scenario]
+                report['failed'].append(scenario)
+                if scenario in self.ensemble.scenarios:
+                    self.ensemble.remove_scenario(scenario)
+                continue
+
+            # a modified run replaces the old one in place
+            gdx_data = imported[scenario]
+            self.ensemble.add_scenario(scenario, gdx_data)
+            for name, aggregate in self.aggregates.items():
+                try:
+                    self.results[name][scenario] = aggregate(gdx_data)
+                except Exception:
+                    self.errors[scenario] = f"Aggregate {name} failed:\n{traceback.format_exc()}"
+        return report
+
+    def aggregate(self, name: str) -> pd.DataFrame:
+        """
+        An aggregate of all runs with the scenarios as (the first level of the) columns, e.g. a year x scenario table of the CO2-eq emissions.
+        """
+        if name not in self.results:
+            raise KeyError(f"Unknown aggregate {name}. Use one of {list(self.results)}.")
+        results = {scenario: self.results[name][scenario] for scenario in self.ensemble.scenarios if scenario in self.results[name]}
+        if not results:
+            return pd.DataFrame()
+        return pd.concat(results, axis=1, names=['scenario'])
@@ -6,6 +6,12 @@ from matplotlib.colors import LinearSegmentedColormap
 
 from toolbox.colormaps import *
 from toolbox.climate_and_emissions import ghg, gwp
+from toolbox.ensemble import select_scenario
+from toolbox.time_integration import cumulative_sum
+from toolbox.plotting import set_year_limits, ordered_columns
+from toolbox.profiling import profiled
+from toolbox.errors import MissingYearError
+from toolbox.age_cube import get_age_cube, BIOMES
 
 
 LUs = {
@@ -28,132 +34,192 @@ lvst = {
 }
 
 
-def plot_landuse(gdx_data: dict, year:int, set_title: str="") -> any:
+@profiled
+def plot_landuse(gdx_data: dict, year:int, set_title: str="", scenario: str=None, ax=None) -> any:
     """
     Plot the distribution of land use by land use type for a selected year. You can optionally set an alternative title.
+    Raises MissingYearError if the year is not in the data.
     """
-    try:
-        plot_data = gdx_data['LU_AreaByUse'].set_index('year').loc[year].set_index('landuse')
-        #plot_data.index = [LUs[ind] for ind in plot_data.index]
-    except:
-        print(f"Year {year} not found in data.")
-        return
-
-    plot_data.plot.pie(y='value', legend=False, figsize=(6,6),
-                    colors=viridis[7],
+    gdx_data = select_scenario(gdx_data, scenario)
+    years = gdx_data['LU_AreaByUse']['year']
+    if year not in years.values:
+        raise MissingYearError(year, 'LU_AreaByUse', years.unique())
+    plot_data = gdx_data['LU_AreaByUse'].set_index('year').loc[year].set_index('landuse')
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(6,6))
+    plot_data.plot.pie(y='value', legend=False, ax=ax,
+                    colors=sequential_colors(len(plot_data)),
                     wedgeprops = { 'linewidth' : 2, 'edgecolor' : 'white' },
                     autopct='%.0f%%',
                     pctdistance=0.85
                     )
 
     if set_title:
-        plt.title(set_title)
+        ax.set_title(set_title)
     else:
-        plt.title(f"Land Use in {year}")
-    plt.ylabel('')
-    return
+        ax.set_title(f"Land Use in {year}")
+    ax.set_ylabel('')
+    return ax
 
 
-def plot_secondary_forest(gdx_data: dict, year: int, set_title: str="") -> any:
+@profiled
+def plot_secondary_forest(gdx_data: dict, year: int, set_title: str="", scenario: str=None, ax=None) -> any:
     """
     Plot the distribution of secondary forest by biome for a selected year. You can optionally set an alternative title.
+    Raises MissingYearError if the year is not in the data.
     """
-    gdx_data['LU_Area_SecdF']['age']  = gdx_data['LU_Area_SecdF'].age.astype('category')
-
-    try:
-        plot_data = gdx_data['LU_Area_SecdF'].set_index('year').loc[year].pivot(index='age',columns='biome',values='level')
-    except:
-        print(f"Year {year} not found in data.")
-        return
-
-    plot_data = plot_data [[
-    'TropicalHumid',
-    'TropicalDry',
-    'TemperateHumid',
-    'TemperateDry',
-    'Boreal',
-    'Tundra',
-    'Semiarid',
-    'Desert',
-    'DesertCold',
-    'Unproductive'
-    ]]
+    gdx_data = select_scenario(gdx_data, scenario)
+    # a slice of the age class cube, see "AgeCube"
+    plot_data = get_age_cube(gdx_data, 'LU_Area_SecdF').age_by_biome(year)
+    plot_data = plot_data[BIOMES]
+    color_steps = age_colors(len(plot_data))
+
+    if ax is None:
+        fig, ax = plt.subplots()
+    plot_data.transpose().plot(kind='bar', stacked=True, color=color_steps, ax=ax)
+    ax.legend(bbox_to_anchor=(1.2,1), frameon=False)
+
+    ax.set_ylabel('mln. km$^2$')
+    ax.set_xlabel('Biome')
+    if set_title:
+        ax.set_title(set_title)
+    else:
+        ax.set_title(f"Secondary Forest Distribution in {year}")
+    return ax
 
+def age_colors(n: int = 15) -> list:
+    """
+    Shades of green from the youngest to the oldest of "n" age classes.
+    """
     colors = ["#eaf6e0", "#c2e6b4", "#9ad78a", "#71c85f", "#4fb844", "#2d9e2d", "#1f7a1f"]
-    forestgreen_cmap = LinearSegmentedColormap.from_list("forestgreen_shades", colors, N=15)
+    forestgreen_cmap = LinearSegmentedColormap.from_list("forestgreen_shades", colors, N=n)
+    return [forestgreen_cmap(i/max(n - 1, 1)) for i in range(n)]
 
-    # Generate 15 colors from the custom colormap
-    color_steps = [forestgreen_cmap(i/14) for i in range(15)]
 
-    plot_data.transpose().plot(kind='bar', stacked=True, color=color_steps)
-    plt.legend(bbox_to_anchor=(1.2,1), frameon=False)
+@profiled
+def plot_forest_age_structure(gdx_data, symbol: str = 'LU_Area_SecdF', biome=None, set_title: str="", scenario: str=None, ax=None) -> any:
+    """
+    Plot the area of secondary forest by age class over the years, stacked from the youngest to the oldest class.
+    With symbol="LU_clear_sec" the clearing of secondary forest by age class is plotted instead.
+    Optionally only a "biome" (or list of biomes) is plotted and you can set an alternative title.
+    """
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
+    plot_data = get_age_cube(gdx_data, symbol).sel(biome=biome).to_frame('year', 'age')
 
-    plt.ylabel('mln. km$^2$')
-    plt.xlabel('Biome')
-    if set_title:
-        plt.title(set_title)
-    else:
-        plt.title(f"Secondary Forest Distribution in {year}")
-    return
-
-def add_cumulative_sum(df, groupby='process'):
-    pd.set_option('future.no_silent_downcasting', True)
-    
-    try:
-        period = df[['year']].replace(dict(zip(['2020','2030','2040','2050','2060','2070','2080','2090','2100'],[5,10,10,10,10,10,10,10,5])))
-    except:
-        period = df[['year']].replace(dict(zip(list(np.arange(2020,2110,10)),[5,10,10,10,10,10,10,10,5])))
-    
-    df['cumsum'] = (df['level'] * period['year']).astype(float)
-    df['cumsum'] =  df[[groupby,'cumsum']].groupby(groupby).cumsum()
-    
-    return
-
-def plot_clearing_primary_forest(gdx_data, set_title: str="") -> any:
+    ax.stackplot(plot_data.index, [plot_data[age] for age in plot_data], labels=plot_data.columns, colors=age_colors(len(plot_data.columns)))
+    ax.legend(bbox_to_anchor=(1.0, 1), frameon=False, title='Age class')
+    set_year_limits(ax, plot_data.index)
+    ax.set_ylabel('mln. km$^2$' if symbol == 'LU_Area_SecdF' else 'mln. km$^2$ / year')
+    ax.set_title(set_title if set_title else ('Secondary forest by age class' if symbol == 'LU_Area_SecdF' else 'Clearing of secondary forest by age class'))
+    return ax
+
+
+def animate_secondary_forest(gdx_data, scenario: str=None, interval: int = 500, fig=None) -> any:
+    """
+    Animation of the distribution of secondary forest by biome and age class (see "plot_secondary_forest") over all years.
+    Each frame only updates the bar heights from a slice of the age class cube. Show it in a notebook with
+    IPython.display.HTML(animation.to_jshtml()) or save it with animation.save("forest.gif").
+    - "interval" milliseconds between the frames
+    """
+    from matplotlib.animation import FuncAnimation
+
+    gdx_data = select_scenario(gdx_data, scenario)
+    cube     = get_age_cube(gdx_data, 'LU_Area_SecdF')
+    biomes   = [biome for biome in BIOMES if biome in cube.labels['biome']]
+    cube     = cube.sel(biome=biomes)
+    frames   = list(cube.frames())
+    if fig is None:
+        fig = plt.figure()
+    ax = fig.subplots()
+
+    # the bars of each age class, stacked on the younger classes
+    colors = age_colors(len(cube.labels['age']))
+    bars   = [ax.bar(biomes, np.zeros(len(biomes)), color=colors[i], label=age) for i, age in enumerate(cube.labels['age'])]
+    ax.set_ylim(0, max(values.sum(axis=0).max() for _, values in frames) * 1.05)
+    ax.set_ylabel('mln. km$^2$')
+    ax.set_xlabel('Biome')
+    ax.tick_params(axis='x', labelrotation=90)
+    ax.legend(bbox_to_anchor=(1.2, 1), frameon=False)
+
+    def draw(frame):
+        year, values = frames[frame]
+        bottoms = np.vstack([np.zeros(len(biomes)), np.cumsum(values, axis=0)[:-1]])
+        for age_bars, heights, bottom in zip(bars, values, bottoms):
+            for bar, height, y in zip(age_bars, heights, bottom):
+                bar.set_height(height)
+                bar.set_y(y)
+        ax.set_title(f"Secondary Forest Distribution in {year}")
+        return [bar for age_bars in bars for bar in age_bars]
+
+    return FuncAnimation(fig, draw, frames=len(frames), interval=interval)
+
+
+def add_cumulative_sum(df, groupby='process') -> pd.DataFrame:
+    """
+    Copy of the table with the cumulative sum of "level" by "groupby" over the years as column "cumsum" (see "time_integration.cumulative_sum").
+    The table itself is not changed.
+    """
+    return df.assign(cumsum=cumulative_sum(df, groupby=groupby))
+
+@profiled
+def plot_clearing_primary_forest(gdx_data, set_title: str="", scenario: str=None, ax=None) -> any:
     """
     Plot the cumulative cut-down of primary forest by biome. You can optionally set an alternative title.
     """
-    add_cumulative_sum(gdx_data['LU_clear_pri'], groupby='biome')
-    primf_cleared = gdx_data['LU_clear_pri'].pivot(index='year', columns='biome', values='cumsum')
-    primf_cleared = primf_cleared[['TropicalHumid','TropicalDry','TemperateHumid','TemperateDry','Boreal','Tundra','Semiarid','Desert','DesertCold','Unproductive']]
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
+    primf_cleared = add_cumulative_sum(gdx_data['LU_clear_pri'], groupby='biome')
+    primf_cleared = primf_cleared.pivot(index='year', columns='biome', values='cumsum')
+    primf_cleared = ordered_columns(primf_cleared, ['TropicalHumid','TropicalDry','TemperateHumid','TemperateDry','Boreal','Tundra','Semiarid','Desert','DesertCold','Unproductive'])
 
-    colors = [color_map.get(lbl,'gray')  for lbl in primf_cleared.columns]
+    colors = palette(primf_cleared.columns)
 
-    plt.stackplot(range(2020,2110,10), [primf_cleared[col] for col in primf_cleared],
+    ax.stackplot(primf_cleared.index, [primf_cleared[col] for col in primf_cleared],
                 labels = primf_cleared.columns,
                 colors = colors
                 )
-    plt.title(set_title if set_title else 'Cumulative cut-down primary forest (pristine, unmanaged forest)')
-    plt.legend(bbox_to_anchor=(1.0, 1), frameon=False)
-    plt.xlim(2020,2100)
-    plt.ylabel('mln. km$^2$')
-    return
+    ax.set_title(set_title if set_title else 'Cumulative cut-down primary forest (pristine, unmanaged forest)')
+    ax.legend(bbox_to_anchor=(1.0, 1), frameon=False)
+    set_year_limits(ax, primf_cleared.index)
+    ax.set_ylabel('mln. km$^2$')
+    return ax
 
 
-def plot_livestock_production(gdx_data: dict) -> any:
+@profiled
+def plot_livestock_production(gdx_data: dict, scenario: str=None, axes=None) -> any:
     """
     Plot annual livestock production by product. Milk separated from other products since it is produced at a much higher volume.
+    The plots are drawn on the two "axes" if given, otherwise on a new figure. The figure is returned.
     """
+    gdx_data = select_scenario(gdx_data, scenario)
     plot_data = gdx_data['LVST_product_output'].pivot(index='year',columns='lvst_products',values='level')
     plot_data_no_milk = plot_data.loc[:, plot_data.columns != 'LVST_milk']
-    colors = [color_map.get(lbl,'gray')  for lbl in plot_data_no_milk.columns]
+    colors = palette(plot_data_no_milk.columns)
     plot_data.columns = [lvst[i] for i in plot_data.columns]
     #colors = ["#9b59b6", "#e74c3c", "#34495e", "#2ecc71", "#2ecc71", "#2ecc71"]
 
-    fig, (ax0, ax1) = plt.subplots(1, 2, dpi=150, figsize=(7,4), gridspec_kw={'width_ratios': [1, 2]})
+    if axes is None:
+        fig, (ax0, ax1) = plt.subplots(1, 2, dpi=150, figsize=(7,4), gridspec_kw={'width_ratios': [1, 2]})
+    else:
+        ax0, ax1 = axes
+        fig = ax0.figure
 
-    ax0.stackplot(plot_data.index, plot_data['Milk'], colors=[color_map['LVST_milk']])
-    ax0.set_xlim(2020,2100)
+    ax0.stackplot(plot_data.index, plot_data['Milk'], colors=palette(['LVST_milk']))
+    set_year_limits(ax0, plot_data.index)
     ax0.set_ylabel(f"Mt / year")
     ax0.set_xlabel("Year").set_visible(False)
     ax0.set_title("Milk Production")
 
     nonmilk = plot_data.loc[:, plot_data.columns != 'Milk']
     ax1.stackplot(nonmilk.index, [nonmilk[i] for i in nonmilk], colors=colors)
-    ax1.set_xlim(2020,2100)
+    set_year_limits(ax1, nonmilk.index)
     ax1.set_xlabel("Year").set_visible(False)
     ax1.set_title("Livestock production, stacked")
     #ax0.legend(nonmilk.columns, bbox_to_anchor=(1, 0.9), frameon=False)
 
     ax1.legend(nonmilk.columns, bbox_to_anchor=(1, 0.9), frameon=False)
-    return
\ No newline at end of file
+    return fig
\ No newline at end of file
@@ -0,0 +1,114 @@
+import weakref
+import numpy as np
+import pandas as pd
+
+from toolbox.derived import derived
+from toolbox.profiling import profiled
+
+
+class OutputIndex:
+    """
+    Index of "OutputAnnualByProcess" for fast commodity and process queries, built on first use (see "get_output_index").
+    The index keeps the order of the rows by commodity, process and year and the offsets of each commodity and
+    (commodity, process) pair in that order, so the rows of a query are looked up instead of scanning the whole table.
+    The values are gathered from the table itself, which is not copied.
+    """
+    def __init__(self, df: pd.DataFrame):
+        commodity_codes, commodities = pd.factorize(df['commodity'], sort=True)
+        process_codes, processes     = pd.factorize(df['process'], sort=True)
+
+        self.table          = weakref.ref(df)
+        self.years          = df['year'].to_numpy()
+        self.levels         = df['level'].to_numpy()
+        self.process_codes  = process_codes
+        self.process_labels = list(processes)
+        if 'region' in df.columns:
+            region_codes, regions = pd.factorize(df['region'], sort=True)
+            self.region_codes  = region_codes
+            self.region_labels = list(regions)
+        else:
+            self.region_codes  = None
+            self.region_labels = []
+
+        # offsets of the (commodity, process) blocks in the rows sorted by "order"
+        self.order      = np.lexsort((self.years, process_codes, commodity_codes))
+        commodity_codes = commodity_codes[self.order]
+        process_codes   = process_codes[self.order]
+        n      = len(self.order)
+        change = np.flatnonzero((np.diff(commodity_codes) != 0) | (np.diff(process_codes) != 0)) + 1
+        starts = np.concatenate([[0], change]) if n else np.array([], dtype=int)
+        stops  = np.concatenate([change, [n]]) if n else np.array([], dtype=int)
+
+        self.pairs       = {}
+        self.commodities = {}
+        self.processes   = {}
+        for start, stop in zip(starts, stops):
+            commodity = commodities[commodity_codes[start]]
+            process   = processes[process_codes[start]]
+            self.pairs[(commodity, process)] = (start, stop)
+            first, _ = self.commodities.get(commodity, (start, stop))
+            self.commodities[commodity] = (first, stop)
+            self.processes.setdefault(process, []).append((start, stop))
+
+    def find(self, substring: str) -> list:
+        """
+        Processes whose name contains "substring", e.g. "TRAN_PASS".
+        """
+        return [process for process in self.process_labels if substring in process]
+
+    def rows(self, commodity: str = None, processes: list = None, region=None) -> np.ndarray:
+        """
+        Positions of the rows of a commodity and/or processes in the table, optionally only in a region or list of regions.
+        """
+        if commodity is not None and processes is None:
+            ranges = [self.commodities[commodity]] if commodity in self.commodities else []
+        elif commodity is not None:
+            ranges = [self.pairs[(commodity, process)] for process in processes if (commodity, process) in self.pairs]
+        elif processes is not None:
+            ranges = [block for process in processes for block in self.processes.get(process, [])]
+        else:
+            ranges = [(0, len(self.order))]
+        rows = self.order[np.concatenate([np.arange(start, stop) for start, stop in ranges])] if ranges else np.array([], dtype=int)
+        if region is not None:
+            if self.region_codes is None:
+                raise ValueError("The data has no regions.")
+            regions = [region] if isinstance(region, str) else list(region)
+            codes   = [self.region_labels.index(name) for name in regions if name in self.region_labels]
+            rows    = rows[np.isin(self.region_codes[rows], codes)]
+        return rows
+
+    def select(self, commodity: str = None, processes: list = None, region=None) -> pd.DataFrame:
+        """
+        Rows of "OutputAnnualByProcess" for a commodity and/or processes.
+        """
+        return self.table().iloc[self.rows(commodity, processes, region)]
+
+    @profiled
+    def matrix(self, commodity: str = None, processes: list = None, transform=None, region=None) -> pd.DataFrame:
+        """
+        Output by year (rows) and process (columns), summed over the other sets (e.g. regions and commodities).
+        - "transform" optional function applied to the levels of the rows before summing them
+        - "region" a region or list of regions to include. By default all regions are summed.
+        """
+        rows   = self.rows(commodity, processes, region)
+        levels = self.levels[rows] if transform is None else transform(self.levels[rows])
+
+        years, year_index       = np.unique(self.years[rows], return_inverse=True)
+        codes, process_index    = np.unique(self.process_codes[rows], return_inverse=True)
+        cells  = year_index * len(codes) + process_index
+        size   = len(years) * len(codes)
+        values = np.bincount(cells, weights=levels, minlength=size).reshape(len(years), len(codes))
+        # years without any output of a process are missing values, as in a pivot
+        values[np.bincount(cells, minlength=size).reshape(len(years), len(codes)) == 0] = np.nan
+
+        columns = pd.Index([self.process_labels[code] for code in codes], name='process')
+        return pd.DataFrame(values, index=pd.Index(years, name='year'), columns=columns)
+
+
+@profiled
+def get_output_index(gdx_data: dict) -> OutputIndex:
+    """
+    Index of the "OutputAnnualByProcess" table of the gdx data. The index is built once per table and
+    rebuilt if the table is replaced or changes.
+    """
+    return derived(gdx_data['OutputAnnualByProcess'], 'output_index', OutputIndex)
@@ -0,0 +1,82 @@
+import math
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from toolbox.errors import MissingElementError
+
+
+def set_year_limits(ax, years) -> None:
+    """
+    Limit the x axis to the first and last model year of the plotted data, whatever the time steps and horizon.
+    """
+    years = np.asarray(years)
+    if len(years) and years.min() < years.max():
+        ax.set_xlim(years.min(), years.max())
+    return
+
+
+def ordered_columns(df: pd.DataFrame, order: list) -> pd.DataFrame:
+    """
+    Reorder the columns of a table to the preferred "order". Columns missing from the data are skipped,
+    columns not in the "order" are kept at the end.
+    """
+    columns = [column for column in order if column in df.columns]
+    return df[columns + [column for column in df.columns if column not in columns]]
+
+
+def select_regions(df: pd.DataFrame, region=None) -> pd.DataFrame:
+    """
+    Rows of a table in a region or list of regions. All rows if "region" is None.
+    """
+    if region is None:
+        return df
+    if 'region' not in df.columns:
+        raise ValueError("The data has no regions.")
+    regions = [region] if isinstance(region, str) else list(region)
+    return df[df['region'].isin(regions)]
+
+
+def plot_by_region(plot_function, gdx_data: dict, regions: list = None, ncols: int = 3, fig=None, **kwargs) -> any:
+    """
+    Draw a plot once per region on a grid of axes, e.g. plot_by_region(plot_electricity_production, gdx_data).
+    The plot function is called for each region in turn, each call selecting the rows of its region.
+    Works with the plot functions that take a "region" argument: electricity production, transportation and commodity production.
+    - "regions" regions to plot. Defaults to all regions in "OutputAnnualByProcess".
+    - "ncols" number of columns of the grid
+    - "fig" figure to draw on, otherwise a new figure is created
+    Other arguments (e.g. "scenario") are passed to the plot function. The figure is returned.
+    Regions that are not in the data raise a MissingElementError, an empty list of regions a ValueError.
+    """
+    from toolbox.ensemble import select_scenario
+    table = select_scenario(gdx_data, kwargs.get('scenario'))['OutputAnnualByProcess']
+    if 'region' not in table.columns:
+        raise ValueError("The data has no regions.")
+    available = sorted(table['region'].unique())
+    if regions is None:
+        regions = available
+    regions = [regions] if isinstance(regions, str) else list(regions)
+    if not regions:
+        raise ValueError(f"No regions to plot. Available are {available}.")
+    missing = [region for region in regions if region not in available]
+    if missing:
+        raise MissingElementError(missing, 'region', 'OutputAnnualByProcess', available)
+    ncols = min(ncols, len(regions))
+    nrows = math.ceil(len(regions) / ncols)
+    if fig is None:
+        fig = plt.figure(figsize=(5 * ncols, 3.5 * nrows))
+    axes = fig.subplots(nrows, ncols, squeeze=False, sharex=True).flatten()
+
+    for i, (region, ax) in enumerate(zip(regions, axes)):
+        plot_function(gdx_data, region=region, ax=ax, **kwargs)
+        ax.set_title(region)
+        # a single legend, right of the first row
+        legend = ax.get_legend()
+        if legend is not None and i != ncols - 1:
+            legend.remove()
+    for i in range(len(regions), len(axes)):
+        axes[i].set_visible(False)
+        # show the years below the axes above the empty places of the last row
+        axes[i - ncols].xaxis.set_tick_params(labelbottom=True)
+    fig.tight_layout()
+    return fig
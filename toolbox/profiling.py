@@ -0,0 +1,128 @@
+import os, time, json, functools
+import pandas as pd
+from contextlib import contextmanager
+
+
+# the profiler collecting the timings, if any. Without one, the instrumented functions run with a single extra check.
+active_profiler = None
+
+
+def current_rss() -> int:
+    """
+    Current resident memory of this process in bytes, None if not available (only on Linux).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def count_rows(value) -> int:
+    """
+    Number of rows of a table, or of all tables of gdx data. None for anything else, e.g. a plot.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict) and value and all(isinstance(df, pd.DataFrame) for df in value.values()):
+        return sum(len(df) for df in value.values())
+    return None
+
+
+class Profiler:
+    """
+    Collects the wall time, rows and memory change of the instrumented toolbox functions (import, cleaning steps,
+    aggregations and plots) while it is active, e.g.
+
+        with Profiler() as profiler:
+            gdx_data = import_gdx_file("run_1.gdx")
+            plot_emissions(gdx_data)
+        profiler.dump("run_1_timing.json")
+
+    Each call is one record with the "name" of the step, "seconds", "rows" (of the result or the input table),
+    "memory_delta" (change of the resident memory in bytes), the nesting "depth" and step specific details, e.g. the symbol.
+    """
+    def __init__(self):
+        self.records  = []
+        self.depth    = 0
+        self.previous = None
+
+    def __enter__(self):
+        global active_profiler
+        self.previous   = active_profiler
+        active_profiler = self
+        return self
+
+    def __exit__(self, *exc):
+        global active_profiler
+        active_profiler = self.previous
+        return False
+
+    def report(self) -> pd.DataFrame:
+        """
+        The records as a table, one row per call in the order the calls started.
+        """
+        columns = ['name', 'seconds', 'rows', 'memory_delta', 'depth']
+        df = pd.DataFrame(self.records)
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        return df.sort_values('start', kind='stable').drop(columns='start').reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Number of calls, total seconds and rows and the largest memory change by step, slowest first.
+        """
+        return self.report().groupby('name').agg(calls=('seconds', 'size'), seconds=('seconds', 'sum'), rows=('rows', lambda rows: rows.sum(min_count=1)), memory_delta=('memory_delta', 'max')).sort_values('seconds', ascending=False)
+
+    def dump(self, path: str) -> None:
+        """
+        Save the records to a JSON or CSV file (by the file extension) for archiving with the results of a run.
+        """
+        if path.lower().endswith('.csv'):
+            self.report().to_csv(path, index=False)
+        else:
+            with open(path, 'w') as f:
+                json.dump(json.loads(self.report().to_json(orient='records')), f, indent=1)
+        return
+
+
+@contextmanager
+def profile_step(name: str, **details):
+    """
+    Record a step of code in the active profiler, e.g. with profile_step("gdx_read", symbol=symbol): ...
+    The yielded record can be updated, e.g. record["rows"] = len(df). Does nothing without an active profiler.
+    """
+    profiler = active_profiler
+    if profiler is None:
+        yield {}
+        return
+    record = {'name': name, 'start': time.perf_counter(), 'seconds': None, 'rows': None, 'memory_delta': None, 'depth': profiler.depth, **details}
+    rss = current_rss()
+    profiler.depth += 1
+    try:
+        yield record
+    finally:
+        profiler.depth -= 1
+        record['seconds'] = time.perf_counter() - record['start']
+        if rss is not None:
+            record['memory_delta'] = current_rss() - rss
+        profiler.records.append(record)
+
+
+def profiled(function):
+    """
+    Decorator recording each call of a function in the active profiler (see "Profiler"). The rows are counted
+    from the result, or from the first table passed to the function if the result is not a table (e.g. a plot).
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if active_profiler is None:
+            return function(*args, **kwargs)
+        with profile_step(function.__qualname__) as record:
+            result = function(*args, **kwargs)
+            rows   = count_rows(result)
+            if rows is None:
+                rows = next((count_rows(arg) for arg in args if isinstance(arg, (pd.DataFrame, pd.Series))), None)
+            record['rows'] = rows
+        return result
+    return wrapper
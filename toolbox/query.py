@@ -0,0 +1,158 @@
+import os, glob
+import pandas as pd
+
+from toolbox.errors import MissingSymbolError
+
+
+# aggregation functions of "ParquetEnsemble.aggregate" and how their partial results of the record batches are combined
+AGGREGATIONS = {'sum': 'sum', 'min': 'min', 'max': 'max', 'count': 'sum', 'mean': None}
+
+EJ_to_PWh = 0.27777777777778
+
+
+def open_parquet_symbol(dataset_path: str, symbol: str, scenarios: list = None):
+    """
+    Arrow dataset of a symbol in a Parquet dataset written by "export_gdx_files", with "scenario" and "symbol" as columns.
+    Nothing is read until the dataset is scanned.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    files = sorted(glob.glob(os.path.join(dataset_path, 'scenario=*', f"symbol={symbol}", '*.parquet')))
+    if scenarios is not None:
+        folders = {os.path.join(dataset_path, f"scenario={scenario}") for scenario in scenarios}
+        files   = [file for file in files if os.path.dirname(os.path.dirname(file)) in folders]
+    if not files:
+        raise MissingSymbolError(symbol, dataset_path)
+
+    # scenario names are strings even if they look like numbers
+    partitioning = ds.partitioning(pa.schema([('scenario', pa.string()), ('symbol', pa.string())]), flavor='hive')
+    return ds.dataset(files, format='parquet', partitioning=partitioning, partition_base_dir=dataset_path)
+
+
+def filter_expression(scenario=None, where=None, **filters):
+    """
+    Arrow filter expression selecting scenarios and values of set columns. Each filter is a single value or a list of values.
+    "where" is an optional additional Arrow expression, e.g. pc.starts_with(ds.field("process"), "ELEC").
+    """
+    import pyarrow.dataset as ds
+
+    if scenario is not None:
+        filters['scenario'] = scenario
+    expression = where
+    for column, values in filters.items():
+        if isinstance(values, (list, tuple, set)):
+            condition = ds.field(column).isin(list(values))
+        else:
+            condition = ds.field(column) == values
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+class ParquetEnsemble:
+    """
+    Query layer over an ensemble exported to Parquet (see "export_gdx_files") that does not fit into memory as DataFrames.
+    The symbols are scanned with Arrow: only the needed columns and the row groups matching the filters are read,
+    and aggregations are computed batch by batch, so only the (small) results are held in memory.
+    - "dataset_path" folder of the Parquet dataset
+    Requires the pyarrow package.
+    """
+    def __init__(self, dataset_path: str):
+        self.dataset_path = dataset_path
+        self.datasets     = {}
+
+    def __repr__(self):
+        return f"ParquetEnsemble('{self.dataset_path}', {len(self.scenarios)} scenarios)"
+
+    @property
+    def scenarios(self) -> list:
+        return sorted(os.path.basename(folder)[len('scenario='):] for folder in glob.glob(os.path.join(self.dataset_path, 'scenario=*')))
+
+    def symbols(self) -> list:
+        return sorted({os.path.basename(folder)[len('symbol='):] for folder in glob.glob(os.path.join(self.dataset_path, 'scenario=*', 'symbol=*'))})
+
+    def dataset(self, symbol: str):
+        if symbol not in self.datasets:
+            self.datasets[symbol] = open_parquet_symbol(self.dataset_path, symbol)
+        return self.datasets[symbol]
+
+    def select(self, symbol: str, columns: list = None, scenario=None, where=None, **filters) -> pd.DataFrame:
+        """
+        Read the rows of a symbol matching the filters, e.g. select("CLIM_DeltaT", scenario=["run_1", "run_2"]).
+        "columns" limits the columns that are read. Use "aggregate" for large selections.
+        """
+        dataset = self.dataset(symbol)
+        columns = columns if columns else [column for column in dataset.schema.names if column != 'symbol']
+        return dataset.to_table(columns=columns, filter=filter_expression(scenario, where, **filters)).to_pandas()
+
+    def aggregate(self, symbol: str, by: tuple = ('scenario', 'year'), value: str = 'level', func: str = 'sum', transform=None, scenario=None, where=None, **filters) -> pd.Series:
+        """
+        Aggregate a symbol over the ensemble, e.g. the total electricity generation by scenario and year:
+        aggregate("OutputAnnualByProcess", by=["scenario", "year"], commodity="ELECGen").
+        - "func" one of "sum", "mean", "min", "max" and "count"
+        - "transform" optional function of the value column (an Arrow expression) applied to each row before aggregating,
+          e.g. lambda level: pc.divide(level, 1000)
+        Selection filters are applied while scanning, as in "select".
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if func not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation {func}. Use one of {list(AGGREGATIONS)}.")
+        by      = [by] if isinstance(by, str) else list(by)
+        columns = {column: ds.field(column) for column in by}
+        columns[value] = ds.field(value) if transform is None else transform(ds.field(value))
+        scanner = self.dataset(symbol).scanner(columns=columns, filter=filter_expression(scenario, where, **filters))
+
+        # aggregate each record batch, then combine the partial results
+        partial_funcs = [(value, 'sum'), (value, 'count')] if func == 'mean' else [(value, func)]
+        partials = [pa.Table.from_batches([batch]).group_by(by).aggregate(partial_funcs) for batch in scanner.to_batches() if batch.num_rows]
+        if not partials:
+            return pd.Series(dtype=float, name=value, index=pd.MultiIndex.from_arrays([[]] * len(by), names=by) if len(by) > 1 else pd.Index([], name=by[0] if by else None))
+        combined = pa.concat_tables(partials)
+        if func == 'mean':
+            result = combined.group_by(by).aggregate([(f'{value}_sum', 'sum'), (f'{value}_count', 'sum')]).to_pandas()
+            result[value] = result[f'{value}_sum_sum'] / result[f'{value}_count_sum']
+        else:
+            result = combined.group_by(by).aggregate([(f'{value}_{func}', AGGREGATIONS[func])]).to_pandas()
+            result[value] = result[f'{value}_{func}_{AGGREGATIONS[func]}']
+        if not by:
+            return result[value]
+        return result.set_index(by)[value].sort_index()
+
+    def commodity_production(self, commodity: str, by: tuple = ('scenario', 'year', 'process'), scenario=None, **filters) -> pd.DataFrame:
+        """
+        Production of a commodity with the years (by scenario) as rows and the processes as columns, as in "plot_commodity_by_process".
+        """
+        by         = [by] if isinstance(by, str) else list(by)
+        production = self.aggregate('OutputAnnualByProcess', by=by, scenario=scenario, commodity=commodity, **filters)
+        return production.unstack('process') if 'process' in by else production
+
+    def electricity_mix(self, joules: bool = False, scenario=None, **filters) -> pd.DataFrame:
+        """
+        Electricity generation by source (PWh, or EJ with "joules") with the years by scenario as rows and the
+        generating processes as columns, as in "plot_electricity_production".
+        """
+        import pyarrow.compute as pc
+
+        mix = self.aggregate('OutputAnnualByProcess', by=['scenario', 'year', 'process'], transform=lambda level: pc.round(pc.divide(level, 1000)),
+                             scenario=scenario, commodity='ELECGen', **filters).unstack('process')
+        mix = mix[[process for process in mix.columns if process.startswith('ELEC_')]]
+        return mix if joules else mix * EJ_to_PWh
+
+    def transport_by_mode(self, kind: str = 'passenger', scenario=None, **filters) -> pd.DataFrame:
+        """
+        Passenger (10^12 passenger-km) or freight (10^12 tonne-km) transportation with the years by scenario as rows and the
+        modes of transport as columns, as in "plot_passenger_transportation" and "plot_freight_transportation".
+        """
+        import pyarrow.dataset as ds
+        import pyarrow.compute as pc
+
+        prefixes = {'passenger': 'TRAN_PASS', 'freight': 'TRAN_FRGT'}
+        if kind not in prefixes:
+            raise ValueError(f"Unknown kind of transportation {kind}. Use one of {list(prefixes)}.")
+        transport = self.aggregate('OutputAnnualByProcess', by=['scenario', 'year', 'process'], scenario=scenario,
+                                   where=pc.starts_with(ds.field('process'), prefixes[kind]), **filters)
+        transport = transport.unstack('process') / 1000000
+        transport.columns = [process[len(prefixes[kind]) + 1:] for process in transport.columns]
+        return transport
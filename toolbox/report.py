@@ -0,0 +1,107 @@
+import os, traceback
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+
+from toolbox.import_gdx import LazyGdxData
+from toolbox.ensemble import Ensemble
+from toolbox.climate_and_emissions import plot_deltaT, plot_emissions, plot_total_net_emissions_co2eq
+from toolbox.commodities import plot_electricity_production
+from toolbox.transportation import plot_passenger_transportation, plot_freight_transportation
+from toolbox.landuse import plot_landuse, plot_secondary_forest, plot_clearing_primary_forest, plot_livestock_production
+from toolbox.profiling import Profiler, profile_step
+
+
+# The standard figures of a report: {name: (function drawing the figure, figure size)}.
+# The drawing functions get the gdx data and an empty figure. The figures are created without pyplot,
+# so they are not shown, never pile up in the pyplot state and are rendered by the Agg (or pdf/svg) backend.
+def draw_landuse(gdx_data: dict, fig: Figure):
+    plot_landuse(gdx_data, gdx_data['LU_AreaByUse']['year'].max(), ax=fig.subplots())
+
+
+def draw_secondary_forest(gdx_data: dict, fig: Figure):
+    plot_secondary_forest(gdx_data, gdx_data['LU_Area_SecdF']['year'].max(), ax=fig.subplots())
+
+
+STANDARD_FIGURES = {
+    'deltaT'                  : (lambda gdx_data, fig: plot_deltaT(gdx_data, ax=fig.subplots()),                            (6.4, 4.8)),
+    'emissions'               : (lambda gdx_data, fig: plot_emissions(gdx_data, axes=fig.subplots(3, 1)),                   (7, 10)),
+    'co2eq'                   : (lambda gdx_data, fig: plot_total_net_emissions_co2eq(gdx_data, ax=fig.subplots()),         (6.4, 4.8)),
+    'electricity'             : (lambda gdx_data, fig: plot_electricity_production(gdx_data, ax=fig.subplots()),            (6.4, 4.8)),
+    'passenger_transport'     : (lambda gdx_data, fig: plot_passenger_transportation(gdx_data, ax=fig.subplots()),          (6.4, 4.8)),
+    'freight_transport'       : (lambda gdx_data, fig: plot_freight_transportation(gdx_data, ax=fig.subplots()),            (6.4, 4.8)),
+    'landuse'                 : (draw_landuse,                                                                              (6, 6)),
+    'secondary_forest'        : (draw_secondary_forest,                                                                     (6.4, 4.8)),
+    'primary_forest_clearing' : (lambda gdx_data, fig: plot_clearing_primary_forest(gdx_data, ax=fig.subplots()),           (6.4, 4.8)),
+    'livestock'               : (lambda gdx_data, fig: plot_livestock_production(gdx_data, axes=fig.subplots(1, 2, gridspec_kw={'width_ratios': [1, 2]})), (7, 4)),
+}
+
+
+def render_figures(name: str, gdx_data: dict, folder: str, formats: tuple, figures: list, dpi: int, timing: bool = False) -> tuple:
+    """
+    Render the figures of a single run to files. Errors are returned by figure instead of raised.
+    With "timing" the timings of the drawing and saving are saved to "timing.json" in the folder (see "Profiler").
+    """
+    if timing:
+        with Profiler() as profiler:
+            result = render_figures(name, gdx_data, folder, formats, figures, dpi)
+        profiler.dump(os.path.join(folder, 'timing.json'))
+        return result
+    os.makedirs(folder, exist_ok=True)
+    paths, errors = {}, {}
+    for figure in figures:
+        draw, figsize = STANDARD_FIGURES[figure]
+        fig = Figure(figsize=figsize, dpi=dpi)
+        try:
+            with profile_step('draw', figure=figure):
+                draw(gdx_data, fig)
+            paths[figure] = []
+            for file_format in formats:
+                path = os.path.join(folder, f"{figure}.{file_format}")
+                with profile_step('savefig', figure=figure, format=file_format):
+                    fig.savefig(path, bbox_inches='tight')
+                paths[figure].append(path)
+        except Exception:
+            errors[figure] = traceback.format_exc()
+        finally:
+            # drop the references between the figure and its artists right away
+            fig.clear()
+    return name, paths, errors
+
+
+def render_report(gdx_data, folder: str = 'report', formats: tuple = ('png',), figures: list = None, processes: int = None, dpi: int = 150, timing: bool = False) -> dict:
+    """
+    Render the standard figures (see STANDARD_FIGURES) of one or many runs to files, e.g. "report/run_1/deltaT.png".
+    - "gdx_data" gdx data of a single run, a dictionary of gdx data by scenario (e.g. from "import_gdx_files") or an ensemble
+    - "formats" file format or file formats, e.g. ("png", "svg", "pdf")
+    - "figures" names of the figures to render. Defaults to all standard figures.
+    - "processes" number of worker processes, each rendering all figures of a run. 1 renders in this process.
+    - "timing" if a timing report of each run should be saved as "timing.json" next to its figures (see "Profiler")
+    Returns {"paths": {scenario: {figure: [files]}}, "errors": {scenario: {figure: error message}}}.
+    """
+    formats = (formats,) if isinstance(formats, str) else tuple(formats)
+    figures = figures if figures else list(STANDARD_FIGURES)
+    unknown = [figure for figure in figures if figure not in STANDARD_FIGURES]
+    if unknown:
+        raise ValueError(f"Unknown figures {unknown}. Use any of {list(STANDARD_FIGURES)}.")
+
+    if isinstance(gdx_data, Ensemble):
+        runs = {scenario: gdx_data.scenario(scenario) for scenario in gdx_data.scenarios}
+    elif isinstance(gdx_data, LazyGdxData) or not all(isinstance(value, Mapping) for value in gdx_data.values()):
+        runs = {None: gdx_data}
+    else:
+        runs = gdx_data
+
+    jobs = [(name, run, folder if name is None else os.path.join(folder, str(name)), formats, figures, dpi, timing) for name, run in runs.items()]
+    if processes == 1 or len(jobs) == 1:
+        results = [render_figures(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(render_figures, *zip(*jobs)))
+
+    report = {'paths': {}, 'errors': {}}
+    for name, paths, errors in results:
+        report['paths'][name] = paths
+        if errors:
+            report['errors'][name] = errors
+    return report
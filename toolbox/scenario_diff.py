@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from toolbox.ensemble import Ensemble
+from toolbox.import_gdx import VALUE_COLUMNS
+from toolbox.profiling import profiled
+
+
+def value_column(df: pd.DataFrame) -> str:
+    """
+    The value column of a cleaned table: "level" for variables, "value" for parameters.
+    """
+    for column in ['level', 'value']:
+        if column in df.columns:
+            return column
+    raise ValueError(f"No value column in {list(df.columns)}.")
+
+
+@profiled
+def align_runs(gdx_data, symbol: str, by: list = None, value: str = None, scenarios: list = None, **filters) -> pd.DataFrame:
+    """
+    Align a symbol across runs on its set columns: a table with a row per combination of set elements (outer join
+    across the runs) and a column per scenario. Elements missing from a run are zero, as in GAMS.
+    - "gdx_data" an ensemble or a dictionary of gdx data by scenario (e.g. from "import_gdx_files")
+    - "by" set columns to keep, e.g. ["year", "process"]. The others are summed over. Defaults to all set columns.
+    - "value" value column, "level" or "value" by default
+    - "scenarios" scenarios to include. Defaults to all.
+    Other arguments select rows as in "Ensemble.select", e.g. commodity="ELECGen".
+    """
+    ensemble = gdx_data if isinstance(gdx_data, Ensemble) else Ensemble(gdx_data)
+    df       = ensemble.select(symbol, scenario=scenarios, **filters)
+    value    = value if value else value_column(df)
+    by       = [by] if isinstance(by, str) else list(by) if by is not None else [column for column in df.columns if column != 'scenario' and column not in VALUE_COLUMNS]
+
+    # a single group by over the stacked table of all runs
+    aligned = df.groupby(by + ['scenario'], observed=True, sort=True)[value].sum().unstack('scenario', fill_value=0)
+    # runs with the symbol but without selected rows are all zero
+    names   = scenarios if scenarios is not None else ensemble.scenarios
+    aligned = aligned.reindex(columns=[name for name in names if name in ensemble.offsets[symbol]], fill_value=0)
+    aligned.columns = pd.Index(list(aligned.columns), name='scenario')
+    return aligned
+
+
+def scenario_deltas(aligned: pd.DataFrame, baseline: str) -> pd.DataFrame:
+    """
+    Absolute and relative differences of each scenario to the "baseline" in an aligned table (rows of set elements or years,
+    a column per scenario, e.g. from "align_runs" or "calculate_total_netemissions_co2eq" of an ensemble).
+    Returns a long table indexed by the rows of the aligned table and the scenario, with the columns
+    "baseline", "value", "delta" (value - baseline) and "relative" (delta / |baseline|, NaN where the baseline is zero).
+    All scenarios are compared in one array operation.
+    """
+    if baseline not in aligned.columns:
+        raise KeyError(f"Scenario {baseline} not found in {list(aligned.columns)}.")
+    others = [scenario for scenario in aligned.columns if scenario != baseline]
+    base   = aligned[baseline].to_numpy(dtype=float)[:, None]
+    values = aligned[others].to_numpy(dtype=float)
+    delta  = values - base
+    with np.errstate(invalid='ignore', divide='ignore'):
+        relative = np.where(base != 0, delta / np.abs(base), np.nan)
+
+    rows  = aligned.index
+    index = pd.MultiIndex.from_arrays(
+        [np.tile(rows.get_level_values(level), len(others)) for level in range(rows.nlevels)] + [np.repeat(others, len(rows))],
+        names=list(rows.names) + ['scenario'])
+    return pd.DataFrame({
+        'baseline' : np.tile(base[:, 0], len(others)),
+        'value'    : values.T.reshape(-1),
+        'delta'    : delta.T.reshape(-1),
+        'relative' : relative.T.reshape(-1),
+    }, index=index)
+
+
+def compare_scenarios(gdx_data, symbol: str, baseline: str, by: list = None, value: str = None, scenarios: list = None, **filters) -> pd.DataFrame:
+    """
+    What changed in a symbol between a baseline run and other runs, e.g. the electricity mix by year and process:
+    compare_scenarios(runs, "OutputAnnualByProcess", "baseline", by=["year", "process"], commodity="ELECGen").
+    Aligns the symbol (see "align_runs") and returns the differences to the baseline (see "scenario_deltas").
+    """
+    if scenarios is not None and baseline not in scenarios:
+        scenarios = [baseline] + list(scenarios)
+    return scenario_deltas(align_runs(gdx_data, symbol, by, value, scenarios, **filters), baseline)
+
+
+@profiled
+def top_contributors(gdx_data, symbol: str, baseline: str, by: str = 'process', n: int = 5, value: str = None, scenarios: list = None, **filters) -> pd.DataFrame:
+    """
+    The elements of a set (e.g. processes) that contribute most to the change of a total between a baseline and
+    each other run, e.g. which processes drive the change of electricity generation in 2050:
+    top_contributors(runs, "OutputAnnualByProcess", "baseline", by="process", commodity="ELECGen", year=2050).
+    The other set columns (e.g. years and regions) are summed over, so select e.g. a year with the filters.
+    Returns a table with a row per scenario and rank: the element, its "delta" and its "share" of the total change.
+    The elements are ranked by the size of their change, in one sort over all scenarios.
+    """
+    if scenarios is not None and baseline not in scenarios:
+        scenarios = [baseline] + list(scenarios)
+    aligned = align_runs(gdx_data, symbol, [by], value, scenarios, **filters)
+    if baseline not in aligned.columns:
+        raise KeyError(f"Scenario {baseline} not found in {list(aligned.columns)}.")
+    others = [scenario for scenario in aligned.columns if scenario != baseline]
+    values = aligned[others].to_numpy(dtype=float) - aligned[[baseline]].to_numpy(dtype=float)
+    order  = np.argsort(-np.abs(values), axis=0, kind='stable')[:n]
+    top    = np.take_along_axis(values, order, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = top / values.sum(axis=0)
+
+    ranks = order.shape[0]
+    return pd.DataFrame({
+        'scenario' : np.repeat(others, ranks),
+        'rank'     : np.tile(np.arange(1, ranks + 1), len(others)),
+        by         : aligned.index.to_numpy()[order].T.reshape(-1),
+        'delta'    : top.T.reshape(-1),
+        'share'    : shares.T.reshape(-1),
+    })
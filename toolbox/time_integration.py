@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from toolbox.profiling import profiled
+
+
+# Cumulative values of annual results, e.g. cumulative production or cleared area.
+# Model years are points in time. With the "period" method each model year stands for the period from half-way
+# since the previous model year to half-way to the next one, e.g. 5, 10, ..., 10, 5 years for 2020, 2030, ..., 2100.
+# With the "trapezoid" method the annual values are interpolated linearly between the model years.
+METHODS = ['period', 'trapezoid']
+
+
+def period_weights(years) -> np.ndarray:
+    """
+    Length of the period (in years) that each of the sorted model "years" stands for. Works for any time step and horizon.
+    """
+    years = np.asarray(years, dtype=float)
+    if len(years) < 2:
+        return np.ones(len(years))
+    edges = np.concatenate([[years[0]], (years[1:] + years[:-1]) / 2, [years[-1]]])
+    return np.diff(edges)
+
+
+def check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method}. Use one of {METHODS}.")
+
+
+@profiled
+def cumulative_sum(df: pd.DataFrame, groupby=None, value: str='level', year: str='year', method: str='period') -> pd.Series:
+    """
+    Cumulative sum of annual values over the model years, computed separately for each group, e.g. by biome or by
+    scenario and region. The input is not changed, the result is aligned with its rows.
+    - "groupby" a column or list of columns identifying the groups. By default the whole table is one group.
+    - "method" "period" (default) or "trapezoid", see the top of this module
+    """
+    check_method(method)
+    if len(df) == 0:
+        return pd.Series(dtype=float, index=df.index, name='cumsum')
+
+    keys = [] if groupby is None else [groupby] if isinstance(groupby, str) else list(groupby)
+    if keys:
+        groups = df.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+    else:
+        groups = np.zeros(len(df), dtype=int)
+    years  = df[year].to_numpy(dtype=float)
+    levels = df[value].to_numpy(dtype=float)
+
+    # sort by group and year, then work on the whole table at once
+    order = np.lexsort((years, groups))
+    g, y, l = groups[order], years[order], levels[order]
+    first = np.concatenate([[True], g[1:] != g[:-1]])
+    last  = np.concatenate([g[1:] != g[:-1], [True]])
+    previous_year = np.where(first, y, np.concatenate([y[:1], y[:-1]]))
+
+    if method == 'period':
+        next_year  = np.where(last, y, np.concatenate([y[1:], y[-1:]]))
+        increments = l * (next_year - previous_year) / 2
+        # a group with a single year stands for one year
+        increments[first & last] = l[first & last]
+    else:
+        previous_level = np.where(first, l, np.concatenate([l[:1], l[:-1]]))
+        increments = (l + previous_level) / 2 * (y - previous_year)
+
+    # cumulative sum over the whole table minus the sum before the start of each group
+    total = np.cumsum(increments)
+    start = (total - increments)[first]
+    result = np.empty(len(df))
+    result[order] = total - start[np.cumsum(first) - 1]
+    return pd.Series(result, index=df.index, name='cumsum')
+
+
+@profiled
+def cumulative_matrix(df: pd.DataFrame, method: str='period') -> pd.DataFrame:
+    """
+    Cumulative sum of a table with the model years as index and a column per series, e.g. commodities or scenarios.
+    - "method" "period" (default) or "trapezoid", see the top of this module
+    """
+    check_method(method)
+    df     = df.sort_index()
+    years  = df.index.to_numpy(dtype=float)
+    values = df.to_numpy(dtype=float)
+
+    if method == 'period':
+        increments = values * period_weights(years)[:, None]
+    else:
+        increments = np.zeros_like(values)
+        increments[1:] = (values[1:] + values[:-1]) / 2 * np.diff(years)[:, None]
+
+    return pd.DataFrame(np.cumsum(increments, axis=0), index=df.index, columns=df.columns)
@@ -3,17 +3,27 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from toolbox.colormaps import color_map
+from toolbox.colormaps import palette
+from toolbox.ensemble import select_scenario
+from toolbox.output_index import get_output_index
+from toolbox.plotting import set_year_limits, ordered_columns
+from toolbox.profiling import profiled
 
 
-def plot_passenger_transportation(gdx_data: dict, set_title: str="") -> any:
+@profiled
+def plot_passenger_transportation(gdx_data: dict, set_title: str="", scenario: str=None, region=None, ax=None) -> any:
     """
     Plots passenger transportation by mode of transport. Optinally you can set an alternative title
+    and plot only a "region" (or list of regions), see also "plot_by_region".
     """
-    passenger_transportation = gdx_data['OutputAnnualByProcess'][gdx_data['OutputAnnualByProcess'].process.str.contains('TRAN_PASS')].reset_index(drop=True).pivot(index='year', columns='process', values='level')/1000000
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
+    outputs = get_output_index(gdx_data)
+    passenger_transportation = outputs.matrix(processes=outputs.find('TRAN_PASS'), region=region)/1000000
 
     # reorder
-    passenger_transportation = passenger_transportation[[
+    passenger_transportation = ordered_columns(passenger_transportation, [
     'TRAN_PASS_BusDiesel',
     'TRAN_PASS_BusBEV',
     'TRAN_PASS_CarGasoline',
@@ -27,30 +37,36 @@ def plot_passenger_transportation(gdx_data: dict, set_title: str="") -> any:
     'TRAN_PASS_AviationJetfuel_Dom',
     'TRAN_PASS_AviationBiofuel_Int',
     'TRAN_PASS_AviationBiofuel_Dom'
-    ]]
+    ])
 
     labels = [el[10:] for el in passenger_transportation.columns]
-    colors = [color_map.get(lbl,'gray')  for lbl in labels]
+    colors = palette(labels)
 
-    plt.stackplot(range(2020,2110,10), [passenger_transportation[col] for col in passenger_transportation],
+    ax.stackplot(passenger_transportation.index, [passenger_transportation[col] for col in passenger_transportation],
                 labels = labels,
                 colors = colors
                 )
-    plt.title(set_title if set_title else 'Annual Passenger Transportation')
-    plt.legend(bbox_to_anchor=(1.0, 1), frameon=False)
-    plt.xlim(2020,2100)
-    plt.ylabel('10$^{12}$ passenger-km')
-    return
+    ax.set_title(set_title if set_title else 'Annual Passenger Transportation')
+    ax.legend(bbox_to_anchor=(1.0, 1), frameon=False)
+    set_year_limits(ax, passenger_transportation.index)
+    ax.set_ylabel('10$^{12}$ passenger-km')
+    return ax
 
 
-def plot_freight_transportation(gdx_data: dict, set_title: str=""):
+@profiled
+def plot_freight_transportation(gdx_data: dict, set_title: str="", scenario: str=None, region=None, ax=None):
     """
     Plots freight transportation by mode of transport. Optinally you can set an alternative title. Tonne-km refers to tonnes transported over a distance of 1 km.
+    Optionally only a "region" (or list of regions) is plotted, see also "plot_by_region".
     """
-    freight_transportation   = gdx_data['OutputAnnualByProcess'][gdx_data['OutputAnnualByProcess'].process.str.contains('TRAN_FRGT')].reset_index(drop=True).pivot(index='year', columns='process', values='level')/1000000
+    gdx_data = select_scenario(gdx_data, scenario)
+    if ax is None:
+        ax = plt.gca()
+    outputs = get_output_index(gdx_data)
+    freight_transportation = outputs.matrix(processes=outputs.find('TRAN_FRGT'), region=region)/1000000
 
     # reorder
-    freight_transportation = freight_transportation[[
+    freight_transportation = ordered_columns(freight_transportation, [
     'TRAN_FRGT_ShipsHFO',
     'TRAN_FRGT_ShipsMDO',
     'TRAN_FRGT_ShipsLNG',
@@ -61,17 +77,17 @@ def plot_freight_transportation(gdx_data: dict, set_title: str=""):
     'TRAN_FRGT_TruckBEV',
     'TRAN_FRGT_VanDiesel',
     'TRAN_FRGT_VanBEV'
-    ]]
+    ])
 
     labels = [el[10:] for el in freight_transportation.columns]
-    colors = [color_map.get(lbl,'gray')  for lbl in labels]
+    colors = palette(labels)
 
-    plt.stackplot(range(2020,2110,10), [freight_transportation[col] for col in freight_transportation],
+    ax.stackplot(freight_transportation.index, [freight_transportation[col] for col in freight_transportation],
                 labels = labels,
                 colors = colors
                 )
-    plt.title(set_title if set_title else 'Annual Freight Transportation')
-    plt.legend(bbox_to_anchor=(1.0, 1), frameon=False)
-    plt.xlim(2020,2100)
-    plt.ylabel('10$^{12}$ tonne-km')
-    return
\ No newline at end of file
+    ax.set_title(set_title if set_title else 'Annual Freight Transportation')
+    ax.legend(bbox_to_anchor=(1.0, 1), frameon=False)
+    set_year_limits(ax, freight_transportation.index)
+    ax.set_ylabel('10$^{12}$ tonne-km')
+    return ax
\ No newline at end of file